@@ -27,4 +27,9 @@ urlpatterns = [
     path("interests/<int:pk>/", views.AdminInterestMappingDetailAPIView.as_view(), name="admin-interest-detail"),
     # Audit log
     path("audit-log/", views.AdminAuditLogListAPIView.as_view(), name="admin-audit-log"),
+    # Upstream API circuit breakers
+    path("circuits/", views.AdminUpstreamCircuitsAPIView.as_view(), name="admin-circuit-list"),
+    path("circuits/<str:name>/reset/", views.AdminUpstreamCircuitResetAPIView.as_view(), name="admin-circuit-reset"),
+    # Outbound API usage
+    path("api-usage/", views.AdminApiUsageAPIView.as_view(), name="admin-api-usage"),
 ]
@@ -1,5 +1,8 @@
+from datetime import timedelta
+
 from django.utils import timezone
-from django.db.models import Count
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncDate
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -14,8 +17,12 @@ from rest_framework.pagination import PageNumberPagination
 
 from django.contrib.auth import get_user_model
 from places.models import SavedPlace, VisitedPlace, InterestMapping
+from places.services.save_place import set_place_wishlist_state
+from places.services.visits import delete_visited_place
 from marketplace.models import Comment
-from llm.models import ChatThread, ChatMessage
+from llm.models import ApiUsageRollup, ChatThread, ChatMessage, HotelPrefetchRun
+from llm.services.api_usage import COUNTER_FIELDS, LATENCY_FIELDS
+from bizbenSayahatta.circuit_breaker import UPSTREAMS, all_breakers, get_breaker
 
 from .permissions import IsAdminUser, IsAdminOrManagerUser
 from .throttling import AdminSensitiveOperationThrottle
@@ -147,7 +154,8 @@ class AdminWishlistDeleteAPIView(APIView):
             return Response({"detail": "Wishlist record not found."}, status=status.HTTP_404_NOT_FOUND)
         user_id = obj.user_id
         place_id = obj.place_id
-        obj.delete()
+        # Removes the MustVisitPlace twin too and keeps Place.saves_count in step.
+        set_place_wishlist_state(user=obj.user, place_id=place_id, is_favorited=False)
         log_admin_action(
             request.user,
             "content.delete_wishlist",
@@ -185,7 +193,7 @@ class AdminVisitedPlaceDeleteAPIView(APIView):
             return Response({"detail": "Visited place record not found."}, status=status.HTTP_404_NOT_FOUND)
         user_id = obj.user_id
         place_id = obj.place_id
-        obj.delete()
+        delete_visited_place(obj)
         log_admin_action(
             request.user,
             "content.delete_visited_place",
@@ -414,3 +422,126 @@ class AdminAuditLogListAPIView(ListAPIView):
         if page is not None:
             return self.get_paginated_response([_log_data(log) for log in page])
         return Response([_log_data(log) for log in qs])
+
+
+# ---------------------------------------------------------------------------
+# Upstream API circuit breakers
+# ---------------------------------------------------------------------------
+
+class AdminUpstreamCircuitsAPIView(APIView):
+    """
+    GET /api/admin/circuits/
+    Admins only. State of the breaker in front of each third-party API.
+    scope is "process" on the LocMem cache: the state is then only that of
+    the worker answering this request, and a reset only reaches that worker.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        return Response([breaker.snapshot() for breaker in all_breakers()])
+
+
+class AdminUpstreamCircuitResetAPIView(APIView):
+    """
+    POST /api/admin/circuits/{name}/reset/
+    Admins only. Closes a breaker, e.g. after the provider confirms recovery.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def post(self, request, name):
+        if name not in UPSTREAMS:
+            return Response({"detail": "Unknown upstream."}, status=status.HTTP_404_NOT_FOUND)
+
+        breaker = get_breaker(name)
+        previous = breaker.state()
+        breaker.reset()
+        log_admin_action(
+            request.user,
+            "upstream.reset_circuit",
+            target_type="circuit",
+            target_id=name,
+            metadata={"previous_state": previous},
+        )
+        return Response(breaker.snapshot(), status=status.HTTP_200_OK)
+
+
+# ---------------------------------------------------------------------------
+# Outbound API usage (quota and cost accounting)
+# ---------------------------------------------------------------------------
+
+API_USAGE_GROUPS = {
+    "provider": "provider",
+    "operation": "operation",
+    "endpoint": "endpoint",
+    "user": "user_id",
+    "day": "day",
+}
+API_USAGE_MAX_DAYS = 90
+
+
+class AdminApiUsageAPIView(APIView):
+    """
+    GET /api/admin/api-usage/?days=7&group_by=provider,operation&provider=google_places
+    Admins only. Calls, errors, latency histogram, response bytes and OpenAI
+    tokens from ApiUsageRollup, summed per group and sorted by call count.
+    group_by accepts provider, operation, endpoint, user and day.
+    hotel_prefetch holds the stats of the latest prefetch_hotel_prices run.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        try:
+            days = min(max(int(request.query_params.get("days", 7)), 1), API_USAGE_MAX_DAYS)
+        except (TypeError, ValueError):
+            return Response({"detail": "days must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        group_by = [g.strip() for g in request.query_params.get("group_by", "provider,operation").split(",") if g.strip()]
+        unknown = [g for g in group_by if g not in API_USAGE_GROUPS]
+        if unknown or not group_by:
+            return Response(
+                {"detail": f"group_by must be a subset of: {', '.join(API_USAGE_GROUPS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        qs = ApiUsageRollup.objects.filter(period_start__gte=timezone.now() - timedelta(days=days))
+        provider = request.query_params.get("provider")
+        if provider:
+            qs = qs.filter(provider=provider)
+        if "day" in group_by:
+            qs = qs.annotate(day=TruncDate("period_start"))
+
+        fields = [API_USAGE_GROUPS[g] for g in group_by]
+        rows = (
+            qs.values(*fields)
+            .annotate(**{f"sum_{field}": Sum(field) for field in COUNTER_FIELDS}, max_latency=Max("latency_max_ms"))
+            .order_by("-sum_calls")
+        )
+
+        def _usage_data(row):
+            calls = row["sum_calls"] or 0
+            return {
+                **{g: row[API_USAGE_GROUPS[g]] for g in group_by},
+                "calls": calls,
+                "errors": row["sum_errors"],
+                "avg_latency_ms": round(row["sum_latency_total_ms"] / calls) if calls else 0,
+                "max_latency_ms": row["max_latency"],
+                "latency_histogram": {field.removeprefix("latency_"): row[f"sum_{field}"] for field in LATENCY_FIELDS},
+                "response_bytes": row["sum_response_bytes"],
+                "input_tokens": row["sum_input_tokens"],
+                "output_tokens": row["sum_output_tokens"],
+            }
+
+        last_prefetch = (
+            HotelPrefetchRun.objects.order_by("-created_at")
+            .values("created_at", "targets", "warm", "fetched", "empty", "skipped")
+            .first()
+        )
+        return Response({
+            "days": days,
+            "group_by": group_by,
+            "results": [_usage_data(row) for row in rows],
+            "hotel_prefetch": last_prefetch,
+        })
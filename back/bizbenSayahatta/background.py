@@ -0,0 +1,42 @@
+"""
+Lightweight background execution for short, best-effort jobs
+(e.g. refreshing a chat summary after a reply).
+
+Jobs run on a daemon thread once the surrounding transaction commits,
+so they never see uncommitted rows and never delay the response.
+With BACKGROUND_TASKS_SYNC enabled (tests) they run inline instead.
+"""
+
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger("bizbenSayahatta.background")
+
+
+def _run_safely(func, *args, **kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed", getattr(func, "__name__", func))
+
+
+def _run_in_thread(func, *args, **kwargs):
+    def target():
+        close_old_connections()
+        try:
+            _run_safely(func, *args, **kwargs)
+        finally:
+            close_old_connections()
+
+    threading.Thread(target=target, daemon=True).start()
+
+
+def run_in_background(func, *args, **kwargs):
+    """Schedule func(*args, **kwargs) to run after the current transaction commits."""
+    if getattr(settings, "BACKGROUND_TASKS_SYNC", False):
+        _run_safely(func, *args, **kwargs)
+        return
+    transaction.on_commit(lambda: _run_in_thread(func, *args, **kwargs))
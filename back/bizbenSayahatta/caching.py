@@ -0,0 +1,16 @@
+"""
+Cache backend helpers.
+
+settings.CACHES is LocMemCache unless REDIS_URL is set. LocMem is private
+to each process, so state that must be seen by every worker (or by a
+management command's writes) needs a shared backend.
+"""
+
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def uses_shared_cache() -> bool:
+    """False when the default cache lives (and dies) inside the current process."""
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
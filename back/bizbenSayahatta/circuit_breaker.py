@@ -0,0 +1,179 @@
+"""
+Circuit breakers for third-party APIs (Booking.com, TripAdvisor,
+Google Places, Nominatim).
+
+Each upstream has one breaker whose state lives in the Django cache:
+  - closed: calls go through; outcomes are counted in a fixed window of
+    CIRCUIT_BREAKER_WINDOW_SECONDS. Once the window has at least
+    CIRCUIT_BREAKER_MIN_CALLS calls and the failure ratio reaches
+    CIRCUIT_BREAKER_FAILURE_RATIO, the breaker opens.
+  - open: calls fail immediately with CircuitOpenError for
+    CIRCUIT_BREAKER_OPEN_SECONDS, so a dead upstream no longer costs a
+    request timeout per user request. Callers fall back to cached data.
+  - half-open: after the open period a single probe call is let through;
+    success closes the breaker, failure opens it again.
+
+Exceptions, 5xx and 429 responses count as failures; other 4xx answers
+mean the upstream is up and count as successes.
+
+State is kept as separate cache keys: per-window call/failure counters
+bumped with cache.incr (atomic on LocMem and Redis, so concurrent threads
+never lose an update), the opened_at timestamp, and the probe lock. With a
+shared backend (REDIS_URL) every worker sees one breaker per upstream. With
+the default LocMemCache each process trips and recovers on its own, and
+snapshots say so with scope "process".
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .caching import uses_shared_cache
+
+
+UPSTREAMS = ("booking", "tripadvisor", "google_places", "nominatim")
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+STATE_TTL_SECONDS = 24 * 60 * 60
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name, retry_after):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"Circuit for {name} is open; retry in {retry_after}s")
+
+
+def _is_failure_response(response):
+    status_code = getattr(response, "status_code", None)
+    return isinstance(status_code, int) and (status_code >= 500 or status_code == 429)
+
+
+class CircuitBreaker:
+    def __init__(self, name, *, window_seconds=None, min_calls=None, failure_ratio=None, open_seconds=None):
+        self.name = name
+        self.window_seconds = window_seconds or int(getattr(settings, "CIRCUIT_BREAKER_WINDOW_SECONDS", 60))
+        self.min_calls = min_calls or int(getattr(settings, "CIRCUIT_BREAKER_MIN_CALLS", 5))
+        self.failure_ratio = failure_ratio or float(getattr(settings, "CIRCUIT_BREAKER_FAILURE_RATIO", 0.5))
+        self.open_seconds = open_seconds or int(getattr(settings, "CIRCUIT_BREAKER_OPEN_SECONDS", 30))
+
+    def _key(self, suffix):
+        return f"circuit:{self.name}:{suffix}"
+
+    def _window_keys(self, now):
+        window = int(now // self.window_seconds)
+        return self._key(f"calls:{window}"), self._key(f"failures:{window}")
+
+    def _incr(self, key):
+        cache.add(key, 0, timeout=self.window_seconds * 2)
+        try:
+            return cache.incr(key)
+        except ValueError:  # Expired between add and incr
+            cache.add(key, 1, timeout=self.window_seconds * 2)
+            return 1
+
+    def _opened_at(self):
+        return cache.get(self._key("opened_at"))
+
+    def _retry_after(self, opened_at, now):
+        if opened_at is None:
+            return 0
+        return max(0, int(opened_at + self.open_seconds - now))
+
+    def _close(self, now):
+        cache.delete_many([self._key("opened_at"), self._key("probe"), *self._window_keys(now)])
+
+    def state(self):
+        opened_at = self._opened_at()
+        if opened_at is None:
+            return STATE_CLOSED
+        return STATE_OPEN if self._retry_after(opened_at, time.time()) > 0 else STATE_HALF_OPEN
+
+    def is_open(self):
+        """True while calls are being short-circuited (does not use up the half-open probe)."""
+        return self.state() == STATE_OPEN
+
+    def allow(self):
+        """Whether a call may go out now; in half-open, only one caller gets True."""
+        now = time.time()
+        opened_at = self._opened_at()
+        if opened_at is None:
+            return True
+        if self._retry_after(opened_at, now) > 0:
+            return False
+        return cache.add(self._key("probe"), now, timeout=self.open_seconds)
+
+    def record_success(self):
+        now = time.time()
+        if self._opened_at() is not None:
+            # The half-open probe succeeded: start from a clean window.
+            self._close(now)
+        self._incr(self._window_keys(now)[0])
+
+    def record_failure(self):
+        now = time.time()
+        cache.set(self._key("last_failure_at"), now, timeout=STATE_TTL_SECONDS)
+        if self._opened_at() is not None:
+            # The half-open probe failed: stay open for another period.
+            cache.set(self._key("opened_at"), now, timeout=STATE_TTL_SECONDS)
+            cache.delete(self._key("probe"))
+            return
+        calls_key, failures_key = self._window_keys(now)
+        calls = self._incr(calls_key)
+        failures = self._incr(failures_key)
+        if calls >= self.min_calls and failures / calls >= self.failure_ratio:
+            cache.add(self._key("opened_at"), now, timeout=STATE_TTL_SECONDS)
+
+    def call(self, func, *args, **kwargs):
+        """Run func (typically requests.get/post) through the breaker."""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self._retry_after(self._opened_at(), time.time()))
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        if _is_failure_response(result):
+            self.record_failure()
+        else:
+            self.record_success()
+        return result
+
+    def reset(self):
+        self._close(time.time())
+        cache.delete(self._key("last_failure_at"))
+
+    def snapshot(self):
+        now = time.time()
+        opened_at = self._opened_at()
+        current = self.state()
+        calls_key, failures_key = self._window_keys(now)
+        return {
+            "name": self.name,
+            "state": current,
+            # "process": LocMem cache, so this is only the state seen by the worker that answered.
+            "scope": "shared" if uses_shared_cache() else "process",
+            "calls": cache.get(calls_key, 0),
+            "failures": cache.get(failures_key, 0),
+            "window_seconds": self.window_seconds,
+            "opened_at": opened_at,
+            "retry_after": self._retry_after(opened_at, now) if current == STATE_OPEN else 0,
+            "last_failure_at": cache.get(self._key("last_failure_at")),
+        }
+
+
+_breakers = {}
+
+
+def get_breaker(name):
+    if name not in _breakers:
+        _breakers[name] = CircuitBreaker(name)
+    return _breakers[name]
+
+
+def all_breakers():
+    return [get_breaker(name) for name in UPSTREAMS]
@@ -1,5 +1,11 @@
+import logging
 import uuid
 
+from llm.services.api_usage import api_usage_request, flush_api_usage
+
+
+logger = logging.getLogger(__name__)
+
 
 class RequestIdMiddleware:
     header_name = "HTTP_X_REQUEST_ID"
@@ -14,3 +20,19 @@ class RequestIdMiddleware:
         response = self.get_response(request)
         response["X-Request-ID"] = request_id
         return response
+
+
+class ApiUsageMiddleware:
+    """Tag outbound API calls with the current endpoint/user and persist them after the response."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with api_usage_request(request):
+            response = self.get_response(request)
+        try:
+            flush_api_usage()
+        except Exception:
+            logger.exception("Failed to persist API usage")
+        return response
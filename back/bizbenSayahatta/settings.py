@@ -27,6 +27,20 @@ RAPIDAPI_HOST = os.getenv("VITE_RAPIDAPI_HOST", "booking-com15.p.rapidapi.com")
 RAPIDAPI_KEY = os.getenv("VITE_RAPIDAPI_KEY", "")
 TRIPADVISER_API_KEY = os.getenv("TRIPADVISER_API_KEY", "")
 
+# OpenAI answer cache: exact tier always on, embedding-similarity tier opt-in.
+AI_RESPONSE_CACHE_TTL = int(os.getenv("AI_RESPONSE_CACHE_TTL", str(6 * 60 * 60)))
+AI_RESPONSE_CACHE_SEMANTIC = os.getenv("AI_RESPONSE_CACHE_SEMANTIC", "False") == "True"
+AI_RESPONSE_CACHE_SIMILARITY = float(os.getenv("AI_RESPONSE_CACHE_SIMILARITY", "0.95"))
+AI_CONTEXT_TOTAL_TOKENS = int(os.getenv("AI_CONTEXT_TOTAL_TOKENS", "1800"))
+GEOCODE_NEGATIVE_CACHE_DAYS = int(os.getenv("GEOCODE_NEGATIVE_CACHE_DAYS", "7"))
+HOTEL_PREFETCH_MAX_API_CALLS = int(os.getenv("HOTEL_PREFETCH_MAX_API_CALLS", "50"))
+HOTEL_PREFETCH_HORIZON_DAYS = int(os.getenv("HOTEL_PREFETCH_HORIZON_DAYS", "30"))
+CIRCUIT_BREAKER_WINDOW_SECONDS = int(os.getenv("CIRCUIT_BREAKER_WINDOW_SECONDS", "60"))
+CIRCUIT_BREAKER_MIN_CALLS = int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", "5"))
+CIRCUIT_BREAKER_FAILURE_RATIO = float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATIO", "0.5"))
+CIRCUIT_BREAKER_OPEN_SECONDS = int(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", "30"))
+PLACE_DETAILS_MAX_AGE_DAYS = int(os.getenv("PLACE_DETAILS_MAX_AGE_DAYS", "30"))
+
 # Stripe (Payment Links + webhooks). Never commit real keys.
 STRIPE_SECRET_KEY = (os.getenv("STRIPE_SECRET_KEY") or "").strip()
 STRIPE_WEBHOOK_SECRET = (os.getenv("STRIPE_WEBHOOK_SECRET") or "").strip()
@@ -35,6 +49,8 @@ STRIPE_WEBHOOK_SECRET = (os.getenv("STRIPE_WEBHOOK_SECRET") or "").strip()
 STRIPE_PAYMENT_LINK_URL = (os.getenv("STRIPE_PAYMENT_LINK_URL") or "").strip()
 # Public SPA origin for shared travel-map links and Open Graph fallbacks.
 FRONTEND_APP_URL = (os.getenv("FRONTEND_APP_URL") or "http://127.0.0.1:5173").rstrip("/")
+# Public API origin for links built outside a request (e.g. place photo URLs).
+BACKEND_PUBLIC_URL = (os.getenv("BACKEND_PUBLIC_URL") or "").rstrip("/")
 
 #
 # Cloudinary (media uploads)
@@ -114,6 +130,7 @@ if USE_CLOUDINARY_STORAGE:
 
 MIDDLEWARE = [
     "bizbenSayahatta.middleware.RequestIdMiddleware",
+    "bizbenSayahatta.middleware.ApiUsageMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -179,14 +196,26 @@ DATABASES = {
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
-# Cache configuration for hotel data and other caching needs
-CACHES = {
-    "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "LOCATION": "unique-snowflake",
-        "TIMEOUT": 3600,
+# Cache configuration for hotel data and other caching needs.
+# LocMem is private to each worker process; set REDIS_URL to share the cache
+# between workers and with management commands such as prefetch_hotel_prices.
+REDIS_URL = (os.getenv("REDIS_URL") or "").strip()
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "TIMEOUT": 3600,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "unique-snowflake",
+            "TIMEOUT": 3600,
+        }
     }
-}
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -285,6 +314,11 @@ LOGGING = {
             "level": "ERROR",
             "propagate": False,
         },
+        "bizbenSayahatta.background": {
+            "handlers": ["console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
         "django.request": {
             "handlers": ["console"],
             "level": "ERROR",
@@ -8,3 +8,6 @@ DATABASES = {
 }
 
 DEBUG_PROPAGATE_EXCEPTIONS = True
+
+# The in-memory test database is not visible from other threads.
+BACKGROUND_TASKS_SYNC = True
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from bizbenSayahatta.caching import uses_shared_cache
+from llm.services.api_usage import api_usage_context
+from llm.services.hotel_prefetch import prefetch_hotel_prices
+
+
+class Command(BaseCommand):
+    help = "Warm the hotel cache for chat threads and final trips starting soon."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-api-calls",
+            type=int,
+            default=None,
+            help="Booking.com searches allowed this run (default: HOTEL_PREFETCH_MAX_API_CALLS).",
+        )
+        parser.add_argument(
+            "--horizon-days",
+            type=int,
+            default=None,
+            help="Only trips starting within this many days (default: HOTEL_PREFETCH_HORIZON_DAYS).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be fetched without calling the API.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["dry_run"] and not uses_shared_cache():
+            raise CommandError(
+                "The default cache is private to this process, so warmed hotel searches "
+                "would be lost on exit. Set REDIS_URL to share the cache with the web workers."
+            )
+        with api_usage_context("command:prefetch_hotel_prices"):
+            stats = prefetch_hotel_prices(
+                max_api_calls=options["max_api_calls"],
+                horizon_days=options["horizon_days"],
+                dry_run=options["dry_run"],
+            )
+        self.stdout.write(self.style.SUCCESS(
+            "{targets} upcoming searches: {warm} warm, {fetched} fetched, "
+            "{empty} empty, {skipped} over budget.".format(**stats)
+        ))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('llm', '0005_finaltrip_end_date_finaltrip_safety_tips_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatthread',
+            name='summary',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='chatthread',
+            name='summary_cursor',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='chatentry',
+            index=models.Index(fields=['thread', '-created_at'], name='llm_chatentry_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('llm', '0007_geocodecache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HotelDestination',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city_key', models.CharField(max_length=255, unique=True)),
+                ('city_name', models.CharField(max_length=255)),
+                ('dest_id', models.CharField(max_length=64)),
+                ('dest_type', models.CharField(default='city', max_length=32)),
+                ('label', models.CharField(blank=True, max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
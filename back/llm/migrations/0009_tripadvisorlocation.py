@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('llm', '0008_hoteldestination'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TripAdvisorLocation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city_key', models.CharField(max_length=255, unique=True)),
+                ('city_name', models.CharField(max_length=255)),
+                ('location_id', models.CharField(blank=True, max_length=32)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('llm', '0009_tripadvisorlocation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApiUsageRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateTimeField()),
+                ('provider', models.CharField(max_length=32)),
+                ('operation', models.CharField(max_length=64)),
+                ('endpoint', models.CharField(blank=True, max_length=255)),
+                ('calls', models.PositiveIntegerField(default=0)),
+                ('errors', models.PositiveIntegerField(default=0)),
+                ('latency_total_ms', models.PositiveBigIntegerField(default=0)),
+                ('latency_max_ms', models.PositiveIntegerField(default=0)),
+                ('latency_le_100ms', models.PositiveIntegerField(default=0)),
+                ('latency_le_300ms', models.PositiveIntegerField(default=0)),
+                ('latency_le_1000ms', models.PositiveIntegerField(default=0)),
+                ('latency_le_3000ms', models.PositiveIntegerField(default=0)),
+                ('latency_gt_3000ms', models.PositiveIntegerField(default=0)),
+                ('response_bytes', models.PositiveBigIntegerField(default=0)),
+                ('input_tokens', models.PositiveBigIntegerField(default=0)),
+                ('output_tokens', models.PositiveBigIntegerField(default=0)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='api_usage_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period_start', 'provider', 'operation'], name='llm_apiusag_period__797f88_idx'), models.Index(fields=['user', 'period_start'], name='llm_apiusag_user_id_e14d69_idx')],
+            },
+        ),
+    ]
@@ -21,6 +21,9 @@ class ChatThread(models.Model):
     end_date = models.DateField(null=True, blank=True)
     plan_json = models.JSONField(null=True, blank=True)
     is_archived = models.BooleanField(default=False, db_index=True)
+    # Rolling summary of turns older than the recent window sent verbatim.
+    summary = models.TextField(blank=True)
+    summary_cursor = models.PositiveBigIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -46,6 +49,9 @@ class ChatEntry(models.Model):
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["thread", "-created_at"], name="llm_chatentry_recent_idx"),
+        ]
 
     def __str__(self):
         return f"{self.role} message {self.id} in thread {self.thread_id}"
@@ -85,3 +91,95 @@ class FinalTrip(models.Model):
 
     def __str__(self):
         return f"FinalTrip for thread {self.thread_id}"
+
+
+class GeocodeCache(models.Model):
+    """Nominatim results keyed by normalized (name, city, country); lat/lng null means not found."""
+
+    query_hash = models.CharField(max_length=64, unique=True)
+    query = models.TextField()
+    lat = models.FloatField(null=True, blank=True)
+    lng = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def found(self):
+        return self.lat is not None and self.lng is not None
+
+    def __str__(self):
+        return f"GeocodeCache {self.query}"
+
+
+class HotelDestination(models.Model):
+    """Booking.com destination for a normalized city name; these ids are stable, so rows never expire."""
+
+    city_key = models.CharField(max_length=255, unique=True)
+    city_name = models.CharField(max_length=255)
+    dest_id = models.CharField(max_length=64)
+    dest_type = models.CharField(max_length=32, default="city")
+    label = models.CharField(max_length=255, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"HotelDestination {self.city_name} -> {self.dest_type}:{self.dest_id}"
+
+
+class HotelPrefetchRun(models.Model):
+    """Stats of one prefetch_hotel_prices run; the admin API usage endpoint shows the latest."""
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    targets = models.PositiveIntegerField(default=0)
+    warm = models.PositiveIntegerField(default=0)
+    fetched = models.PositiveIntegerField(default=0)
+    empty = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"HotelPrefetchRun {self.created_at:%Y-%m-%d %H:%M} ({self.fetched} fetched)"
+
+
+class TripAdvisorLocation(models.Model):
+    """TripAdvisor location_id for a normalized city name; blank location_id means not found."""
+
+    city_key = models.CharField(max_length=255, unique=True)
+    city_name = models.CharField(max_length=255)
+    location_id = models.CharField(max_length=32, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"TripAdvisorLocation {self.city_name} -> {self.location_id or '-'}"
+
+
+class ApiUsageRollup(models.Model):
+    """
+    Outbound API usage per hour, provider/operation, calling endpoint and user.
+    Rows are summed by the admin API, so an occasional duplicate key is harmless.
+    """
+
+    period_start = models.DateTimeField()
+    provider = models.CharField(max_length=32)
+    operation = models.CharField(max_length=64)
+    endpoint = models.CharField(max_length=255, blank=True)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="api_usage_rollups")
+    calls = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    latency_total_ms = models.PositiveBigIntegerField(default=0)
+    latency_max_ms = models.PositiveIntegerField(default=0)
+    # Latency histogram: calls per bucket (upper bounds in api_usage.LATENCY_BUCKETS_MS)
+    latency_le_100ms = models.PositiveIntegerField(default=0)
+    latency_le_300ms = models.PositiveIntegerField(default=0)
+    latency_le_1000ms = models.PositiveIntegerField(default=0)
+    latency_le_3000ms = models.PositiveIntegerField(default=0)
+    latency_gt_3000ms = models.PositiveIntegerField(default=0)
+    response_bytes = models.PositiveBigIntegerField(default=0)
+    input_tokens = models.PositiveBigIntegerField(default=0)
+    output_tokens = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["period_start", "provider", "operation"]),
+            models.Index(fields=["user", "period_start"]),
+        ]
+
+    def __str__(self):
+        return f"ApiUsageRollup {self.provider}:{self.operation} {self.period_start:%Y-%m-%d %H:00}"
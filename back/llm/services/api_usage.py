@@ -0,0 +1,164 @@
+"""
+Outbound API usage accounting (Google Places, Booking.com, TripAdvisor,
+Nominatim, OpenAI).
+
+Every paid or rate-limited call records its latency, response size, error
+flag and (for OpenAI) token usage, tagged with the calling endpoint and
+user. Records are summed in an in-process buffer, which is cheap and safe
+from worker threads, and written to ApiUsageRollup (hourly rows) by
+flush_api_usage() on the request thread: ApiUsageMiddleware flushes after
+every request, management commands via api_usage_context().
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from bizbenSayahatta.circuit_breaker import CircuitOpenError, get_breaker
+
+
+LATENCY_BUCKETS_MS = (100, 300, 1000, 3000)
+LATENCY_FIELDS = ("latency_le_100ms", "latency_le_300ms", "latency_le_1000ms", "latency_le_3000ms", "latency_gt_3000ms")
+COUNTER_FIELDS = ("calls", "errors", "latency_total_ms", *LATENCY_FIELDS, "response_bytes", "input_tokens", "output_tokens")
+
+# The HttpRequest being served (user and route are read at record time,
+# after DRF authentication), or a plain endpoint label outside requests.
+_current_request = ContextVar("api_usage_request", default=None)
+_current_endpoint = ContextVar("api_usage_endpoint", default="")
+
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+def _latency_field(latency_ms):
+    for bound, field in zip(LATENCY_BUCKETS_MS, LATENCY_FIELDS):
+        if latency_ms <= bound:
+            return field
+    return LATENCY_FIELDS[-1]
+
+
+def _caller():
+    request = _current_request.get()
+    if request is None:
+        return _current_endpoint.get(), None
+    match = getattr(request, "resolver_match", None)
+    endpoint = f"{request.method} /{match.route}" if match else f"{request.method} {request.path}"
+    user = getattr(request, "user", None)
+    return endpoint[:255], user.pk if user is not None and user.is_authenticated else None
+
+
+def record_api_call(provider, operation, latency_ms, *, error=False, response_bytes=0,
+                    input_tokens=0, output_tokens=0):
+    """Add one outbound call to the buffer; no DB access, so any thread may call it."""
+    endpoint, user_id = _caller()
+    period_start = timezone.now().replace(minute=0, second=0, microsecond=0)
+    key = (period_start, provider, operation, endpoint, user_id)
+    latency_ms = max(0, int(latency_ms))
+
+    with _pending_lock:
+        counters = _pending.setdefault(key, dict.fromkeys(COUNTER_FIELDS, 0) | {"latency_max_ms": 0})
+        counters["calls"] += 1
+        counters["errors"] += int(bool(error))
+        counters["latency_total_ms"] += latency_ms
+        counters["latency_max_ms"] = max(counters["latency_max_ms"], latency_ms)
+        counters[_latency_field(latency_ms)] += 1
+        counters["response_bytes"] += int(response_bytes or 0)
+        counters["input_tokens"] += int(input_tokens or 0)
+        counters["output_tokens"] += int(output_tokens or 0)
+
+
+def _response_size(response):
+    content = getattr(response, "content", None)
+    return len(content) if isinstance(content, (bytes, str)) else 0
+
+
+def call_upstream(provider, operation, func, *args, **kwargs):
+    """
+    Run func (requests.get/post) through the provider's circuit breaker and
+    record the call. Short-circuited calls never reach the provider and are
+    not counted.
+    """
+    started = time.monotonic()
+    try:
+        response = get_breaker(provider).call(func, *args, **kwargs)
+    except CircuitOpenError:
+        raise
+    except Exception:
+        record_api_call(provider, operation, (time.monotonic() - started) * 1000, error=True)
+        raise
+    status_code = getattr(response, "status_code", None)
+    record_api_call(
+        provider,
+        operation,
+        (time.monotonic() - started) * 1000,
+        error=isinstance(status_code, int) and status_code >= 400,
+        response_bytes=_response_size(response),
+    )
+    return response
+
+
+def flush_api_usage():
+    """Write buffered usage into ApiUsageRollup. Returns the number of rows touched."""
+    from ..models import ApiUsageRollup
+
+    global _pending
+    with _pending_lock:
+        pending, _pending = _pending, {}
+
+    for (period_start, provider, operation, endpoint, user_id), counters in pending.items():
+        lookup = {
+            "period_start": period_start,
+            "provider": provider,
+            "operation": operation,
+            "endpoint": endpoint,
+            "user_id": user_id,
+        }
+        updates = {field: F(field) + counters[field] for field in COUNTER_FIELDS}
+        updates["latency_max_ms"] = Greatest(F("latency_max_ms"), counters["latency_max_ms"])
+        if not ApiUsageRollup.objects.filter(**lookup).update(**updates):
+            ApiUsageRollup.objects.create(**lookup, **counters)
+    return len(pending)
+
+
+def bind_api_usage_caller(func):
+    """
+    Wrap func for a worker thread (executors do not inherit context vars)
+    so the calls it makes stay attributed to the current endpoint and user.
+    """
+    request, endpoint = _current_request.get(), _current_endpoint.get()
+
+    def run(*args, **kwargs):
+        request_token = _current_request.set(request)
+        endpoint_token = _current_endpoint.set(endpoint)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current_request.reset(request_token)
+            _current_endpoint.reset(endpoint_token)
+
+    return run
+
+
+@contextmanager
+def api_usage_request(request):
+    token = _current_request.set(request)
+    try:
+        yield
+    finally:
+        _current_request.reset(token)
+
+
+@contextmanager
+def api_usage_context(endpoint):
+    """Tag calls made outside a request (e.g. a management command) and flush at the end."""
+    token = _current_endpoint.set(endpoint[:255])
+    try:
+        yield
+    finally:
+        _current_endpoint.reset(token)
+        flush_api_usage()
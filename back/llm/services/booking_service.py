@@ -7,6 +7,9 @@ Provides hotel search with filters based on budget, dates, and location context.
 
 import requests
 from django.conf import settings
+from django.core.cache import cache
+
+from .api_usage import call_upstream
 
 
 # Note: Uses VITE_ prefix to match .env file naming
@@ -20,6 +23,13 @@ HEADERS = {
     "X-RapidAPI-Host": RAPIDAPI_HOST,
 }
 
+# City -> dest_id resolution cache. Hits live in the Django cache for
+# DESTINATION_CACHE_DAYS and permanently in HotelDestination; misses are
+# cached briefly so a typo does not cost a locations call per search.
+# API errors and an open circuit are never cached.
+DESTINATION_CACHE_DAYS = 30
+DESTINATION_MISS_CACHE_HOURS = 6
+
 # Travel style to Booking.com sort/order mapping
 TRAVEL_STYLE_TO_ORDER = {
     "active": "distance_from_search",  # Prefer proximity to nature/activities
@@ -31,6 +41,12 @@ TRAVEL_STYLE_TO_ORDER = {
 }
 
 
+INVENTORY_LIMIT = 50  # Unfiltered hotels fetched per (city, dates, occupancy); filtered locally
+RESULT_LIMIT = 5  # Hotels returned for LLM context / search results
+BUDGET_MIN_RATIO = 0.4
+BUDGET_MAX_RATIO = 0.9
+
+
 def search_hotels(
     city_name: str,
     checkin: str,
@@ -56,31 +72,40 @@ def search_hotels(
     Returns:
         List of hotel dicts with normalized format, or empty list on error
     """
-    try:
-        # First resolve city name to dest_id
-        locations = get_hotel_locations(city_name)
-        if not locations:
-            return []
+    inventory = search_hotel_inventory(city_name, checkin, checkout, adults=adults, children=children)
+    return filter_hotels(inventory, budget_per_night, travel_style)
 
-        dest_id = locations[0].get("dest_id")
-        dest_type = locations[0].get("dest_type", "city")
 
-        # Calculate price range (40-90% of budget per night)
-        price_min = int(budget_per_night * 0.4)
-        price_max = int(budget_per_night * 0.9)
+def search_hotel_inventory(
+    city_name: str,
+    checkin: str,
+    checkout: str,
+    adults: int = 1,
+    children: int = 0,
+) -> list:
+    """
+    Fetch up to INVENTORY_LIMIT hotels for a city and dates, by popularity
+    and without price filters, so one response serves every budget and
+    travel style (see filter_hotels). Returns empty list on error.
+    """
+    try:
+        # First resolve city name to dest_id (cached; never changes for a city)
+        destination = resolve_destination(city_name)
+        if not destination:
+            return []
 
         # Build search params
         params = {
-            "dest_id": dest_id,
-            "dest_type": dest_type,
+            "dest_id": destination["dest_id"],
+            "dest_type": destination["dest_type"],
             "checkin_date": checkin,
             "checkout_date": checkout,
             "adults_number": adults,
             "rooms_number": 1,
-            "order_by": TRAVEL_STYLE_TO_ORDER.get(travel_style, "popularity"),
+            "order_by": "popularity",
             "filter_by_currency": "USD",
             "locale": "en-gb",
-            "limit": 10,
+            "limit": INVENTORY_LIMIT,
         }
 
         # Add children if present
@@ -89,14 +114,9 @@ def search_hotels(
             # Default children ages (can be extended to accept specific ages)
             params["children_ages"] = ",".join(["5"] * children)
 
-        # Add price filter if budget is provided
-        if budget_per_night:
-            params["price_min"] = price_min
-            params["price_max"] = price_max
-
         # Make API request
         url = f"{BASE_URL}/hotels/search"
-        response = requests.get(url, headers=HEADERS, params=params, timeout=15)
+        response = call_upstream("booking", "hotels/search", requests.get, url, headers=HEADERS, params=params, timeout=15)
 
         if response.status_code != 200:
             print(f"Booking.com API error: {response.status_code} - {response.text}")
@@ -108,21 +128,59 @@ def search_hotels(
         # Normalize hotel data
         hotels = []
         for prop in properties:
-            hotel = _normalize_hotel_property(prop, budget_per_night, travel_style)
+            hotel = _normalize_hotel_property(prop)
             if hotel:
                 hotels.append(hotel)
 
-        return hotels[:5]  # Return max 5 hotels for LLM context
+        return hotels
 
     except Exception as exc:
         print(f"Booking.com service error: {exc}")
         return []
 
 
-def get_hotel_locations(city_name: str) -> list:
+def filter_hotels(hotels: list, budget_per_night: float = None, travel_style: str = None,
+                  limit: int = RESULT_LIMIT) -> list:
+    """
+    Apply the budget window (40-90% of budget per night) and travel-style
+    ordering to an unfiltered inventory. If too few hotels fall inside the
+    window, the cheapest ones at or under budget fill the remaining slots.
+    """
+    candidates = list(hotels)
+    if budget_per_night:
+        price_min = int(budget_per_night * BUDGET_MIN_RATIO)
+        price_max = int(budget_per_night * BUDGET_MAX_RATIO)
+        in_window = [h for h in candidates if price_min <= h["price_per_night"] <= price_max]
+        if len(in_window) < limit:
+            taken = {h["id"] for h in in_window}
+            fallback = sorted(
+                (h for h in candidates if 0 < h["price_per_night"] <= budget_per_night and h["id"] not in taken),
+                key=lambda h: h["price_per_night"],
+            )
+            in_window += fallback[: limit - len(in_window)]
+        candidates = in_window
+
+    order_by = TRAVEL_STYLE_TO_ORDER.get(travel_style, "popularity")
+    if order_by == "price":
+        candidates.sort(key=lambda h: h["price_per_night"])
+    elif order_by == "distance_from_search":
+        # Unknown distance (0.0) sorts last
+        candidates.sort(key=lambda h: h["distance_to_center_km"] or float("inf"))
+    # "popularity" keeps the API order
+
+    results = []
+    for hotel in candidates[:limit]:
+        if travel_style == "family" and not hotel["family_friendly"]:
+            hotel = {**hotel, "family_friendly": True}
+        results.append(hotel)
+    return results
+
+
+def get_hotel_locations(city_name: str):
     """
     Resolve city name to Booking.com destination ID.
-    Returns list of location dicts with dest_id and dest_type.
+    Returns list of location dicts with dest_id and dest_type,
+    or None on request errors.
     """
     try:
         url = f"{BASE_URL}/hotels/locations"
@@ -130,18 +188,72 @@ def get_hotel_locations(city_name: str) -> list:
             "name": city_name,
             "locale": "en-gb",
         }
-        response = requests.get(url, headers=HEADERS, params=params, timeout=10)
+        response = call_upstream("booking", "hotels/locations", requests.get, url, headers=HEADERS, params=params, timeout=10)
 
         if response.status_code != 200:
             print(f"Booking.com locations API error: {response.status_code}")
-            return []
+            return None
 
         data = response.json()
         return data[:3] if isinstance(data, list) else []
 
     except Exception as exc:
         print(f"Booking.com locations error: {exc}")
-        return []
+        return None
+
+
+def normalize_city_name(city_name: str) -> str:
+    return " ".join((city_name or "").lower().replace(",", " ").split())
+
+
+def _destination_cache_key(city_key: str) -> str:
+    return "booking:dest:" + city_key.replace(" ", "_")
+
+
+def resolve_destination(city_name: str) -> dict:
+    """
+    Return {"dest_id", "dest_type"} for a city, or None if Booking.com
+    does not know it. Checks the Django cache, then HotelDestination,
+    and only then calls the locations endpoint.
+    """
+    from ..models import HotelDestination
+
+    city_key = normalize_city_name(city_name)
+    if not city_key:
+        return None
+
+    cache_key = _destination_cache_key(city_key)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached or None  # {} marks a cached miss
+
+    row = HotelDestination.objects.filter(city_key=city_key).values("dest_id", "dest_type").first()
+    if row:
+        cache.set(cache_key, row, timeout=DESTINATION_CACHE_DAYS * 24 * 60 * 60)
+        return row
+
+    locations = get_hotel_locations(city_name)
+    if locations is None:
+        return None  # Lookup failed; retried on the next search
+    location = next((loc for loc in locations if loc.get("dest_id")), None)
+    if not location:
+        cache.set(cache_key, {}, timeout=DESTINATION_MISS_CACHE_HOURS * 60 * 60)
+        return None
+
+    destination = {
+        "dest_id": str(location["dest_id"]),
+        "dest_type": location.get("dest_type") or "city",
+    }
+    HotelDestination.objects.update_or_create(
+        city_key=city_key,
+        defaults={
+            **destination,
+            "city_name": city_name.strip()[:255],
+            "label": str(location.get("label") or location.get("name") or "")[:255],
+        },
+    )
+    cache.set(cache_key, destination, timeout=DESTINATION_CACHE_DAYS * 24 * 60 * 60)
+    return destination
 
 
 def get_hotel_details(hotel_id: str) -> dict:
@@ -155,7 +267,7 @@ def get_hotel_details(hotel_id: str) -> dict:
             "hotel_id": hotel_id,
             "locale": "en-gb",
         }
-        response = requests.get(url, headers=HEADERS, params=params, timeout=10)
+        response = call_upstream("booking", "hotels/details", requests.get, url, headers=HEADERS, params=params, timeout=10)
 
         if response.status_code != 200:
             print(f"Booking.com details API error: {response.status_code}")
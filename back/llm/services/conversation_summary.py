@@ -0,0 +1,87 @@
+"""
+Conversation Summary Service
+
+Bounds the history sent with each chat request:
+- the last RECENT_TURNS entries are read newest-first and sent verbatim
+- everything older is folded into ChatThread.summary in the background
+  after each assistant reply; summary_cursor marks the last folded entry
+"""
+
+from __future__ import annotations
+
+from typing import List, Tuple
+
+from bizbenSayahatta.background import run_in_background
+
+from ..models import ChatEntry, ChatThread
+from .prompt_context import compact_history, estimate_tokens, fit_to_budget, section_budget
+
+
+RECENT_TURNS = 6
+MAX_TURNS_PER_UPDATE = 10  # Fits the summarizer budget; older backlog folds over several replies
+
+
+def get_recent_turns(thread, limit: int = RECENT_TURNS) -> List[Tuple[int, str, str]]:
+    """Return the last `limit` entries as (id, role, content), oldest first."""
+    rows = list(
+        ChatEntry.objects.filter(thread=thread)
+        .order_by("-created_at", "-id")
+        .values_list("id", "role", "content")[:limit]
+    )
+    rows.reverse()
+    return rows
+
+
+def build_history_text(thread) -> str:
+    """
+    Summary of older turns followed by the most recent turns, within the
+    history budget. The recent turns get whatever the summary leaves and
+    lose their oldest entries first.
+    """
+    budget = section_budget("history")
+    turns = [(role, content) for _, role, content in get_recent_turns(thread)]
+    if not thread.summary:
+        return compact_history(turns, max_tokens=budget)
+
+    summary_text = fit_to_budget(thread.summary, budget // 3)
+    header = f"Summary of earlier conversation:\n{summary_text}\n\nRecent turns:\n"
+    recent_text = compact_history(turns, max_tokens=budget - estimate_tokens(header))
+    return header + recent_text
+
+
+def update_thread_summary(thread_id: int) -> bool:
+    """
+    Fold entries that fell out of the recent window into the thread summary.
+    Returns True when the summary changed.
+    """
+    from .openai_service import summarize_conversation
+
+    thread = ChatThread.objects.filter(id=thread_id).only("id", "summary", "summary_cursor").first()
+    if not thread:
+        return False
+
+    recent = get_recent_turns(thread)
+    if len(recent) < RECENT_TURNS:
+        return False
+
+    pending = ChatEntry.objects.filter(thread=thread, id__lt=recent[0][0])
+    if thread.summary_cursor:
+        pending = pending.filter(id__gt=thread.summary_cursor)
+    rows = list(pending.order_by("created_at", "id").values_list("id", "role", "content")[:MAX_TURNS_PER_UPDATE])
+    if not rows:
+        return False
+
+    turns_text = compact_history(
+        ((role, content) for _, role, content in rows),
+        max_tokens=section_budget("history") * 2,
+    )
+    summary = summarize_conversation(thread.summary, turns_text)
+    if not summary:
+        return False
+
+    ChatThread.objects.filter(id=thread.id).update(summary=summary, summary_cursor=rows[-1][0])
+    return True
+
+
+def schedule_summary_update(thread) -> None:
+    run_in_background(update_thread_summary, thread.id)
@@ -1,19 +1,87 @@
+"""
+Geocoding Service
+
+Resolves stop names to coordinates through Nominatim.
+- Results are stored in GeocodeCache keyed by normalized (name, city, country)
+- "Not found" answers are cached too, for GEOCODE_NEGATIVE_CACHE_DAYS
+- geocode_places() dedupes lookups for a whole itinerary in one DB query
+- Live requests go through a token bucket honoring Nominatim's 1 req/s policy
+  and the "nominatim" circuit breaker; while it is open, lookups fail fast
+  and are retried later (failures are never cached)
+"""
+
 from __future__ import annotations
 
+import hashlib
 import logging
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, Optional, Tuple
 
 import requests
+from django.conf import settings
+from django.utils import timezone
+
+from bizbenSayahatta.circuit_breaker import get_breaker
+
+from ..models import GeocodeCache
+from .api_usage import call_upstream
 
 
 logger = logging.getLogger(__name__)
 
 NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
 NOMINATIM_USER_AGENT = "bizben-sayahat/1.0"
+NEGATIVE_CACHE_DAYS = 7
 
+GeocodeQuery = Tuple[str, str, str]
 
-def geocode_place(place_name: str, city: str = "", country: str = ""):
-    query_parts = [value for value in [place_name, city, country] if value]
-    query = ", ".join(query_parts)
+_FETCH_FAILED = object()
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available."""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# Per-process limiter; Nominatim allows at most one request per second.
+nominatim_limiter = TokenBucket(rate=1.0, capacity=1)
+
+
+def normalize_geocode_query(place_name: str, city: str = "", country: str = "") -> GeocodeQuery:
+    return tuple(" ".join((value or "").lower().split()) for value in (place_name, city, country))
+
+
+def _query_hash(query: GeocodeQuery) -> str:
+    return hashlib.sha256("|".join(query).encode("utf-8")).hexdigest()
+
+
+def _negative_cache_cutoff():
+    days = int(getattr(settings, "GEOCODE_NEGATIVE_CACHE_DAYS", NEGATIVE_CACHE_DAYS))
+    return timezone.now() - timedelta(days=days)
+
+
+def _fetch_nominatim(query: str):
+    """Return (lat, lng), None when Nominatim has no match, or _FETCH_FAILED on errors."""
     params = {
         "q": query,
         "format": "json",
@@ -23,8 +91,16 @@ def geocode_place(place_name: str, city: str = "", country: str = ""):
         "User-Agent": NOMINATIM_USER_AGENT,
     }
 
+    if get_breaker("nominatim").is_open():
+        # Skip the rate limiter wait too; the call would be refused anyway.
+        return _FETCH_FAILED
+
+    nominatim_limiter.acquire()
     try:
-        response = requests.get(
+        response = call_upstream(
+            "nominatim",
+            "search",
+            requests.get,
             NOMINATIM_URL,
             params=params,
             headers=headers,
@@ -33,12 +109,58 @@ def geocode_place(place_name: str, city: str = "", country: str = ""):
         response.raise_for_status()
         data = response.json()
         if data:
-            return {
-                "lat": float(data[0]["lat"]),
-                "lng": float(data[0]["lon"]),
-                "name": place_name,
-            }
+            return float(data[0]["lat"]), float(data[0]["lon"])
         return None
     except Exception as exc:
         logger.warning("Nominatim error for '%s': %s", query, exc)
+        return _FETCH_FAILED
+
+
+def geocode_places(queries: Iterable[GeocodeQuery]) -> Dict[GeocodeQuery, Optional[Dict[str, float]]]:
+    """
+    Geocode many (name, city, country) queries at once.
+    Returns {normalized query: {"lat", "lng"} or None}.
+    """
+    normalized = {}
+    for place_name, city, country in queries:
+        query = normalize_geocode_query(place_name, city, country)
+        if query[0]:
+            normalized.setdefault(_query_hash(query), query)
+    if not normalized:
+        return {}
+
+    results: Dict[GeocodeQuery, Optional[Dict[str, float]]] = {}
+    cutoff = _negative_cache_cutoff()
+    for entry in GeocodeCache.objects.filter(query_hash__in=list(normalized)):
+        if not entry.found and entry.updated_at < cutoff:
+            continue
+        query = normalized.pop(entry.query_hash)
+        results[query] = {"lat": entry.lat, "lng": entry.lng} if entry.found else None
+
+    for query_hash, query in normalized.items():
+        text = ", ".join(value for value in query if value)
+        coords = _fetch_nominatim(text)
+        if coords is _FETCH_FAILED:
+            # Transient failure: retry on the next plan instead of caching a miss.
+            results[query] = None
+            continue
+        lat, lng = coords if coords else (None, None)
+        GeocodeCache.objects.update_or_create(
+            query_hash=query_hash,
+            defaults={"query": text, "lat": lat, "lng": lng},
+        )
+        results[query] = {"lat": lat, "lng": lng} if coords else None
+
+    return results
+
+
+def geocode_place(place_name: str, city: str = "", country: str = ""):
+    query = normalize_geocode_query(place_name, city, country)
+    result = geocode_places([(place_name, city, country)]).get(query)
+    if not result:
         return None
+    return {
+        "lat": result["lat"],
+        "lng": result["lng"],
+        "name": place_name,
+    }
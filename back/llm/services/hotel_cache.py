@@ -3,101 +3,131 @@ Hotel Caching Service
 
 Caches hotel results from Booking.com RapidAPI.
 Follows the same pattern as Google Places caching in this project.
+
+The cache holds the full unfiltered inventory per (city, dates,
+occupancy); budget and travel style are applied on read with
+booking_service.filter_hotels, so searches that differ only in budget
+or style share one entry. Entries are {"hotels": [...], "fetched_at": ts}
+so callers can report how old a hit is.
+
+Every cached inventory is also kept under stale:{key} for STALE_DAYS.
+When Booking.com fails (or its circuit breaker is open) that last known
+good copy is served instead of an empty list.
 """
 
-from datetime import timedelta
-from django.utils import timezone
+import time
+
 from django.core.cache import cache
 
 
 CACHE_HOURS = 6  # Hotel prices change, but not every minute
+STALE_DAYS = 7
 
 
-def get_cached_hotels(city: str, checkin: str, checkout: str, budget_per_night: float, adults: int = 1):
+def get_cached_hotels(city: str, checkin: str, checkout: str, budget_per_night: float,
+                      adults: int = 1, children: int = 0, travel_style: str = None):
     """
     Get cached hotels for the given search parameters.
-    Returns cached list if available and not expired, else None.
+    Returns the filtered list if the inventory is cached, else None.
 
-    Cache key format: hotels:{city}:{checkin}:{checkout}:{budget}:{adults}
+    Cache key format: hotels:{city}:{checkin}:{checkout}:{adults}:{children}
     TTL: 6 hours
     """
-    cache_key = build_hotel_cache_key(city, checkin, checkout, budget_per_night, adults)
-    cached_data = cache.get(cache_key)
-
-    if cached_data is not None:
-        return cached_data
+    from .booking_service import filter_hotels
 
-    return None
+    entry = cache.get(build_hotel_cache_key(city, checkin, checkout, adults, children))
+    if entry is None:
+        return None
+    return filter_hotels(entry["hotels"], budget_per_night, travel_style)
 
 
-def cache_hotels(city: str, checkin: str, checkout: str, budget_per_night: float,
-                hotels: list, adults: int = 1):
+def cache_hotels(city: str, checkin: str, checkout: str, hotels: list,
+                 adults: int = 1, children: int = 0):
     """
-    Cache hotel results for the given search parameters.
+    Cache the unfiltered hotel inventory for the given search parameters.
     Only caches non-empty results to avoid caching failures.
 
     Args:
         city: Destination city
         checkin: Check-in date (YYYY-MM-DD)
         checkout: Checkout date (YYYY-MM-DD)
-        budget_per_night: Budget per night
-        hotels: List of hotel dicts to cache
+        hotels: Unfiltered list of hotel dicts to cache
         adults: Number of adults
+        children: Number of children
     """
     if not hotels:
         # Don't cache empty results (likely API failures)
         return
 
-    cache_key = build_hotel_cache_key(city, checkin, checkout, budget_per_night, adults)
+    cache_key = build_hotel_cache_key(city, checkin, checkout, adults, children)
     timeout_seconds = CACHE_HOURS * 60 * 60
 
-    cache.set(cache_key, hotels, timeout=timeout_seconds)
+    entry = {"hotels": hotels, "fetched_at": time.time()}
+    cache.set(cache_key, entry, timeout=timeout_seconds)
+    cache.set(_stale_key(cache_key), entry, timeout=STALE_DAYS * 24 * 60 * 60)
+
+
+def _stale_key(cache_key: str) -> str:
+    return f"stale:{cache_key}"
 
 
 def build_hotel_cache_key(city: str, checkin: str, checkout: str,
-                          budget_per_night: float, adults: int = 1) -> str:
+                          adults: int = 1, children: int = 0) -> str:
     """
     Build a unique cache key for hotel search parameters.
-    Format: hotels:{city_slug}:{checkin}:{checkout}:{budget}:{adults}
+    Format: hotels:{city_slug}:{checkin}:{checkout}:{adults}:{children}
     """
-    city_slug = city.lower().replace(" ", "_").replace("-", "_")
-    budget_int = int(budget_per_night) if budget_per_night else 0
-    return f"hotels:{city_slug}:{checkin}:{checkout}:{budget_int}:{adults}"
+    city_slug = "_".join(city.lower().replace("-", " ").split())
+    return f"hotels:{city_slug}:{checkin}:{checkout}:{adults}:{children}"
 
 
-def get_hotels_cached(city_name: str, checkin: str, checkout: str,
-                      budget_per_night: float, adults: int = 1,
-                      children: int = 0, travel_style: str = None) -> list:
+def get_hotel_inventory(city_name: str, checkin: str, checkout: str,
+                        adults: int = 1, children: int = 0):
     """
-    Returns cached hotels if available, otherwise fetches and caches.
-
-    This is the main entry point for hotel searches with caching.
-    Uses the booking_service to fetch data when not cached.
+    Unfiltered inventory with a single cache read.
+    Returns (hotels, cache_hit, age_seconds); age is 0 for fresh fetches.
+    An empty fetch falls back to the last known good inventory, if any.
     """
-    from .booking_service import search_hotels
-
-    cache_key = build_hotel_cache_key(city_name, checkin, checkout, budget_per_night, adults)
-    cached = cache.get(cache_key)
+    from .booking_service import search_hotel_inventory
 
-    if cached is not None:
-        return cached
+    cache_key = build_hotel_cache_key(city_name, checkin, checkout, adults, children)
+    entry = cache.get(cache_key)
+    if entry is not None:
+        return entry["hotels"], True, int(time.time() - entry["fetched_at"])
 
     # Fetch from API
-    hotels = search_hotels(
+    hotels = search_hotel_inventory(
         city_name=city_name,
         checkin=checkin,
         checkout=checkout,
-        budget_per_night=budget_per_night,
         adults=adults,
         children=children,
-        travel_style=travel_style,
     )
 
-    # Only cache non-empty results
-    if hotels:
-        cache.set(cache_key, hotels, timeout=CACHE_HOURS * 60 * 60)
+    if not hotels:
+        # Empty results are usually API failures; prefer a stale inventory.
+        entry = cache.get(_stale_key(cache_key))
+        if entry is not None:
+            return entry["hotels"], True, int(time.time() - entry["fetched_at"])
+        return hotels, False, 0
+
+    cache_hotels(city_name, checkin, checkout, hotels, adults=adults, children=children)
+    return hotels, False, 0
+
+
+def get_hotels_cached(city_name: str, checkin: str, checkout: str,
+                      budget_per_night: float, adults: int = 1,
+                      children: int = 0, travel_style: str = None) -> list:
+    """
+    Returns cached hotels if available, otherwise fetches and caches.
+
+    This is the main entry point for hotel searches with caching.
+    Uses the booking_service to fetch data when not cached.
+    """
+    from .booking_service import filter_hotels
 
-    return hotels
+    inventory, _, _ = get_hotel_inventory(city_name, checkin, checkout, adults, children)
+    return filter_hotels(inventory, budget_per_night, travel_style)
 
 
 def clear_hotel_cache(city: str = None):
@@ -111,16 +141,17 @@ def clear_hotel_cache(city: str = None):
     if city:
         # Pattern-based deletion not directly supported in Django cache
         # Would need to track keys separately for per-city clearing
-        cache.delete_pattern(f"hotels:{city.lower().replace(' ', '_')}:*")
+        cache.delete_pattern(f"hotels:{'_'.join(city.lower().replace('-', ' ').split())}:*")
     else:
         cache.delete_pattern("hotels:*")
 
 
 def is_hotel_cached(city: str, checkin: str, checkout: str,
-                    budget_per_night: float, adults: int = 1) -> bool:
+                    budget_per_night: float = None, adults: int = 1, children: int = 0) -> bool:
     """
     Check if hotels are already cached for the given parameters.
+    Any budget is served from the same entry, so budget_per_night is ignored.
     Returns True if cached, False otherwise.
     """
-    cache_key = build_hotel_cache_key(city, checkin, checkout, budget_per_night, adults)
+    cache_key = build_hotel_cache_key(city, checkin, checkout, adults, children)
     return cache.get(cache_key) is not None
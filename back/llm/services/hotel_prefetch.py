@@ -0,0 +1,104 @@
+"""
+Hotel Price Prefetcher
+
+Warms the hotel inventory cache for trips that are about to need it:
+chat threads and final trips with a city and upcoming start/end dates.
+Run it periodically (cron) via `manage.py prefetch_hotel_prices`.
+
+The command runs in its own process, so the warmed entries only reach the
+web workers through a shared cache backend (REDIS_URL). With the default
+LocMemCache the command refuses to run.
+
+Each cold target costs one Booking.com search (plus one locations call
+the first time a city is seen), so a run stops fetching after
+HOTEL_PREFETCH_MAX_API_CALLS cold targets. Soonest trips go first.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+from ..models import ChatThread, FinalTrip, HotelPrefetchRun
+from .hotel_cache import get_hotels_cached, is_hotel_cached
+
+
+logger = logging.getLogger(__name__)
+
+MAX_API_CALLS = 50
+HORIZON_DAYS = 30
+
+
+def collect_prefetch_targets(today: Optional[date] = None, horizon_days: Optional[int] = None) -> List[Dict]:
+    """Unique (city, checkin, checkout, adults) searches for trips starting within the horizon."""
+    today = today or date.today()
+    if horizon_days is None:
+        horizon_days = int(getattr(settings, "HOTEL_PREFETCH_HORIZON_DAYS", HORIZON_DAYS))
+    window = {"start_date__gte": today, "start_date__lte": today + timedelta(days=horizon_days)}
+
+    rows = [
+        (city, start, end, 1)
+        for city, start, end in ChatThread.objects.filter(is_archived=False, end_date__isnull=False, **window)
+        .exclude(city="")
+        .values_list("city", "start_date", "end_date")
+    ]
+    rows += [
+        (city, start, end, travelers or 1)
+        for city, start, end, travelers in FinalTrip.objects.filter(end_date__isnull=False, **window)
+        .exclude(city="")
+        .values_list("city", "start_date", "end_date", "travelers")
+    ]
+
+    targets = {}
+    for city, start, end, adults in sorted(rows, key=lambda row: row[1]):
+        if end <= start:
+            continue
+        key = (" ".join(city.lower().split()), start, end, adults)
+        targets.setdefault(key, {
+            "city": city.strip(),
+            "checkin": start.isoformat(),
+            "checkout": end.isoformat(),
+            "adults": adults,
+        })
+    return list(targets.values())
+
+
+def prefetch_hotel_prices(max_api_calls: Optional[int] = None, horizon_days: Optional[int] = None,
+                          dry_run: bool = False) -> Dict[str, int]:
+    """
+    Warm the cache for upcoming trips. Returns stats:
+    targets, warm (already cached), fetched, empty (API returned nothing),
+    skipped (over the API budget). Real runs are saved as a HotelPrefetchRun.
+    """
+    if max_api_calls is None:
+        max_api_calls = int(getattr(settings, "HOTEL_PREFETCH_MAX_API_CALLS", MAX_API_CALLS))
+
+    targets = collect_prefetch_targets(horizon_days=horizon_days)
+    stats = {"targets": len(targets), "warm": 0, "fetched": 0, "empty": 0, "skipped": 0}
+    calls = 0
+    for target in targets:
+        if is_hotel_cached(target["city"], target["checkin"], target["checkout"], adults=target["adults"]):
+            stats["warm"] += 1
+            continue
+        if calls >= max_api_calls:
+            stats["skipped"] += 1
+            continue
+        calls += 1
+        if dry_run:
+            continue
+        hotels = get_hotels_cached(
+            city_name=target["city"],
+            checkin=target["checkin"],
+            checkout=target["checkout"],
+            budget_per_night=None,
+            adults=target["adults"],
+        )
+        stats["fetched" if hotels else "empty"] += 1
+
+    if not dry_run:
+        HotelPrefetchRun.objects.create(**stats)
+    logger.info("Hotel prefetch: %s", stats)
+    return stats
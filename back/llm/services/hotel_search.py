@@ -0,0 +1,116 @@
+"""
+Hotel Search Service
+
+Shared by the hotel search endpoints: query parsing/validation, one
+cache read per request (hits report their age), local budget/style
+filtering, and optional detail enrichment of the top results.
+
+Detail lookups are independent Booking.com calls, so they run
+concurrently on a small thread pool and are cached per hotel.
+"""
+
+from __future__ import annotations
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from django.core.cache import cache
+
+from . import booking_service
+from .api_usage import bind_api_usage_caller
+from .hotel_cache import get_hotel_inventory
+
+
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+MAX_DETAILS = 5
+DETAILS_CACHE_HOURS = 24  # Facilities and policies rarely change
+
+
+class HotelSearchParamsError(ValueError):
+    pass
+
+
+@dataclass
+class HotelSearchQuery:
+    city: str
+    checkin: str
+    checkout: str
+    budget_per_night: float
+    adults: int = 1
+    children: int = 0
+    travel_style: Optional[str] = None
+    details: int = 0
+
+
+@dataclass
+class HotelSearchResult:
+    hotels: List[Dict] = field(default_factory=list)
+    cached: bool = False
+    cache_age_seconds: int = 0
+
+
+def parse_hotel_search_query(params) -> HotelSearchQuery:
+    """Validate request query params; raises HotelSearchParamsError with a user-facing message."""
+    values = {name: (params.get(name) or "").strip() for name in ("city", "checkin", "checkout", "budget_per_night")}
+    missing = [name for name, value in values.items() if not value]
+    if missing:
+        raise HotelSearchParamsError(f"Missing required parameters: {', '.join(missing)}")
+
+    for name in ("checkin", "checkout"):
+        if not DATE_PATTERN.match(values[name]):
+            raise HotelSearchParamsError(f"Invalid {name} date format. Use YYYY-MM-DD.")
+
+    try:
+        budget = float(values["budget_per_night"])
+    except ValueError:
+        raise HotelSearchParamsError("budget_per_night must be a valid number")
+
+    def _int(name, default, maximum=None):
+        try:
+            value = max(int(params.get(name, default)), 0)
+        except (TypeError, ValueError):
+            value = default
+        return min(value, maximum) if maximum is not None else value
+
+    return HotelSearchQuery(
+        city=values["city"],
+        checkin=values["checkin"],
+        checkout=values["checkout"],
+        budget_per_night=budget,
+        adults=_int("adults", 1) or 1,
+        children=_int("children", 0),
+        travel_style=(params.get("travel_style") or "").strip() or None,
+        details=_int("details", 0, MAX_DETAILS),
+    )
+
+
+def _get_details_cached(hotel_id: str) -> dict:
+    cache_key = f"hotels:details:{hotel_id}"
+    details = cache.get(cache_key)
+    if details is None:
+        details = booking_service.get_hotel_details(hotel_id)
+        if details:
+            cache.set(cache_key, details, timeout=DETAILS_CACHE_HOURS * 60 * 60)
+    return details or {}
+
+
+def _enrich(hotels: List[Dict], count: int) -> List[Dict]:
+    top = hotels[:count]
+    if not top:
+        return hotels
+    with ThreadPoolExecutor(max_workers=len(top)) as pool:
+        details = list(pool.map(bind_api_usage_caller(_get_details_cached), [hotel["id"] for hotel in top]))
+    enriched = [{**hotel, "details": detail} for hotel, detail in zip(top, details)]
+    return enriched + hotels[count:]
+
+
+def search_hotels(query: HotelSearchQuery) -> HotelSearchResult:
+    inventory, cached, age = get_hotel_inventory(
+        query.city, query.checkin, query.checkout, adults=query.adults, children=query.children
+    )
+    hotels = booking_service.filter_hotels(inventory, query.budget_per_night, query.travel_style)
+    if query.details:
+        hotels = _enrich(hotels, query.details)
+    return HotelSearchResult(hotels=hotels, cached=cached, cache_age_seconds=age)
@@ -1,9 +1,17 @@
 from openai import OpenAI
 from django.conf import settings
-import json
+import hashlib
+import time
+
+from .api_usage import record_api_call
+from .prompt_context import compact_plan_for_prompt, dumps_compact
+from .response_cache import cache_response, get_cached_response, is_semantic_tier_enabled
 
 client = OpenAI(api_key=settings.OPENAI_API_KEY)
 
+OPENAI_MODEL = "gpt-4o-mini"
+EMBEDDING_MODEL = "text-embedding-3-small"
+
 SYSTEM_PROMPT = """
 Ты — умный помощник по путешествиям.
 Помогаешь планировать поездки, маршруты, достопримечательности,
@@ -41,7 +49,10 @@ CRITICAL PLANNING RULES — MUST FOLLOW:
    - Every day MUST include at least one cafe or restaurant suggestion relevant to the city's food culture.
    - For Paris specifically, include a Parisian-style cafe recommendation.
    - For other cities, include local food specialties (e.g., tapas in Barcelona, ramen in Tokyo).
+"""
 
+# Only sent when the matching block is present in the context.
+HOTEL_GUIDANCE = """
 When HOTEL OPTIONS are provided in the context (from booking_service):
 - Suggest 2-3 hotel options that match the user's budget and travel style
 - If travel style is "active/hiking", prefer hotels near nature/mountains
@@ -49,20 +60,93 @@ When HOTEL OPTIONS are provided in the context (from booking_service):
 - Present hotels naturally in your response, grouped by day or as a "Where to stay" section
 - Always include the booking URL so the user can book directly
 - If hotel data is unavailable, acknowledge it gracefully and suggest checking Booking.com directly
+"""
 
+TOUR_GUIDANCE = """
 When TOURS/ATTRACTIONS are provided in the context (from tripadvisor_service):
 - Prioritize highly-rated tours (8.0+/10 or 4.0+/5 stars)
 - Mention duration and price clearly
 - Group tours by geographic proximity to other day activities
 """
 
+# Changes whenever the prompt or model changes, so cached answers never outlive them.
+SYSTEM_PROMPT_VERSION = hashlib.sha256(
+    f"{OPENAI_MODEL}:{SYSTEM_PROMPT}{HOTEL_GUIDANCE}{TOUR_GUIDANCE}".encode("utf-8")
+).hexdigest()[:12]
+
+HOTEL_CONTEXT_MARKER = "HOTEL OPTIONS"
+TOUR_CONTEXT_MARKER = "TOURS & ATTRACTIONS"
+
+
+def build_system_prompt(context: str = "") -> str:
+    """Core rules plus hotel/tour guidance only when that data is in the context."""
+    prompt = SYSTEM_PROMPT
+    if HOTEL_CONTEXT_MARKER in (context or ""):
+        prompt += HOTEL_GUIDANCE
+    if TOUR_CONTEXT_MARKER in (context or ""):
+        prompt += TOUR_GUIDANCE
+    return prompt
+
+
+def _token_count(usage, name: str) -> int:
+    value = getattr(usage, name, 0)
+    return value if isinstance(value, int) else 0
+
+
+def _tracked_openai_call(operation: str, create, **kwargs):
+    """Call client.<api>.create and record latency and token usage (response.usage)."""
+    started = time.monotonic()
+    try:
+        response = create(**kwargs)
+    except Exception:
+        record_api_call("openai", operation, (time.monotonic() - started) * 1000, error=True)
+        raise
+    usage = getattr(response, "usage", None)
+    output_text = getattr(response, "output_text", None)
+    record_api_call(
+        "openai",
+        operation,
+        (time.monotonic() - started) * 1000,
+        response_bytes=len(output_text.encode("utf-8")) if isinstance(output_text, str) else 0,
+        # Responses API reports input/output tokens, embeddings only prompt tokens.
+        input_tokens=_token_count(usage, "input_tokens") or _token_count(usage, "prompt_tokens"),
+        output_tokens=_token_count(usage, "output_tokens"),
+    )
+    return response
+
+
+def _embed_text(text: str) -> list:
+    response = _tracked_openai_call("embeddings", client.embeddings.create, model=EMBEDDING_MODEL, input=text)
+    return list(response.data[0].embedding)
+
+
+def ask_travel_ai(
+    user_message: str,
+    context: str = "",
+    history=None,
+    *,
+    use_cache: bool = True,
+    semantic: bool = True,
+) -> str:
+    # build_history_text already fits the history budget, dropping the oldest turns first.
+    history_text = history or ""
+    embedder = _embed_text if semantic and is_semantic_tier_enabled() else None
+    if use_cache:
+        cached = get_cached_response(
+            SYSTEM_PROMPT_VERSION,
+            context,
+            user_message,
+            history=history_text,
+            embedder=embedder,
+        )
+        if cached is not None:
+            return cached
 
-def ask_travel_ai(user_message: str, context: str = "", history=None) -> str:
     input_parts = [
         {
             "role": "system",
             "content": [
-                {"type": "input_text", "text": SYSTEM_PROMPT}
+                {"type": "input_text", "text": build_system_prompt(context)}
             ],
         },
     ]
@@ -80,14 +164,14 @@ def ask_travel_ai(user_message: str, context: str = "", history=None) -> str:
             }
         )
 
-    if history:
+    if history_text:
         input_parts.append(
             {
                 "role": "system",
                 "content": [
                     {
                         "type": "input_text",
-                        "text": f"Recent conversation history:\n{history}",
+                        "text": f"Recent conversation history:\n{history_text}",
                     }
                 ],
             }
@@ -102,17 +186,29 @@ def ask_travel_ai(user_message: str, context: str = "", history=None) -> str:
         }
     )
 
-    response = client.responses.create(
-        model="gpt-4o-mini",
+    response = _tracked_openai_call(
+        "responses:chat",
+        client.responses.create,
+        model=OPENAI_MODEL,
         input=input_parts,
         temperature=0.7,
     )
 
-    return response.output_text
+    output_text = response.output_text
+    if use_cache:
+        cache_response(
+            SYSTEM_PROMPT_VERSION,
+            context,
+            user_message,
+            output_text,
+            history=history_text,
+            embedder=embedder,
+        )
+    return output_text
 
 
-def polish_trip_plan(plan: dict) -> str:
-    plan_json = json.dumps(plan, ensure_ascii=False)
+def polish_trip_plan(plan: dict, *, use_cache: bool = True) -> str:
+    plan_json = dumps_compact(compact_plan_for_prompt(plan))
     prompt = (
         "You are polishing an already validated travel itinerary.\n"
         "Use the provided structured plan as source of truth.\n"
@@ -125,4 +221,31 @@ def polish_trip_plan(plan: dict) -> str:
         "Structured plan JSON:\n"
         f"{plan_json}"
     )
-    return ask_travel_ai(prompt)
+    # Plan JSON is not natural language, so only the exact tier applies.
+    return ask_travel_ai(prompt, use_cache=use_cache, semantic=False)
+
+
+def summarize_conversation(previous_summary: str, turns_text: str, max_words: int = 150) -> str:
+    """Fold new turns into a running conversation summary."""
+    prompt = (
+        f"Update the running summary of a travel-planning chat in at most {max_words} words.\n"
+        "Keep destinations, dates, budget, travelers, preferences and decisions already made.\n"
+        "Drop greetings and anything superseded by later turns.\n\n"
+        f"Current summary:\n{previous_summary or '(empty)'}\n\n"
+        f"New turns:\n{turns_text}"
+    )
+    response = _tracked_openai_call(
+        "responses:summary",
+        client.responses.create,
+        model=OPENAI_MODEL,
+        input=[
+            {
+                "role": "user",
+                "content": [
+                    {"type": "input_text", "text": prompt}
+                ],
+            }
+        ],
+        temperature=0.2,
+    )
+    return (response.output_text or "").strip()
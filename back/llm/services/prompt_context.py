@@ -0,0 +1,168 @@
+"""
+Prompt Context Builder
+
+Keeps the context sent to OpenAI inside a token budget.
+Each section (trip, places, hotels, tours, history) gets its own budget,
+low-value fields are dropped before any text is cut, and structured data
+is serialized in its most compact form.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+
+CHARS_PER_TOKEN = 4  # Conservative average for mixed English/Russian prompts
+TRUNCATION_MARK = "…"
+
+DEFAULT_SECTION_BUDGETS = {
+    "trip": 60,
+    "places": 500,
+    "hotels": 450,
+    "tours": 350,
+    "history": 600,
+}
+DEFAULT_TOTAL_BUDGET = 1800
+MAX_HISTORY_TURN_CHARS = 400
+
+# Plan fields that matter to the model; photos, opening-hours blobs,
+# websites and provider ids only inflate the prompt.
+PLAN_FIELDS = (
+    "city",
+    "country",
+    "days_requested",
+    "days_generated",
+    "budget",
+    "interests",
+    "pace",
+    "travel_style",
+    "traveler_type",
+    "has_kids",
+    "kids_age_band",
+    "tips",
+)
+PLAN_STOP_FIELDS = ("name", "category", "rating", "neighborhood", "is_must_visit")
+
+
+@dataclass
+class ContextSection:
+    name: str
+    text: str
+    max_tokens: Optional[int] = None
+
+
+def estimate_tokens(text: str | None) -> int:
+    """Approximate token count without a tokenizer dependency."""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def section_budget(name: str) -> int:
+    budgets = getattr(settings, "AI_CONTEXT_TOKEN_BUDGETS", None) or {}
+    return int(budgets.get(name, DEFAULT_SECTION_BUDGETS.get(name, DEFAULT_TOTAL_BUDGET)))
+
+
+def _total_budget() -> int:
+    return int(getattr(settings, "AI_CONTEXT_TOTAL_TOKENS", DEFAULT_TOTAL_BUDGET))
+
+
+def truncate_text(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    return text[: max(max_chars - len(TRUNCATION_MARK), 0)].rstrip() + TRUNCATION_MARK
+
+
+def fit_to_budget(text: str, max_tokens: int) -> str:
+    """Keep whole lines from the top while they fit; cut the first line if it alone is too long."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    kept: List[str] = []
+    used = 0
+    for line in text.splitlines():
+        cost = len(line) + 1
+        if used + cost > max_chars:
+            break
+        kept.append(line)
+        used += cost
+
+    if not kept:
+        return truncate_text(text.splitlines()[0] if text else "", max_chars)
+    return "\n".join(kept).rstrip()
+
+
+def build_prompt_context(sections: Iterable[ContextSection], total_budget: Optional[int] = None) -> str:
+    """
+    Join non-empty sections, each trimmed to its own budget.
+    Sections are given in priority order: when the total budget runs out,
+    later sections are trimmed first.
+    """
+    remaining = total_budget if total_budget is not None else _total_budget()
+    parts = []
+    for section in sections:
+        text = (section.text or "").strip()
+        if not text or remaining <= 0:
+            continue
+        budget = section.max_tokens if section.max_tokens is not None else section_budget(section.name)
+        text = fit_to_budget(text, min(budget, remaining))
+        if not text:
+            continue
+        parts.append(text)
+        remaining -= estimate_tokens(text)
+    return "\n\n".join(parts)
+
+
+def compact_history(
+    turns: Iterable[Tuple[str, str]],
+    max_tokens: Optional[int] = None,
+    max_turn_chars: int = MAX_HISTORY_TURN_CHARS,
+) -> str:
+    """
+    Render (role, content) turns oldest-first, keeping the most recent
+    turns that fit the budget. Long turns are shortened.
+    """
+    budget_chars = (max_tokens if max_tokens is not None else section_budget("history")) * CHARS_PER_TOKEN
+    lines: List[str] = []
+    used = 0
+    for role, content in reversed(list(turns)):
+        flattened = " ".join((content or "").split())
+        line = f"{role}: {truncate_text(flattened, max_turn_chars)}"
+        if used + len(line) + 1 > budget_chars:
+            break
+        lines.append(line)
+        used += len(line) + 1
+    return "\n".join(reversed(lines))
+
+
+def compact_plan_for_prompt(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop coordinates, photos, opening hours and other low-value fields from a plan."""
+    compact = {
+        field: plan[field]
+        for field in PLAN_FIELDS
+        if plan.get(field) not in (None, "", [], {})
+    }
+    itinerary = []
+    for day in plan.get("itinerary") or []:
+        stops = []
+        for stop in day.get("stops") or []:
+            stops.append(
+                {
+                    field: stop[field]
+                    for field in PLAN_STOP_FIELDS
+                    if stop.get(field) not in (None, "", False)
+                }
+            )
+        itinerary.append({"day": day.get("day"), "stops": stops})
+    compact["itinerary"] = itinerary
+    return compact
+
+
+def dumps_compact(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
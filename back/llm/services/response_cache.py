@@ -0,0 +1,151 @@
+"""
+AI Response Caching Service
+
+Caches OpenAI answers for ask_travel_ai / polish_trip_plan.
+Follows the same cache backend as the hotel and tour caches.
+
+Two tiers:
+- Exact: normalized hash of (system prompt version, context, history, message)
+- Semantic (optional): embedding similarity between messages that share the
+  same prompt version, context and history
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+from typing import Callable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+CACHE_HOURS = 6  # Grounded context (places, hotels, tours) refreshes on a similar cadence
+SEMANTIC_MAX_ENTRIES = 50  # Per-context vector index size
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+
+Embedder = Callable[[str], List[float]]
+
+
+def _ttl_seconds() -> int:
+    return int(getattr(settings, "AI_RESPONSE_CACHE_TTL", CACHE_HOURS * 60 * 60))
+
+
+def is_semantic_tier_enabled() -> bool:
+    return bool(getattr(settings, "AI_RESPONSE_CACHE_SEMANTIC", False))
+
+
+def _similarity_threshold() -> float:
+    return float(getattr(settings, "AI_RESPONSE_CACHE_SIMILARITY", DEFAULT_SIMILARITY_THRESHOLD))
+
+
+def normalize_message(text: str | None) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    collapsed = re.sub(r"\s+", " ", (text or "").strip().lower())
+    return collapsed.rstrip(" .!?")
+
+
+def _digest(*parts: str) -> str:
+    joined = "\x1f".join(part or "" for part in parts)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+
+def build_response_cache_key(prompt_version: str, context: str, user_message: str, history: str = "") -> str:
+    """
+    Build the exact-tier cache key.
+    Format: ai:response:{sha256}
+    """
+    return "ai:response:" + _digest(
+        prompt_version,
+        (context or "").strip(),
+        (history or "").strip(),
+        normalize_message(user_message),
+    )
+
+
+def _semantic_index_key(prompt_version: str, context: str, history: str = "") -> str:
+    return "ai:semantic:" + _digest(prompt_version, (context or "").strip(), (history or "").strip())
+
+
+def _cosine_similarity(left: List[float], right: List[float]) -> float:
+    if not left or not right or len(left) != len(right):
+        return 0.0
+    dot = sum(a * b for a, b in zip(left, right))
+    left_norm = math.sqrt(sum(a * a for a in left))
+    right_norm = math.sqrt(sum(b * b for b in right))
+    if not left_norm or not right_norm:
+        return 0.0
+    return dot / (left_norm * right_norm)
+
+
+def get_cached_response(
+    prompt_version: str,
+    context: str,
+    user_message: str,
+    history: str = "",
+    embedder: Optional[Embedder] = None,
+) -> Optional[str]:
+    """
+    Return a cached answer for this prompt, or None.
+    The semantic tier is only consulted when enabled and an embedder is given.
+    """
+    cached = cache.get(build_response_cache_key(prompt_version, context, user_message, history))
+    if cached is not None:
+        return cached
+
+    if embedder is None or not is_semantic_tier_enabled():
+        return None
+
+    index = cache.get(_semantic_index_key(prompt_version, context, history)) or []
+    if not index:
+        return None
+
+    try:
+        vector = embedder(normalize_message(user_message))
+    except Exception:
+        return None
+
+    threshold = _similarity_threshold()
+    best_response, best_score = None, 0.0
+    for entry in index:
+        score = _cosine_similarity(vector, entry["embedding"])
+        if score >= threshold and score > best_score:
+            best_response, best_score = entry["response"], score
+    return best_response
+
+
+def cache_response(
+    prompt_version: str,
+    context: str,
+    user_message: str,
+    response_text: str,
+    history: str = "",
+    embedder: Optional[Embedder] = None,
+):
+    """
+    Cache an answer for this prompt.
+    Empty answers are not cached.
+    """
+    if not response_text:
+        return
+
+    timeout_seconds = _ttl_seconds()
+    cache.set(
+        build_response_cache_key(prompt_version, context, user_message, history),
+        response_text,
+        timeout=timeout_seconds,
+    )
+
+    if embedder is None or not is_semantic_tier_enabled():
+        return
+
+    try:
+        vector = embedder(normalize_message(user_message))
+    except Exception:
+        return
+
+    index_key = _semantic_index_key(prompt_version, context, history)
+    index = cache.get(index_key) or []
+    index.append({"embedding": vector, "response": response_text})
+    cache.set(index_key, index[-SEMANTIC_MAX_ENTRIES:], timeout=timeout_seconds)
@@ -7,9 +7,17 @@ from typing import Dict, Iterable, List, Optional
 from urllib.parse import quote_plus
 
 from places.models import Place
-from users.services import calculate_level_and_badges
-
-from .geocoding import geocode_place
+from users.services import get_user_travel_profile
+
+from .geocoding import geocode_places, normalize_geocode_query
+from .trip_markdown import (
+    SAFETY_MARKER,
+    SOURCES_MARKER,
+    index_trip_fragments,
+    join_trip_fragments,
+    render_trip_fragments,
+    restore_trip_fragments,
+)
 from .trip_planner import build_trip_plan
 
 
@@ -448,10 +456,15 @@ def trip_plan_should_refresh(
     return False
 
 
-def strip_trip_sources_from_markdown(full_markdown: str) -> str:
+def strip_trip_sources_from_markdown(full_markdown: str, sections: Optional[Dict[str, object]] = None) -> str:
     """Remove the Sources section for chat; keep safety and the rest (sources stay on FinalTrip)."""
-    marker_sources = "## 📚 Sources"
-    marker_safety = "## ⚠️ Safety"
+    fragments = restore_trip_fragments(sections, full_markdown)
+    if fragments:
+        return join_trip_fragments(fragments, include_sources=False)
+
+    # Payloads saved before markdown sections existed.
+    marker_sources = SOURCES_MARKER
+    marker_safety = SAFETY_MARKER
     if marker_sources not in full_markdown:
         return full_markdown
     head, tail = full_markdown.split(marker_sources, 1)
@@ -611,7 +624,7 @@ def _safety_tips(destination: str, country: str, has_kids: bool) -> List[str]:
 
 
 def _format_history_line(user) -> str:
-    profile = calculate_level_and_badges(user)
+    profile = get_user_travel_profile(user)
     history_prompt = profile.get("history_prompt", "")
     preferences = getattr(user, "preferences", None)
     if preferences and preferences.travel_style and not history_prompt:
@@ -651,21 +664,31 @@ def _build_sources(plan: Dict[str, object], country: str, citizenship: str) -> D
     }
 
 
-def _route_places_for_day(day: Dict[str, object]) -> List[Dict[str, object]]:
+def _stop_geocode_query(stop: Dict[str, object]):
+    return (stop.get("name", ""), stop.get("city", ""), stop.get("country", ""))
+
+
+def _route_places_for_day(
+    day: Dict[str, object],
+    geocoded: Optional[Dict[tuple, Optional[Dict[str, float]]]] = None,
+) -> List[Dict[str, object]]:
+    if geocoded is None:
+        geocoded = geocode_places(
+            _stop_geocode_query(stop)
+            for stop in day.get("stops", [])
+            if stop.get("lat") is None or stop.get("lng") is None
+        )
+
     places = []
     for stop in day.get("stops", []):
         lat = stop.get("lat")
         lng = stop.get("lng")
         if lat is None or lng is None:
-            geocoded = geocode_place(
-                stop.get("name", ""),
-                city=stop.get("city", ""),
-                country=stop.get("country", ""),
-            )
-            if not geocoded:
+            coords = geocoded.get(normalize_geocode_query(*_stop_geocode_query(stop)))
+            if not coords:
                 continue
-            lat = geocoded["lat"]
-            lng = geocoded["lng"]
+            lat = coords["lat"]
+            lng = coords["lng"]
 
         places.append(
             {
@@ -679,9 +702,16 @@ def _route_places_for_day(day: Dict[str, object]) -> List[Dict[str, object]]:
 
 
 def _build_route(plan: Dict[str, object]) -> List[Dict[str, object]]:
+    # One batched lookup for every stop in the itinerary that lacks coordinates.
+    geocoded = geocode_places(
+        _stop_geocode_query(stop)
+        for day in plan.get("itinerary", [])
+        for stop in day.get("stops", [])
+        if stop.get("lat") is None or stop.get("lng") is None
+    )
     route = []
     for index, day in enumerate(plan.get("itinerary", [])):
-        route_places = _route_places_for_day(day)
+        route_places = _route_places_for_day(day, geocoded)
         route.append(
             {
                 "day": day["day"],
@@ -692,124 +722,19 @@ def _build_route(plan: Dict[str, object]) -> List[Dict[str, object]]:
     return route
 
 
-def _trip_summary_lines(plan: Dict[str, object]) -> List[str]:
-    out: List[str] = []
-    travelers = plan.get("travelers")
-    if travelers is not None:
-        out.append(f"- **Travelers:** {travelers}")
-    dur = plan.get("duration_days")
-    if dur is None:
-        dur = plan.get("days_requested")
-    if dur is not None:
-        out.append(f"- **Trip length:** {dur} day(s)")
-    start, end = plan.get("start_date"), plan.get("end_date")
-    if start and end:
-        out.append(f"- **Dates:** {start} → {end}")
-    elif start:
-        out.append(f"- **Start date:** {start}")
-    elif end:
-        out.append(f"- **End date:** {end}")
-    else:
-        out.append("- **Dates:** (set start/end on the chat if you have fixed dates)")
-
-    bt = plan.get("budget_total")
-    dbpp = plan.get("daily_budget_per_person")
-    daily_b = plan.get("daily_budget")
-    if bt is not None:
-        line = f"- **Budget:** ${int(bt)} total"
-        if dbpp is not None:
-            line += f" (~${int(dbpp)}/person/day)"
-        out.append(line)
-    elif daily_b is not None:
-        try:
-            out.append(f"- **Daily budget (estimate):** ${int(daily_b)}/person/day")
-        except (TypeError, ValueError):
-            out.append("- **Budget:** not specified")
-    else:
-        pl = plan.get("budget")
-        if pl is not None:
-            out.append(
-                f"- **Budget filter:** Google price level ≤ {pl} (planner constraint on places)"
-            )
-        else:
-            out.append("- **Budget:** not specified")
-
-    style = plan.get("travel_style") or ""
-    ttype = plan.get("traveler_type") or plan.get("trip_type") or ""
-    if style or ttype:
-        out.append(
-            "- **Trip profile:** "
-            + ", ".join(part for part in (ttype, style) if part)
-        )
-    return out
-
-
-def _format_trip_response(plan: Dict[str, object]) -> str:
-    lines = []
-    history_line = plan.get("history_line")
-    if history_line:
-        lines.append(f"{history_line} I've shaped this trip around it.")
-        lines.append("")
-
-    lines.append(f"## Final Trip for {plan.get('city')}")
-    lines.append("")
-    lines.append("### Trip summary")
-    for row in _trip_summary_lines(plan):
-        lines.append(row)
-    lines.append("")
-
-    if plan.get("family_note"):
-        lines.append(plan["family_note"])
-        lines.append("")
-
-    for day in plan.get("itinerary", []):
-        emoji = day.get("color_emoji", "🔵")
-        lines.append(f"### Day {day['day']} {emoji}")
-        lines.append(day.get("summary") or "")
-        for stop in day.get("stops", []):
-            lines.append(f"- {stop['name']} — {stop['address']}")
-        lines.append("")
-
-    country = plan.get("country") or _country_for_destination(str(plan.get("city") or ""))
-    citizenship = ""
+def _render_trip_markdown(plan: Dict[str, object], previous: Optional[Dict[str, object]] = None) -> None:
+    """Set response_markdown and markdown_sections, reusing unchanged fragments of a previous payload."""
     sources = plan.get("sources")
     if not sources:
-        sources = _build_sources(plan, country, citizenship)
-    items = sources.get("items") or []
-
-    lines.append("## 📚 Sources & Useful Links")
-    lines.append("━━━━━━━━━━━━━━━━━━━━━━━━")
-    for item in items:
-        lines.append(f"📍 [{item['label']}]({item['url']}) — {item['provider']}")
-
-    visa = sources["visa"]
-    if visa["status"] == "required":
-        lines.append(f"🛂 {visa['label']} → [link]({visa['url']})")
-    elif visa["status"] == "not_required":
-        lines.append(f"✅ {visa['label']}")
-    elif visa["url"]:
-        lines.append(f"🛂 {visa['label']} → [link]({visa['url']})")
-    else:
-        lines.append(f"🛂 {visa['label']}")
-    lines.append(
-        f"📋 [{sources['advisory']['label']}]({sources['advisory']['url']})"
+        country = plan.get("country") or _country_for_destination(str(plan.get("city") or ""))
+        sources = _build_sources(plan, country, "")
+    previous = previous or {}
+    previous_fragments = restore_trip_fragments(
+        previous.get("markdown_sections"), previous.get("response_markdown") or ""
     )
-    lines.append("")
-
-    lines.append(f"## ⚠️ Safety Tips for {plan.get('city')}")
-    lines.append("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-    for tip in plan.get("safety_tips", []):
-        lines.append(f"• {tip}")
-
-    if plan.get("partial_note"):
-        lines.append("")
-        lines.append(plan["partial_note"])
-
-    if plan.get("needs_citizenship"):
-        lines.append("")
-        lines.append("What's your citizenship/passport? I'll add a more precise visa check.")
-
-    return "\n".join(lines).strip()
+    fragments = render_trip_fragments(plan, sources, previous_fragments)
+    plan["response_markdown"] = join_trip_fragments(fragments)
+    plan["markdown_sections"] = index_trip_fragments(fragments, plan["response_markdown"])
 
 
 def enrich_thread_plan_for_final_trip(
@@ -861,12 +786,12 @@ def enrich_thread_plan_for_final_trip(
     )
     merged["partial_note"] = ""
     merged["history_line"] = None
-    merged["response_markdown"] = _format_trip_response(merged)
+    _render_trip_markdown(merged, prev)
     return merged
 
 
 def generate_trip_payload(
-    *, user, requirements: TripRequirements, thread=None
+    *, user, requirements: TripRequirements, thread=None, request=None
 ) -> Dict[str, object]:
     days = requirements.duration_days or 3
     price_level_budget = _budget_to_price_level(requirements.budget_total, days)
@@ -885,6 +810,7 @@ def generate_trip_payload(
         traveler_type=requirements.traveler_type,
         has_kids=requirements.has_kids,
         kids_age_band=requirements.kids_age_band or ("child" if requirements.has_kids else ""),
+        request=request,
     )
 
     partial_note = ""
@@ -899,6 +825,7 @@ def generate_trip_payload(
             traveler_type=requirements.traveler_type,
             has_kids=requirements.has_kids,
             kids_age_band=requirements.kids_age_band or ("child" if requirements.has_kids else ""),
+            request=request,
         )
         if retry_plan["days_generated"] >= plan["days_generated"]:
             plan = retry_plan
@@ -952,5 +879,5 @@ def generate_trip_payload(
             payload["start_date"] = thread.start_date.isoformat()
         if thread.end_date:
             payload["end_date"] = thread.end_date.isoformat()
-    payload["response_markdown"] = _format_trip_response(payload)
+    _render_trip_markdown(payload, thread.plan_json if thread is not None else None)
     return payload
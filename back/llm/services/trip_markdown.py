@@ -0,0 +1,286 @@
+"""
+Trip Markdown Renderer
+
+Renders the Final Trip markdown as separate fragments:
+
+    intro, summary, days (one per itinerary day), sources, safety, footer
+
+Each fragment keeps a digest of the inputs it was rendered from, so a
+re-render reuses every fragment whose inputs did not change (e.g. only
+the edited day is rebuilt), and the chat copy without sources is a join
+of fragments instead of a regex pass over the full document.
+
+Payloads store only "markdown_sections": each fragment's digest and its
+span in response_markdown. The text is sliced back out when needed, so
+it is never saved or returned twice.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+
+SOURCES_MARKER = "## 📚 Sources"
+SAFETY_MARKER = "## ⚠️ Safety"
+
+Fragment = Dict[str, Any]
+
+SECTION_KEYS = ("intro", "summary", "sources", "safety", "footer")
+
+
+def _digest(inputs: Any) -> str:
+    raw = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _trip_summary_lines(plan: Dict[str, Any]) -> List[str]:
+    out: List[str] = []
+    travelers = plan.get("travelers")
+    if travelers is not None:
+        out.append(f"- **Travelers:** {travelers}")
+    dur = plan.get("duration_days")
+    if dur is None:
+        dur = plan.get("days_requested")
+    if dur is not None:
+        out.append(f"- **Trip length:** {dur} day(s)")
+    start, end = plan.get("start_date"), plan.get("end_date")
+    if start and end:
+        out.append(f"- **Dates:** {start} → {end}")
+    elif start:
+        out.append(f"- **Start date:** {start}")
+    elif end:
+        out.append(f"- **End date:** {end}")
+    else:
+        out.append("- **Dates:** (set start/end on the chat if you have fixed dates)")
+
+    bt = plan.get("budget_total")
+    dbpp = plan.get("daily_budget_per_person")
+    daily_b = plan.get("daily_budget")
+    if bt is not None:
+        line = f"- **Budget:** ${int(bt)} total"
+        if dbpp is not None:
+            line += f" (~${int(dbpp)}/person/day)"
+        out.append(line)
+    elif daily_b is not None:
+        try:
+            out.append(f"- **Daily budget (estimate):** ${int(daily_b)}/person/day")
+        except (TypeError, ValueError):
+            out.append("- **Budget:** not specified")
+    else:
+        pl = plan.get("budget")
+        if pl is not None:
+            out.append(
+                f"- **Budget filter:** Google price level ≤ {pl} (planner constraint on places)"
+            )
+        else:
+            out.append("- **Budget:** not specified")
+
+    style = plan.get("travel_style") or ""
+    ttype = plan.get("traveler_type") or plan.get("trip_type") or ""
+    if style or ttype:
+        out.append(
+            "- **Trip profile:** "
+            + ", ".join(part for part in (ttype, style) if part)
+        )
+    return out
+
+
+# ----------------------------
+# Fragment renderers
+# ----------------------------
+
+def _render_intro(inputs: Dict[str, Any]) -> List[str]:
+    if not inputs["history_line"]:
+        return []
+    return [f"{inputs['history_line']} I've shaped this trip around it.", ""]
+
+
+def _render_summary(inputs: Dict[str, Any]) -> List[str]:
+    lines = [f"## Final Trip for {inputs['city']}", "", "### Trip summary"]
+    lines.extend(_trip_summary_lines(inputs))
+    lines.append("")
+    if inputs["family_note"]:
+        lines.append(inputs["family_note"])
+        lines.append("")
+    return lines
+
+
+def _render_day(day: Dict[str, Any]) -> List[str]:
+    emoji = day.get("color_emoji", "🔵")
+    lines = [f"### Day {day['day']} {emoji}", day.get("summary") or ""]
+    for stop in day.get("stops", []):
+        lines.append(f"- {stop['name']} — {stop['address']}")
+    lines.append("")
+    return lines
+
+
+def _render_sources(sources: Dict[str, Any]) -> List[str]:
+    lines = ["## 📚 Sources & Useful Links", "━━━━━━━━━━━━━━━━━━━━━━━━"]
+    for item in sources.get("items") or []:
+        lines.append(f"📍 [{item['label']}]({item['url']}) — {item['provider']}")
+
+    visa = sources["visa"]
+    if visa["status"] == "required":
+        lines.append(f"🛂 {visa['label']} → [link]({visa['url']})")
+    elif visa["status"] == "not_required":
+        lines.append(f"✅ {visa['label']}")
+    elif visa["url"]:
+        lines.append(f"🛂 {visa['label']} → [link]({visa['url']})")
+    else:
+        lines.append(f"🛂 {visa['label']}")
+    lines.append(f"📋 [{sources['advisory']['label']}]({sources['advisory']['url']})")
+    lines.append("")
+    return lines
+
+
+def _render_safety(inputs: Dict[str, Any]) -> List[str]:
+    lines = [f"## ⚠️ Safety Tips for {inputs['city']}", "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"]
+    for tip in inputs["safety_tips"]:
+        lines.append(f"• {tip}")
+    return lines
+
+
+def _render_footer(inputs: Dict[str, Any]) -> List[str]:
+    lines: List[str] = []
+    if inputs["partial_note"]:
+        lines.append("")
+        lines.append(inputs["partial_note"])
+    if inputs["needs_citizenship"]:
+        lines.append("")
+        lines.append("What's your citizenship/passport? I'll add a more precise visa check.")
+    return lines
+
+
+SUMMARY_FIELDS = (
+    "city",
+    "family_note",
+    "travelers",
+    "duration_days",
+    "days_requested",
+    "start_date",
+    "end_date",
+    "budget_total",
+    "daily_budget_per_person",
+    "daily_budget",
+    "budget",
+    "travel_style",
+    "traveler_type",
+    "trip_type",
+)
+
+
+def _fragment(
+    inputs: Any,
+    renderer: Callable[[Any], List[str]],
+    previous: Optional[Fragment],
+) -> Fragment:
+    digest = _digest(inputs)
+    if previous and previous.get("digest") == digest:
+        return previous
+    return {"digest": digest, "markdown": "\n".join(renderer(inputs))}
+
+
+def render_trip_fragments(
+    plan: Dict[str, Any],
+    sources: Dict[str, Any],
+    previous: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Render every fragment, reusing those from `previous` whose inputs are unchanged."""
+    previous = previous or {}
+    previous_days = {day.get("day"): day for day in previous.get("days") or []}
+
+    days = []
+    for day in plan.get("itinerary", []):
+        fragment = _fragment(day, _render_day, previous_days.get(day.get("day")))
+        days.append({"day": day.get("day"), **fragment})
+
+    return {
+        "intro": _fragment({"history_line": plan.get("history_line")}, _render_intro, previous.get("intro")),
+        "summary": _fragment(
+            {field: plan.get(field) for field in SUMMARY_FIELDS},
+            _render_summary,
+            previous.get("summary"),
+        ),
+        "days": days,
+        "sources": _fragment(sources, _render_sources, previous.get("sources")),
+        "safety": _fragment(
+            {"city": plan.get("city"), "safety_tips": plan.get("safety_tips", [])},
+            _render_safety,
+            previous.get("safety"),
+        ),
+        "footer": _fragment(
+            {
+                "partial_note": plan.get("partial_note"),
+                "needs_citizenship": plan.get("needs_citizenship"),
+            },
+            _render_footer,
+            previous.get("footer"),
+        ),
+    }
+
+
+def _join(parts: List[Fragment]) -> str:
+    # Empty fragments render no lines, so they must not add a separator either.
+    return "\n".join(part["markdown"] for part in parts if part["markdown"])
+
+
+def _ordered(fragments: Dict[str, Any], include_sources: bool) -> List[Fragment]:
+    parts = [fragments["intro"], fragments["summary"], *fragments["days"]]
+    if include_sources:
+        parts.append(fragments["sources"])
+    return parts
+
+
+def join_trip_fragments(fragments: Dict[str, Any], include_sources: bool = True) -> str:
+    """Full markdown, or the chat copy without the Sources section."""
+    if include_sources:
+        return _join([*_ordered(fragments, True), fragments["safety"], fragments["footer"]]).strip()
+    head = _join(_ordered(fragments, False)).rstrip()
+    tail = _join([fragments["safety"], fragments["footer"]])
+    return f"{head}\n\n{tail}".strip()
+
+
+def index_trip_fragments(fragments: Dict[str, Any], markdown: str) -> Dict[str, Any]:
+    """Digest and [start, end) span in `markdown` (their join) of every fragment."""
+    cursor = 0
+
+    def locate(fragment: Fragment) -> Fragment:
+        nonlocal cursor
+        text = fragment["markdown"]
+        start = markdown.find(text, cursor)
+        if start < 0:
+            # The join strips whitespace at the document edges; it never shows there.
+            text = text.strip()
+            start = markdown.find(text, cursor)
+        if start < 0:
+            return {"digest": fragment["digest"], "span": None}
+        cursor = start + len(text)
+        return {"digest": fragment["digest"], "span": [start, cursor]}
+
+    # Same order as the document, so each search starts where the last fragment ended.
+    index = {"intro": locate(fragments["intro"]), "summary": locate(fragments["summary"])}
+    index["days"] = [{"day": day.get("day"), **locate(day)} for day in fragments["days"]]
+    for key in ("sources", "safety", "footer"):
+        index[key] = locate(fragments[key])
+    return index
+
+
+def restore_trip_fragments(index: Optional[Dict[str, Any]], markdown: str) -> Optional[Dict[str, Any]]:
+    """Fragments sliced back out of `markdown`, or None when the index does not fit it."""
+    if not index:
+        return None
+
+    def restore(entry: Fragment) -> Fragment:
+        start, end = entry["span"]
+        if not 0 <= start <= end <= len(markdown):
+            raise ValueError("span outside the markdown")
+        return {"digest": entry["digest"], "markdown": markdown[start:end]}
+
+    try:
+        fragments = {key: restore(index[key]) for key in SECTION_KEYS}
+        fragments["days"] = [{"day": day.get("day"), **restore(day)} for day in index["days"]]
+    except (KeyError, TypeError, ValueError):
+        return None
+    return fragments
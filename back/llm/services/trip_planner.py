@@ -3,6 +3,8 @@ from typing import Iterable, List, Optional
 import math
 
 from places.models import InterestMapping, MustVisitPlace, Place, SavedPlace
+from places.services.google_places import ensure_places_details
+from places.services.photos import place_photo_url
 from users.models import UserPreferences
 
 
@@ -463,6 +465,7 @@ def build_trip_plan(
     traveler_type: Optional[str] = None,
     has_kids: bool = False,
     kids_age_band: Optional[str] = None,
+    request=None,
 ):
     normalized_interests = _normalize_interests(interests)
     budget, normalized_interests, travel_style = _apply_preferences(
@@ -538,6 +541,7 @@ def build_trip_plan(
         )
         if not day_places:
             break
+        ensure_places_details([item.place for item in day_places])
 
         stops = []
         for item in day_places:
@@ -556,7 +560,7 @@ def build_trip_plan(
                     "lng": place.lng,
                     "price_level": place.price_level,
                     "opening_hours": place.opening_hours,
-                    "photo_url": place.photo_url,
+                    "photo_url": place_photo_url(place, request=request),
                     "website": place.website,
                     "neighborhood": place.neighborhood,
                     "is_must_visit": place.id in favorite_place_ids,
@@ -3,14 +3,28 @@ TripAdvisor Content API Service
 
 Fetches tours, attractions, and experiences from TripAdvisor.
 Follows the same structure as the Google Places service.
+
+This is the only TripAdvisor client; the places app (inspiration page)
+and the AI chat share its caches:
+- city -> location_id in TripAdvisorLocation (misses retried after
+  LOCATION_MISS_DAYS), so the search call is made once per city
+- normalized tours in the Django cache under tripadvisor:tours:{city}
+- cities with no tours are cached as [] for TOUR_MISS_CACHE_HOURS;
+  API errors are never cached
+- the last good tours per city are kept for TOUR_STALE_DAYS and served
+  when TripAdvisor fails or its circuit breaker is open
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from django.conf import settings
 from django.core.cache import cache
 from datetime import timedelta
 from django.utils import timezone
 
+from .api_usage import bind_api_usage_caller, call_upstream
+
 
 TRIPADVISER_API_KEY = getattr(settings, 'TRIPADVISER_API_KEY', '')
 BASE_URL = "https://api.tripadvisor.com/api/internal/1.14"
@@ -19,6 +33,12 @@ HEADERS = {
     "Accept": "application/json",
 }
 
+TOUR_CACHE_HOURS = 12  # Tours change less often than availability
+TOUR_MISS_CACHE_HOURS = 6
+LOCATION_MISS_DAYS = 7
+TOUR_STALE_DAYS = 7  # Last known good tours, served while TripAdvisor is failing
+BATCH_WORKERS = 4
+
 
 def fetch_tours_from_tripadvisor(city_name: str, max_results: int = 10) -> list:
     """
@@ -31,17 +51,32 @@ def fetch_tours_from_tripadvisor(city_name: str, max_results: int = 10) -> list:
     Returns:
         List of raw tour dicts from TripAdvisor API, or empty list on error
     """
+    return _fetch_attractions(city_name, max_results) or []
+
+
+def _fetch_attractions(city_name: str, max_results: int):
+    """Raw attractions list; [] when TripAdvisor has none, None on errors."""
     if not TRIPADVISER_API_KEY:
         print("TripAdvisor API key not configured")
-        return []
+        return None
 
     try:
-        # First, search for the location to get location_id
-        location_id = _get_location_id(city_name)
+        location_id = resolve_location_id(city_name)
+        if location_id is None:
+            return None
         if not location_id:
             print(f"Could not find location ID for {city_name}")
             return []
+        return _fetch_location_attractions(location_id, max_results)
+
+    except Exception as exc:
+        print(f"TripAdvisor service error: {exc}")
+        return None
+
 
+def _fetch_location_attractions(location_id: str, max_results: int):
+    """HTTP only (no DB access), so it is safe to run on worker threads."""
+    try:
         # Fetch attractions/tours for this location
         url = f"{BASE_URL}/location/{location_id}/attractions"
         params = {
@@ -50,11 +85,11 @@ def fetch_tours_from_tripadvisor(city_name: str, max_results: int = 10) -> list:
             "limit": max_results,
         }
 
-        response = requests.get(url, headers=HEADERS, params=params, timeout=15)
+        response = call_upstream("tripadvisor", "location/attractions", requests.get, url, headers=HEADERS, params=params, timeout=15)
 
         if response.status_code != 200:
             print(f"TripAdvisor API error: {response.status_code} - {response.text}")
-            return []
+            return None
 
         data = response.json()
 
@@ -67,13 +102,42 @@ def fetch_tours_from_tripadvisor(city_name: str, max_results: int = 10) -> list:
 
     except Exception as exc:
         print(f"TripAdvisor service error: {exc}")
-        return []
+        return None
+
+
+def normalize_city(city_name: str) -> str:
+    return " ".join((city_name or "").lower().replace("-", " ").replace("_", " ").split())
+
+
+def resolve_location_id(city_name: str):
+    """
+    TripAdvisor location_id for a city: "" when TripAdvisor has no match,
+    None when the lookup failed (not cached, retried next time).
+    """
+    from ..models import TripAdvisorLocation
+
+    city_key = normalize_city(city_name)
+    if not city_key:
+        return ""
+
+    row = TripAdvisorLocation.objects.filter(city_key=city_key).first()
+    if row and (row.location_id or row.updated_at >= timezone.now() - timedelta(days=LOCATION_MISS_DAYS)):
+        return row.location_id
+
+    location_id = _get_location_id(city_name)
+    if location_id is None:
+        return None
+    TripAdvisorLocation.objects.update_or_create(
+        city_key=city_key,
+        defaults={"city_name": city_name.strip()[:255], "location_id": location_id},
+    )
+    return location_id
 
 
 def _get_location_id(city_name: str) -> str:
     """
     Search for a city and return its TripAdvisor location ID.
-    Returns empty string if not found.
+    Returns empty string if not found, None on request errors.
     """
     try:
         url = f"{BASE_URL}/location/search"
@@ -83,11 +147,11 @@ def _get_location_id(city_name: str) -> str:
             "language": "en",
         }
 
-        response = requests.get(url, headers=HEADERS, params=params, timeout=10)
+        response = call_upstream("tripadvisor", "location/search", requests.get, url, headers=HEADERS, params=params, timeout=10)
 
         if response.status_code != 200:
             print(f"TripAdvisor location search error: {response.status_code}")
-            return ""
+            return None
 
         data = response.json()
         results = data.get("data", [])
@@ -100,7 +164,7 @@ def _get_location_id(city_name: str) -> str:
 
     except Exception as exc:
         print(f"TripAdvisor location search error: {exc}")
-        return ""
+        return None
 
 
 def _normalize_tour(tour: dict, city: str) -> dict:
@@ -177,6 +241,14 @@ def _normalize_tour(tour: dict, city: str) -> dict:
     }
 
 
+def _tour_cache_key(city: str) -> str:
+    return "tripadvisor:tours:" + normalize_city(city).replace(" ", "_")
+
+
+def _stale_tour_cache_key(city: str) -> str:
+    return "stale:" + _tour_cache_key(city)
+
+
 def get_tours_cached(city: str, max_results: int = 10, force_refresh: bool = False) -> list:
     """
     Get tours for a city with caching.
@@ -185,7 +257,7 @@ def get_tours_cached(city: str, max_results: int = 10, force_refresh: bool = Fal
     - Same cache backend (Django locmem cache)
     - Key format: tripadvisor:tours:{city_slug}
     - TTL: 12 hours (tours change less often than availability)
-    - Don't cache empty results
+    - Cities without tours cached as [] for 6 hours; errors not cached
 
     Args:
         city: Destination city name
@@ -195,8 +267,7 @@ def get_tours_cached(city: str, max_results: int = 10, force_refresh: bool = Fal
     Returns:
         List of normalized tour dicts, or empty list on error
     """
-    city_slug = city.lower().replace(" ", "_").replace("-", "_")
-    cache_key = f"tripadvisor:tours:{city_slug}"
+    cache_key = _tour_cache_key(city)
 
     # Check cache first (unless force_refresh)
     if not force_refresh:
@@ -205,7 +276,16 @@ def get_tours_cached(city: str, max_results: int = 10, force_refresh: bool = Fal
             return cached_data
 
     # Fetch from TripAdvisor API
-    raw_tours = fetch_tours_from_tripadvisor(city, max_results=max_results)
+    return _store_tours(city, _fetch_attractions(city, max_results))
+
+
+def _store_tours(city: str, raw_tours) -> list:
+    """
+    Normalize and cache fetched tours. None (an API error) is not cached;
+    the last known good tours are returned instead, if any.
+    """
+    if raw_tours is None:
+        return cache.get(_stale_tour_cache_key(city)) or []
 
     # Normalize tours
     normalized_tours = []
@@ -214,17 +294,50 @@ def get_tours_cached(city: str, max_results: int = 10, force_refresh: bool = Fal
         if normalized:
             normalized_tours.append(normalized)
 
-    # Only cache non-empty results
     if normalized_tours:
-        timeout_seconds = 12 * 60 * 60  # 12 hours
-        cache.set(cache_key, normalized_tours, timeout=timeout_seconds)
-        print(f"Cached {len(normalized_tours)} tours for {city} (key: {cache_key})")
+        cache.set(_tour_cache_key(city), normalized_tours, timeout=TOUR_CACHE_HOURS * 60 * 60)
+        cache.set(_stale_tour_cache_key(city), normalized_tours, timeout=TOUR_STALE_DAYS * 24 * 60 * 60)
     else:
-        print(f"No tours found for {city} - not caching empty result")
+        cache.set(_tour_cache_key(city), [], timeout=TOUR_MISS_CACHE_HOURS * 60 * 60)
 
     return normalized_tours
 
 
+def get_tours_for_cities(cities: list, max_results: int = 10) -> dict:
+    """
+    Tours for several cities: one cache round-trip for all of them, then
+    the missing ones fetched concurrently. Location ids are resolved on the
+    calling thread (they need the DB); only the attraction requests run on
+    the pool. Returns {city: [tours]} in the order given.
+    """
+    keys = {city: _tour_cache_key(city) for city in cities}
+    cached = cache.get_many(list(keys.values()))
+    results = {city: cached[key] for city, key in keys.items() if key in cached}
+
+    missing = [city for city in cities if city not in results]
+    if missing and not TRIPADVISER_API_KEY:
+        print("TripAdvisor API key not configured")
+        missing = []
+
+    to_fetch = {}
+    for city in missing:
+        location_id = resolve_location_id(city)
+        if location_id:
+            to_fetch[city] = location_id
+        else:
+            # "" means TripAdvisor has no such city; None means the lookup failed.
+            results[city] = _store_tours(city, [] if location_id == "" else None)
+
+    if to_fetch:
+        with ThreadPoolExecutor(max_workers=min(len(to_fetch), BATCH_WORKERS)) as pool:
+            fetch = bind_api_usage_caller(lambda location_id: _fetch_location_attractions(location_id, max_results))
+            fetched = pool.map(fetch, to_fetch.values())
+            for city, raw_tours in zip(to_fetch, fetched):
+                results[city] = _store_tours(city, raw_tours)
+
+    return {city: results.get(city, []) for city in cities}
+
+
 def clear_tour_cache(city: str = None):
     """
     Clear tour cache for a specific city or all cities.
@@ -234,9 +347,7 @@ def clear_tour_cache(city: str = None):
               If None, clears all TripAdvisor tour caches.
     """
     if city:
-        city_slug = city.lower().replace(" ", "_").replace("-", "_")
-        cache_key = f"tripadvisor:tours:{city_slug}"
-        cache.delete(cache_key)
+        cache.delete(_tour_cache_key(city))
     else:
         cache.delete_pattern("tripadvisor:tours:*")
 
@@ -246,6 +357,4 @@ def is_tour_cached(city: str) -> bool:
     Check if tours are already cached for the given city.
     Returns True if cached, False otherwise.
     """
-    city_slug = city.lower().replace(" ", "_").replace("-", "_")
-    cache_key = f"tripadvisor:tours:{city_slug}"
-    return cache.get(cache_key) is not None
+    return cache.get(_tour_cache_key(city)) is not None
@@ -1,7 +1,18 @@
+import json
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.urls import reverse
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APITestCase
 
-from llm.models import ChatEntry, ChatThread, FinalTrip
+from bizbenSayahatta import circuit_breaker
+from llm.models import ApiUsageRollup, ChatEntry, ChatThread, FinalTrip, GeocodeCache, HotelDestination, HotelPrefetchRun, TripAdvisorLocation
+from llm.services import api_usage, booking_service, geocoding, hotel_cache, openai_service, trip_markdown, tripadvisor_service
+from llm.services.conversation_summary import build_history_text, update_thread_summary
+from llm.services.travel_chat import _build_route, strip_trip_sources_from_markdown
+from llm.services.prompt_context import ContextSection, build_prompt_context, estimate_tokens
 from places.models import Place
 from users.models import User, UserPreferences
 
@@ -198,3 +209,510 @@ class ChatThreadManagementTests(APITestCase):
         self.assertEqual(archive_response.status_code, 403)
         self.assertEqual(delete_response.status_code, 403)
         self.assertEqual(trip_response.status_code, 403)
+
+
+class AIResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client_patch = mock.patch.object(openai_service, "client")
+        self.openai_client = self.client_patch.start()
+        self.openai_client.responses.create.return_value = mock.Mock(output_text="Visit the Louvre.")
+
+    def tearDown(self):
+        self.client_patch.stop()
+
+    def test_normalized_repeat_prompt_is_served_from_cache(self):
+        first = openai_service.ask_travel_ai("3 days in Paris museums", context="Grounded city: Paris")
+        second = openai_service.ask_travel_ai("  3 Days in PARIS museums! ", context="Grounded city: Paris")
+
+        self.assertEqual(first, "Visit the Louvre.")
+        self.assertEqual(second, "Visit the Louvre.")
+        self.assertEqual(self.openai_client.responses.create.call_count, 1)
+
+    def test_different_context_or_opt_out_bypasses_cache(self):
+        openai_service.ask_travel_ai("3 days in Paris museums", context="Grounded city: Paris")
+        openai_service.ask_travel_ai("3 days in Paris museums", context="Grounded city: Rome")
+        openai_service.ask_travel_ai("3 days in Paris museums", context="Grounded city: Paris", use_cache=False)
+
+        self.assertEqual(self.openai_client.responses.create.call_count, 3)
+
+
+class PromptContextBudgetTests(TestCase):
+    def setUp(self):
+        self.client_patch = mock.patch.object(openai_service, "client")
+        self.openai_client = self.client_patch.start()
+        self.openai_client.responses.create.return_value = mock.Mock(output_text="Plan polished.")
+
+    def tearDown(self):
+        self.client_patch.stop()
+
+    def test_sections_are_trimmed_to_their_budgets(self):
+        places = "\n".join(f"- Place {i} (museum, 4.5) — Street {i}" for i in range(200))
+        context = build_prompt_context(
+            [
+                ContextSection("trip", "Trip context: city=Paris."),
+                ContextSection("places", places, max_tokens=100),
+                ContextSection("tours", "TOURS & ATTRACTIONS FOR PARIS:\n1. Seine cruise", max_tokens=50),
+            ],
+            total_budget=500,
+        )
+
+        self.assertTrue(context.startswith("Trip context: city=Paris."))
+        self.assertIn("- Place 0 ", context)
+        self.assertNotIn("- Place 199 ", context)
+        self.assertIn("Seine cruise", context)
+        self.assertLessEqual(estimate_tokens(context), 500)
+
+    def test_polish_prompt_drops_low_value_plan_fields(self):
+        plan = {
+            "city": "Paris",
+            "days_requested": 1,
+            "itinerary": [
+                {
+                    "day": 1,
+                    "stops": [
+                        {
+                            "name": "Louvre",
+                            "category": "museum",
+                            "lat": 48.86,
+                            "lng": 2.33,
+                            "photo_url": "https://example.com/photo.jpg",
+                            "opening_hours": {"weekday_text": ["Mon: 9-18"] * 7},
+                        }
+                    ],
+                }
+            ],
+        }
+
+        openai_service.polish_trip_plan(plan, use_cache=False)
+
+        request_input = self.openai_client.responses.create.call_args.kwargs["input"]
+        prompt = request_input[-1]["content"][0]["text"]
+        system_prompt = request_input[0]["content"][0]["text"]
+        self.assertIn('"name":"Louvre"', prompt)
+        self.assertNotIn("photo_url", prompt)
+        self.assertNotIn("weekday_text", prompt)
+        self.assertNotIn("HOTEL OPTIONS are provided", system_prompt)
+
+
+class ConversationSummaryTests(TestCase):
+    def setUp(self):
+        self.client_patch = mock.patch.object(openai_service, "client")
+        self.openai_client = self.client_patch.start()
+        self.openai_client.responses.create.return_value = mock.Mock(output_text="User plans 5 days in Rome on $2000.")
+        user = User.objects.create_user(email="summary@example.com", password="testpass123")
+        self.thread = ChatThread.objects.create(user=user, kind="ai", title="Rome")
+        self.entries = [
+            ChatEntry.objects.create(
+                thread=self.thread,
+                role="user" if index % 2 == 0 else "assistant",
+                content=f"turn {index}",
+            )
+            for index in range(10)
+        ]
+
+    def tearDown(self):
+        self.client_patch.stop()
+
+    def test_older_turns_are_folded_into_summary(self):
+        self.assertTrue(update_thread_summary(self.thread.id))
+
+        self.thread.refresh_from_db()
+        self.assertEqual(self.thread.summary, "User plans 5 days in Rome on $2000.")
+        self.assertEqual(self.thread.summary_cursor, self.entries[3].id)
+        prompt = self.openai_client.responses.create.call_args.kwargs["input"][0]["content"][0]["text"]
+        self.assertIn("turn 3", prompt)
+        self.assertNotIn("turn 4", prompt)
+
+        # Nothing new has fallen out of the recent window yet.
+        self.assertFalse(update_thread_summary(self.thread.id))
+        self.assertEqual(self.openai_client.responses.create.call_count, 1)
+
+    def test_history_uses_summary_and_latest_turns(self):
+        update_thread_summary(self.thread.id)
+        self.thread.refresh_from_db()
+
+        history = build_history_text(self.thread)
+
+        self.assertIn("User plans 5 days in Rome", history)
+        self.assertIn("assistant: turn 9", history)
+        self.assertIn("user: turn 4", history)
+        self.assertNotIn("turn 3\n", history)
+
+    @override_settings(AI_CONTEXT_TOKEN_BUDGETS={"history": 30})
+    def test_tight_history_budget_drops_oldest_turns_first(self):
+        ChatThread.objects.filter(id=self.thread.id).update(summary="Earlier: " + "Rome museums and food. " * 10)
+        self.thread.refresh_from_db()
+
+        history = build_history_text(self.thread)
+
+        self.assertLessEqual(estimate_tokens(history), 30)
+        self.assertTrue(history.startswith("Summary of earlier conversation:"))
+        self.assertTrue(history.endswith("assistant: turn 9"))
+        self.assertNotIn("turn 4", history)
+
+
+class GeocodeCacheTests(TestCase):
+    def setUp(self):
+        self.limiter_patch = mock.patch.object(geocoding.nominatim_limiter, "acquire")
+        self.limiter_patch.start()
+        self.get_patch = mock.patch.object(geocoding.requests, "get")
+        self.requests_get = self.get_patch.start()
+
+        def fake_get(url, params, headers, timeout):
+            data = [] if params["q"].startswith("nowhere") else [{"lat": "41.9", "lon": "12.49"}]
+            return mock.Mock(json=mock.Mock(return_value=data), raise_for_status=mock.Mock())
+
+        self.requests_get.side_effect = fake_get
+
+    def tearDown(self):
+        self.get_patch.stop()
+        self.limiter_patch.stop()
+
+    def test_route_geocodes_each_unique_stop_once_and_reuses_cache(self):
+        plan = {
+            "itinerary": [
+                {"day": 1, "stops": [
+                    {"name": "Colosseum", "city": "Rome", "country": "Italy"},
+                    {"name": "Nowhere Cafe", "city": "Rome", "country": "Italy"},
+                    {"name": "Known", "lat": 41.0, "lng": 12.0},
+                ]},
+                {"day": 2, "stops": [{"name": " colosseum ", "city": "ROME", "country": "Italy"}]},
+            ]
+        }
+
+        route = _build_route(plan)
+
+        self.assertEqual(self.requests_get.call_count, 2)
+        self.assertEqual([p["name"] for p in route[0]["places"]], ["Colosseum", "Known"])
+        self.assertEqual(route[1]["places"][0]["lat"], 41.9)
+        self.assertEqual(GeocodeCache.objects.count(), 2)
+        self.assertEqual(GeocodeCache.objects.filter(lat__isnull=True).count(), 1)
+
+        _build_route(plan)
+        self.assertEqual(self.requests_get.call_count, 2)
+
+
+class TripMarkdownFragmentTests(TestCase):
+    def setUp(self):
+        self.plan = {
+            "city": "Tokyo",
+            "itinerary": [
+                {"day": 1, "color_emoji": "🔴", "summary": "Temples", "stops": [{"name": "Senso-ji", "address": "Asakusa"}]},
+                {"day": 2, "color_emoji": "🔵", "summary": "Food", "stops": [{"name": "Tsukiji", "address": "Chuo"}]},
+            ],
+            "safety_tips": ["Carry cash."],
+        }
+        self.sources = {
+            "items": [{"label": "Senso-ji", "url": "https://example.com", "provider": "Google Maps"}],
+            "visa": {"status": "not_required", "label": "No visa needed", "url": ""},
+            "advisory": {"label": "Travel advisory for Japan", "url": "https://example.com/advisory"},
+        }
+
+    def test_only_changed_day_is_rerendered(self):
+        first = trip_markdown.render_trip_fragments(self.plan, self.sources)
+        full = trip_markdown.join_trip_fragments(first)
+        sections = trip_markdown.index_trip_fragments(first, full)
+        # The payload keeps digests and spans only; the text comes back out of response_markdown.
+        self.assertNotIn("Senso-ji", json.dumps(sections))
+        self.assertEqual(trip_markdown.restore_trip_fragments(sections, full), first)
+        self.plan["itinerary"][1]["stops"].append({"name": "Ginza", "address": "Chuo"})
+
+        with mock.patch.object(trip_markdown, "_render_day", wraps=trip_markdown._render_day) as render_day:
+            previous = trip_markdown.restore_trip_fragments(sections, full)
+            second = trip_markdown.render_trip_fragments(self.plan, self.sources, previous=previous)
+
+        self.assertEqual(render_day.call_count, 1)
+        self.assertEqual(second["days"][0]["markdown"], first["days"][0]["markdown"])
+        self.assertIn("- Ginza — Chuo", trip_markdown.join_trip_fragments(second))
+
+    def test_chat_copy_matches_legacy_source_stripping(self):
+        fragments = trip_markdown.render_trip_fragments(self.plan, self.sources)
+        full = trip_markdown.join_trip_fragments(fragments)
+
+        chat_copy = strip_trip_sources_from_markdown(full, trip_markdown.index_trip_fragments(fragments, full))
+
+        self.assertEqual(chat_copy, strip_trip_sources_from_markdown(full))
+        self.assertNotIn("## 📚 Sources", chat_copy)
+        self.assertIn("## ⚠️ Safety Tips for Tokyo", chat_copy)
+
+
+class HotelDestinationCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _fake_get(self, url, headers, params, timeout):
+        if url.endswith("/hotels/locations"):
+            data = [] if params["name"] == "Atlantis" else [{"dest_id": "-126693", "dest_type": "city", "label": "Rome, Italy"}]
+        else:
+            data = {"result": [{"hotel_id": 1, "hotel_name": "Hotel Roma", "min_total_price": 90}]}
+        return mock.Mock(status_code=200, json=mock.Mock(return_value=data))
+
+    def test_dest_id_is_resolved_once_per_city(self):
+        with mock.patch.object(booking_service.requests, "get", side_effect=self._fake_get) as get:
+            booking_service.search_hotels("Rome", "2026-11-01", "2026-11-03", 150)
+            booking_service.search_hotels(" rome, ", "2026-11-05", "2026-11-06", 100)
+            cache.clear()
+            hotels = booking_service.search_hotels("ROME", "2026-11-05", "2026-11-06", 100)
+            self.assertEqual(booking_service.search_hotels("Atlantis", "2026-11-05", "2026-11-06", 100), [])
+            booking_service.search_hotels("Atlantis", "2026-11-05", "2026-11-06", 100)
+
+        location_calls = [call for call in get.call_args_list if call.args[0].endswith("/hotels/locations")]
+        self.assertEqual([call.kwargs["params"]["name"] for call in location_calls], ["Rome", "Atlantis"])
+        self.assertEqual(hotels[0]["name"], "Hotel Roma")
+        search_calls = [call for call in get.call_args_list if call.args[0].endswith("/hotels/search")]
+        self.assertEqual({call.kwargs["params"]["dest_id"] for call in search_calls}, {"-126693"})
+        self.assertEqual(HotelDestination.objects.get().city_key, "rome")
+
+    def test_failed_destination_lookup_is_not_cached_as_a_miss(self):
+        down = mock.Mock(status_code=503, json=mock.Mock(return_value={}))
+        with mock.patch.object(booking_service.requests, "get", return_value=down):
+            self.assertIsNone(booking_service.resolve_destination("Rome"))
+        with mock.patch.object(booking_service.requests, "get", side_effect=self._fake_get):
+            destination = booking_service.resolve_destination("Rome")
+
+        self.assertEqual(destination, {"dest_id": "-126693", "dest_type": "city"})
+
+    def test_hotel_inventory_is_shared_across_budgets_and_styles(self):
+        inventory = [
+            {"hotel_id": i, "hotel_name": f"Hotel {price}", "min_total_price": price, "distance_to_cc": f"{dist} km"}
+            for i, (price, dist) in enumerate([(300, 1), (60, 4), (100, 2), (110, 9), (45, 0.5)], start=1)
+        ]
+
+        def fake_get(url, headers, params, timeout):
+            if url.endswith("/hotels/locations"):
+                return mock.Mock(status_code=200, json=mock.Mock(return_value=[{"dest_id": "1", "dest_type": "city"}]))
+            self.assertNotIn("price_max", params)
+            return mock.Mock(status_code=200, json=mock.Mock(return_value={"result": inventory}))
+
+        with mock.patch.object(booking_service.requests, "get", side_effect=fake_get) as get:
+            popular = hotel_cache.get_hotels_cached("Rome", "2026-11-01", "2026-11-03", 125)
+            cheapest = hotel_cache.get_hotels_cached("Rome", "2026-11-01", "2026-11-03", 120, travel_style="budget")
+            central = hotel_cache.get_hotels_cached("Rome", "2026-11-01", "2026-11-03", 120, travel_style="cultural")
+
+        self.assertEqual(get.call_count, 2)
+        self.assertTrue(hotel_cache.is_hotel_cached("Rome", "2026-11-01", "2026-11-03", 999))
+        self.assertEqual([h["name"] for h in popular], ["Hotel 60", "Hotel 100", "Hotel 110", "Hotel 45"])
+        self.assertEqual([h["name"] for h in cheapest], ["Hotel 45", "Hotel 60", "Hotel 100", "Hotel 110"])
+        self.assertEqual(central[0]["name"], "Hotel 45")
+
+    def test_prefetch_warms_upcoming_trips_within_api_budget(self):
+        from datetime import date, timedelta
+
+        from llm.services.hotel_prefetch import prefetch_hotel_prices
+
+        user = User.objects.create_user(email="prefetch@example.com", password="testpass123")
+        soon = date.today() + timedelta(days=3)
+        for city, start in (("Rome", soon), (" rome", soon), ("Paris", soon + timedelta(days=1)),
+                            ("Oslo", soon + timedelta(days=2)), ("Lima", soon + timedelta(days=90))):
+            ChatThread.objects.create(user=user, kind="ai", city=city, start_date=start, end_date=start + timedelta(days=2))
+
+        with mock.patch.object(booking_service, "search_hotel_inventory", return_value=[{"id": "1"}]) as fetch:
+            stats = prefetch_hotel_prices(max_api_calls=2)
+            self.assertEqual(stats, {"targets": 3, "warm": 0, "fetched": 2, "empty": 0, "skipped": 1})
+            stats = prefetch_hotel_prices(max_api_calls=2)
+            self.assertEqual(stats, {"targets": 3, "warm": 2, "fetched": 1, "empty": 0, "skipped": 0})
+
+        self.assertEqual([call.kwargs["city_name"] for call in fetch.call_args_list], ["Rome", "Paris", "Oslo"])
+        last_run = HotelPrefetchRun.objects.latest("created_at")
+        self.assertEqual((HotelPrefetchRun.objects.count(), last_run.warm, last_run.fetched), (2, 2, 1))
+
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(email="prefetch-admin@example.com", password="x", is_staff=True))
+        data = client.get("/api/admin/api-usage/").data
+        self.assertEqual((data["hotel_prefetch"]["warm"], data["hotel_prefetch"]["fetched"]), (2, 1))
+
+    def test_prefetch_command_refuses_a_process_local_cache(self):
+        from django.core.management import CommandError, call_command
+
+        with mock.patch.object(booking_service, "search_hotel_inventory") as fetch:
+            with self.assertRaisesMessage(CommandError, "REDIS_URL"):
+                call_command("prefetch_hotel_prices")
+            call_command("prefetch_hotel_prices", dry_run=True, stdout=mock.Mock())
+
+        fetch.assert_not_called()
+        self.assertFalse(HotelPrefetchRun.objects.exists())
+
+    def test_hotel_search_endpoint_reads_cache_once_and_enriches_top_results(self):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(email="hotels@example.com", password="testpass123"))
+        inventory = [{"id": str(i), "name": f"Hotel {i}", "price_per_night": 80.0, "distance_to_center_km": 1.0,
+                      "family_friendly": False} for i in range(4)]
+        params = {"city": "Rome", "checkin": "2026-11-01", "checkout": "2026-11-03", "budget_per_night": 100}
+
+        with mock.patch.object(booking_service, "search_hotel_inventory", return_value=inventory) as fetch, \
+                mock.patch.object(booking_service, "get_hotel_details", side_effect=lambda hotel_id: {"id": hotel_id}):
+            first = client.get("/api/places/hotels/search/", params)
+            second = client.get("/api/places/hotels/search/", {**params, "details": 2})
+
+        self.assertEqual(fetch.call_count, 1)
+        self.assertFalse(first.data["cached"])
+        self.assertTrue(second.data["cached"])
+        self.assertEqual([h.get("details") for h in second.data["hotels"]], [{"id": "0"}, {"id": "1"}, None, None])
+        self.assertEqual(second.data["filters_applied"]["price_max"], 90)
+
+        bad = client.get("/api/places/hotels/search/", {**params, "checkin": "tomorrow"})
+        self.assertEqual(bad.status_code, 400)
+
+
+class TripAdvisorCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.key_patch = mock.patch.object(tripadvisor_service, "TRIPADVISER_API_KEY", "test-key")
+        self.key_patch.start()
+
+    def tearDown(self):
+        self.key_patch.stop()
+
+    def _fake_get(self, url, headers, params, timeout):
+        if url.endswith("/location/search"):
+            data = {"data": [] if params["query"] == "Atlantis" else [{"location_id": 187791}]}
+        else:
+            data = {"data": [{"location_id": 1, "name": "Colosseum Tour"}]}
+        return mock.Mock(status_code=200, json=mock.Mock(return_value=data))
+
+    def test_location_ids_and_empty_cities_are_cached(self):
+        with mock.patch.object(tripadvisor_service.requests, "get", side_effect=self._fake_get) as get:
+            self.assertEqual(tripadvisor_service.get_tours_cached("Rome")[0]["name"], "Colosseum Tour")
+            tripadvisor_service.get_tours_cached("rome")
+            cache.clear()
+            tripadvisor_service.get_tours_cached("Rome")
+            self.assertEqual(tripadvisor_service.get_tours_cached("Atlantis"), [])
+            tripadvisor_service.get_tours_cached("Atlantis")
+
+        urls = [call.args[0].rsplit("/", 1)[-1] for call in get.call_args_list]
+        self.assertEqual(urls, ["search", "attractions", "attractions", "search"])
+        self.assertEqual(
+            dict(TripAdvisorLocation.objects.values_list("city_key", "location_id")),
+            {"rome": "187791", "atlantis": ""},
+        )
+
+    def test_api_errors_are_not_cached(self):
+        failing = mock.Mock(status_code=503, text="unavailable")
+        with mock.patch.object(tripadvisor_service.requests, "get", return_value=failing):
+            self.assertEqual(tripadvisor_service.get_tours_cached("Rome"), [])
+
+        self.assertFalse(tripadvisor_service.is_tour_cached("Rome"))
+        self.assertFalse(TripAdvisorLocation.objects.exists())
+
+
+
+class UpstreamCircuitBreakerTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.key_patch = mock.patch.object(tripadvisor_service, "TRIPADVISER_API_KEY", "test-key")
+        self.key_patch.start()
+        TripAdvisorLocation.objects.create(city_key="rome", city_name="Rome", location_id="187791")
+
+    def tearDown(self):
+        self.key_patch.stop()
+
+    def test_breaker_opens_short_circuits_and_recovers_through_a_probe(self):
+        breaker = circuit_breaker.get_breaker("tripadvisor")
+        failing = mock.Mock(status_code=503, text="unavailable")
+        ok = mock.Mock(status_code=200, json=mock.Mock(return_value={"data": [{"location_id": 1, "name": "Forum Walk"}]}))
+
+        with mock.patch.object(tripadvisor_service.requests, "get", return_value=failing) as get:
+            for _ in range(breaker.min_calls):
+                tripadvisor_service.get_tours_cached("Rome")
+            self.assertEqual(breaker.state(), circuit_breaker.STATE_OPEN)
+            self.assertEqual(tripadvisor_service.get_tours_cached("Rome"), [])
+        self.assertEqual(get.call_count, breaker.min_calls)
+
+        later = time.time() + breaker.open_seconds + 1
+        with mock.patch.object(circuit_breaker.time, "time", return_value=later):
+            self.assertEqual(breaker.state(), circuit_breaker.STATE_HALF_OPEN)
+            with mock.patch.object(tripadvisor_service.requests, "get", return_value=ok):
+                self.assertEqual(tripadvisor_service.get_tours_cached("Rome")[0]["name"], "Forum Walk")
+            self.assertEqual(breaker.state(), circuit_breaker.STATE_CLOSED)
+
+    def test_concurrent_outcomes_are_all_counted(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        breaker = circuit_breaker.CircuitBreaker("load-test", window_seconds=3600, min_calls=10_000)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for future in [pool.submit(breaker.record_failure if i % 2 else breaker.record_success) for i in range(200)]:
+                future.result()
+
+        snapshot = breaker.snapshot()
+        self.assertEqual((snapshot["calls"], snapshot["failures"]), (200, 100))
+
+    def test_last_known_good_tours_and_hotels_are_served_while_upstream_fails(self):
+        ok = mock.Mock(status_code=200, json=mock.Mock(return_value={"data": [{"location_id": 1, "name": "Forum Walk"}]}))
+        with mock.patch.object(tripadvisor_service.requests, "get", return_value=ok):
+            tripadvisor_service.get_tours_cached("Rome")
+        hotels = [{"id": "1", "name": "Hotel Roma", "price_per_night": 80}]
+        hotel_cache.cache_hotels("Rome", "2026-11-01", "2026-11-03", hotels)
+
+        # Fresh entries expire; only the stale copies remain.
+        tripadvisor_service.clear_tour_cache("Rome")
+        cache.delete(hotel_cache.build_hotel_cache_key("Rome", "2026-11-01", "2026-11-03"))
+
+        with mock.patch.object(circuit_breaker.CircuitBreaker, "allow", return_value=False), \
+                mock.patch.object(tripadvisor_service.requests, "get") as get:
+            tours = tripadvisor_service.get_tours_cached("Rome")
+            inventory, cached, _ = hotel_cache.get_hotel_inventory("Rome", "2026-11-01", "2026-11-03")
+
+        get.assert_not_called()
+        self.assertEqual(tours[0]["name"], "Forum Walk")
+        self.assertEqual(inventory, hotels)
+        self.assertTrue(cached)
+
+    def test_admin_can_list_and_reset_circuits(self):
+        breaker = circuit_breaker.get_breaker("booking")
+        for _ in range(breaker.min_calls):
+            breaker.record_failure()
+
+        self.client.force_authenticate(User.objects.create_user(email="ops@example.com", password="x", is_staff=True))
+        rows = {row["name"]: row for row in self.client.get("/api/admin/circuits/").data}
+        self.assertEqual(rows["booking"]["state"], "open")
+        self.assertEqual(rows["nominatim"]["state"], "closed")
+        self.assertEqual(rows["booking"]["scope"], "process")
+
+        response = self.client.post("/api/admin/circuits/booking/reset/")
+        self.assertEqual(response.data["state"], "closed")
+        self.assertEqual(self.client.post("/api/admin/circuits/nope/reset/").status_code, 404)
+
+
+class ApiUsageAccountingTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="usage@example.com", password="testpass123")
+        # Drop calls buffered by earlier tests that ran outside a request.
+        api_usage.flush_api_usage()
+        ApiUsageRollup.objects.all().delete()
+
+    def test_calls_are_rolled_up_per_endpoint_and_user(self):
+        hotels = {"result": [{"hotel_id": 1, "hotel_name": "Hotel Roma", "min_total_price": 160}]}
+        ok = mock.Mock(status_code=200, content=b"x" * 120, json=mock.Mock(return_value=hotels))
+        HotelDestination.objects.create(city_key="rome", city_name="Rome", dest_id="-126693")
+        params = {"city": "Rome", "checkin": "2026-11-01", "checkout": "2026-11-03", "budget_per_night": 100}
+
+        self.client.force_authenticate(self.user)
+        with mock.patch.object(booking_service.requests, "get", return_value=ok):
+            self.client.get("/api/places/hotels/search/", params)
+            self.client.get("/api/places/hotels/search/", {**params, "checkout": "2026-11-04"})
+
+        row = ApiUsageRollup.objects.get()
+        self.assertEqual((row.provider, row.operation, row.user_id), ("booking", "hotels/search", self.user.id))
+        self.assertEqual(row.endpoint, "GET /api/places/hotels/search/")
+        self.assertEqual((row.calls, row.errors, row.response_bytes, row.latency_le_100ms), (2, 0, 240, 2))
+
+    def test_openai_tokens_are_recorded_and_summed_by_the_admin_api(self):
+        response = mock.Mock(output_text="Visit the Louvre.", usage=mock.Mock(input_tokens=900, output_tokens=40))
+        with mock.patch.object(openai_service, "client") as client, api_usage.api_usage_context("test"):
+            client.responses.create.return_value = response
+            openai_service.ask_travel_ai("3 days in Paris", use_cache=False)
+            openai_service.ask_travel_ai("4 days in Paris", use_cache=False)
+
+        admin = User.objects.create_user(email="usage-admin@example.com", password="x", is_staff=True)
+        self.client.force_authenticate(admin)
+        data = self.client.get("/api/admin/api-usage/", {"group_by": "provider,endpoint"}).data
+
+        self.assertEqual(len(data["results"]), 1)
+        usage = data["results"][0]
+        self.assertEqual((usage["provider"], usage["endpoint"], usage["calls"]), ("openai", "test", 2))
+        self.assertEqual((usage["input_tokens"], usage["output_tokens"]), (1800, 80))
+        self.assertEqual(self.client.get("/api/admin/api-usage/", {"group_by": "city"}).status_code, 400)
@@ -16,7 +16,9 @@ from .serializers import (
     FinalTripUpdateSerializer,
 )
 from .models import ChatMessage, ChatThread, ChatEntry, FinalTrip
+from .services.conversation_summary import build_history_text, schedule_summary_update
 from .services.openai_service import ask_travel_ai, polish_trip_plan
+from .services.prompt_context import ContextSection, build_prompt_context
 from .services.final_trip import sync_final_trip
 from .services.travel_chat import (
     HotelSearchParams,
@@ -33,7 +35,7 @@ from .services.trip_planner import build_trip_plan
 from places.models import Place
 from users.permissions import IsActiveAndNotBlocked
 from users.models import UserPreferences
-from users.services import sync_user_travel_profile
+from users.services import get_user_travel_profile
 from .services.hotel_cache import get_hotels_cached
 from .services.tripadvisor_service import get_tours_cached
 
@@ -62,6 +64,11 @@ def _consume_tokens_or_respond(user, amount: int):
     return None
 
 
+def _ai_cache_enabled(user) -> bool:
+    preferences = getattr(user, "preferences", None)
+    return bool(getattr(preferences, "ai_response_cache", True))
+
+
 def _detect_city_from_message(message: str, fallback_city: str = "") -> str:
     text = (message or "").lower()
     if not text:
@@ -128,50 +135,37 @@ def _build_places_context_for_city(city: str) -> str:
         "Cached places:",
     ]
     for place in places:
-        lines.append(
-            (
-                f"- {place.name} | category={place.category} | rating={place.rating or 'n/a'} | "
-                f"address={place.address}"
-            )
-        )
+        details = ", ".join(str(part) for part in (place.category, place.rating) if part)
+        line = f"- {place.name} ({details})" if details else f"- {place.name}"
+        if place.address:
+            line += f" — {place.address}"
+        lines.append(line)
     return "\n".join(lines)
 
 
 def _build_hotel_context_block(hotels: list, search_params: HotelSearchParams) -> str:
     """
-    Build a formatted hotel context block for LLM injection.
-
-    Format:
-    HOTEL OPTIONS FOR {CITY} ({CHECKIN} to {CHECKOUT}):
-    Budget: ${price_min}-${price_max}/night
+    Build a compact hotel context block for LLM injection.
 
-    Option 1: {name} — ${price}/night — ⭐{rating}/10
-      Address: {address} | {distance_to_center_km}km from center
-      Highlights: {highlights joined by ", "}
-      Cancellation: {cancellation_policy}
-      Book: {booking_url}
+    Format (one line per hotel, empty fields omitted):
+    HOTEL OPTIONS FOR {CITY} ({CHECKIN} to {CHECKOUT}), budget ${min}-${max}/night:
+    1. {name} | ${price}/night | {rating}/10 | {distance}km from center | {highlights} | {cancellation} | {booking_url}
     """
     if not hotels:
         return ""
 
-    lines = []
     city = search_params.city or "Unknown city"
     checkin = search_params.checkin or "TBD"
     checkout = search_params.checkout or "TBD"
     budget = search_params.budget_per_night or 100
 
-    lines.append(f"HOTEL OPTIONS FOR {city} ({checkin} to {checkout}):")
-    lines.append(f"Budget: ${int(budget * 0.4)}-${int(budget * 0.9)}/night")
-    lines.append("")
+    lines = [
+        f"HOTEL OPTIONS FOR {city} ({checkin} to {checkout}), "
+        f"budget ${int(budget * 0.4)}-${int(budget * 0.9)}/night:"
+    ]
 
     for i, hotel in enumerate(hotels[:5], 1):
         name = hotel.get("name", "Unknown Hotel")
-        price = hotel.get("price_per_night", 0)
-        rating = hotel.get("rating", 0)
-        address = hotel.get("address", "Address not available")
-        distance = hotel.get("distance_to_center_km", 0)
-        highlights = hotel.get("highlights", [])
-        cancellation = hotel.get("cancellation_policy", "Contact for details")
         # Build booking URL with dates for real-time availability
         booking_url = hotel.get("booking_url", "")
         if not booking_url and name:
@@ -183,27 +177,29 @@ def _build_hotel_context_block(hotels: list, search_params: HotelSearchParams) -
                 checkout=search_params.checkout,
             )
 
-        highlights_str = ", ".join(highlights) if highlights else "No specific highlights"
-
-        lines.append(f"Option {i}: {name} — ${price}/night — ⭐{rating}/10")
-        lines.append(f"  Address: {address} | {distance}km from center")
-        lines.append(f"  Highlights: {highlights_str}")
-        lines.append(f"  Cancellation: {cancellation}")
-        lines.append(f"  Book: {booking_url}")
-        lines.append("")
+        parts = [f"{i}. {name}"]
+        if hotel.get("price_per_night"):
+            parts.append(f"${hotel['price_per_night']}/night")
+        if hotel.get("rating"):
+            parts.append(f"{hotel['rating']}/10")
+        if hotel.get("distance_to_center_km"):
+            parts.append(f"{hotel['distance_to_center_km']}km from center")
+        highlights = hotel.get("highlights") or []
+        if highlights:
+            parts.append(", ".join(highlights[:3]))
+        cancellation = hotel.get("cancellation_policy")
+        if cancellation and cancellation != "Contact property for details":
+            parts.append(cancellation)
+        if booking_url:
+            parts.append(booking_url)
+        lines.append(" | ".join(parts))
 
-    lines.append("(max 5 hotels shown)")
     return "\n".join(lines)
 
 
-def _recent_history_text(thread) -> str:
-    entries = list(ChatEntry.objects.filter(thread=thread).order_by("created_at")[:10])
-    return "\n".join(f"{entry.role}: {entry.content}" for entry in entries[-6:])
-
-
-def _generate_thread_trip_response(thread, user, message: str):
+def _generate_thread_trip_response(thread, user, message: str, request=None):
     UserPreferences.objects.get_or_create(user=user)
-    sync_user_travel_profile(user)
+    get_user_travel_profile(user)
 
     previous_user_count = ChatEntry.objects.filter(thread=thread, role="user").count() - 1
     all_user_text = "\n".join(
@@ -234,7 +230,7 @@ def _generate_thread_trip_response(thread, user, message: str):
     if should_generate_trip:
         try:
             payload = generate_trip_payload(
-                user=user, requirements=requirements, thread=thread
+                user=user, requirements=requirements, thread=thread, request=request
             )
         except ValueError as exc:
             if str(exc) == "no_places_for_city":
@@ -258,7 +254,9 @@ def _generate_thread_trip_response(thread, user, message: str):
             content__contains="## 📚 Sources",
         ).exists()
         chat_md = (
-            strip_trip_sources_from_markdown(full_md) if sources_already else full_md
+            strip_trip_sources_from_markdown(full_md, payload.get("markdown_sections"))
+            if sources_already
+            else full_md
         )
         return {
             "response": chat_md,
@@ -297,6 +295,11 @@ def _get_hotel_context_for_chat(user_message: str, thread=None, user=None) -> st
         fallback_duration=fallback_duration,
     )
 
+    # No dates in the message: use the thread's trip dates (the ones prefetch_hotel_prices warms)
+    if thread and not search_params.checkin and thread.start_date and thread.end_date:
+        search_params.checkin = thread.start_date.isoformat()
+        search_params.checkout = thread.end_date.isoformat()
+
     # Need at least city and dates to search hotels
     if not search_params.city or not search_params.checkin or not search_params.checkout:
         return ""
@@ -338,33 +341,22 @@ def _get_tour_context_for_chat(city: str) -> str:
     if not tours:
         return ""
 
-    lines = []
-    lines.append(f"TOURS & ATTRACTIONS FOR {city.upper()}:")
-    lines.append("")
+    lines = [f"TOURS & ATTRACTIONS FOR {city.upper()}:"]
 
     for i, tour in enumerate(tours[:5], 1):
         name = tour.get("name", "Unknown Attraction")
         category = tour.get("category") or tour.get("subcategory", "Attraction")
-        rating = tour.get("rating", 0)
-        num_reviews = tour.get("num_reviews", 0)
-        price_amount = tour.get("price_amount")
-        price_currency = tour.get("price_currency", "USD")
-        photo_url = tour.get("photo_url", "")
-        web_url = tour.get("web_url", "")
-        duration = tour.get("duration", "")
-
-        lines.append(f"Option {i}: {name} ({category})")
-        if rating:
-            lines.append(f"  Rating: {rating}/10 ({num_reviews} reviews)")
-        if price_amount:
-            lines.append(f"  Price: {price_currency} {price_amount}")
-        if duration:
-            lines.append(f"  Duration: {duration}")
-        if web_url:
-            lines.append(f"  Book: {web_url}")
-        lines.append("")
-
-    lines.append("(max 5 tours shown)")
+        parts = [f"{i}. {name} ({category})"]
+        if tour.get("rating"):
+            parts.append(f"{tour['rating']}/10, {tour.get('num_reviews', 0)} reviews")
+        if tour.get("price_amount"):
+            parts.append(f"{tour.get('price_currency', 'USD')} {tour['price_amount']}")
+        if tour.get("duration"):
+            parts.append(tour["duration"])
+        if tour.get("web_url"):
+            parts.append(tour["web_url"])
+        lines.append(" | ".join(parts))
+
     return "\n".join(lines)
 
 
@@ -373,7 +365,7 @@ class TravelChatView(APIView):
 
     def post(self, request):
         UserPreferences.objects.get_or_create(user=request.user)
-        sync_user_travel_profile(request.user)
+        get_user_travel_profile(request.user)
         serializer = ChatRequestSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=400)
@@ -389,14 +381,19 @@ class TravelChatView(APIView):
         hotel_context = _get_hotel_context_for_chat(user_message, user=request.user)
         tour_context = _get_tour_context_for_chat(detected_city)
 
-        # Build combined context from all sources
-        context = "\n\n".join(
-            part for part in [places_context, hotel_context, tour_context] if part
+        # Build combined context from all sources, each within its token budget
+        context = build_prompt_context(
+            [
+                ContextSection("places", places_context),
+                ContextSection("hotels", hotel_context),
+                ContextSection("tours", tour_context),
+            ]
         )
 
         ai_response = ask_travel_ai(
             user_message=user_message,
             context=context,
+            use_cache=_ai_cache_enabled(request.user),
         )
         sources_block = _build_sources_block(source_places)
         final_response = f"{ai_response}\n\n{sources_block}"
@@ -429,7 +426,7 @@ class TravelPlanView(APIView):
 
         data = serializer.validated_data
         try:
-            plan = build_trip_plan(user=request.user, **data)
+            plan = build_trip_plan(user=request.user, request=request, **data)
         except ValueError as exc:
             if str(exc) == "no_places_for_city":
                 return Response(
@@ -439,7 +436,7 @@ class TravelPlanView(APIView):
             raise
 
         try:
-            plan["ai_polish"] = polish_trip_plan(plan)
+            plan["ai_polish"] = polish_trip_plan(plan, use_cache=_ai_cache_enabled(request.user))
         except Exception:
             # Keep the structured response available even if LLM polish fails.
             plan["ai_polish"] = ""
@@ -535,13 +532,14 @@ class ChatEntryListCreateView(APIView):
         user_message = serializer.validated_data["message"]
         ChatEntry.objects.create(thread=thread, role="user", content=user_message)
 
-        trip_result = _generate_thread_trip_response(thread, request.user, user_message)
+        trip_result = _generate_thread_trip_response(thread, request.user, user_message, request=request)
         if trip_result is not None:
             ChatEntry.objects.create(
                 thread=thread,
                 role="assistant",
                 content=trip_result["response"],
             )
+            schedule_summary_update(thread)
             return Response(
                 {
                     "response": trip_result["response"],
@@ -562,19 +560,26 @@ class ChatEntryListCreateView(APIView):
             trip_context = (
                 f"Trip context: city={thread.city}, start={thread.start_date}, end={thread.end_date}."
             )
-        context = "\n\n".join(
-            part for part in [trip_context, places_context, hotel_context, tour_context] if part
+        context = build_prompt_context(
+            [
+                ContextSection("trip", trip_context),
+                ContextSection("places", places_context),
+                ContextSection("hotels", hotel_context),
+                ContextSection("tours", tour_context),
+            ]
         )
 
         ai_response = ask_travel_ai(
             user_message=user_message,
             context=context,
-            history=_recent_history_text(thread),
+            history=build_history_text(thread),
+            use_cache=_ai_cache_enabled(request.user),
         )
         sources_block = _build_sources_block(source_places)
         final_response = f"{ai_response}\n\n{sources_block}"
 
         ChatEntry.objects.create(thread=thread, role="assistant", content=final_response)
+        schedule_summary_update(thread)
         thread.save(update_fields=["updated_at"])
 
         return Response(
@@ -612,7 +617,7 @@ class ChatThreadPlanView(APIView):
 
         data = serializer.validated_data
         try:
-            plan = build_trip_plan(user=request.user, **data)
+            plan = build_trip_plan(user=request.user, request=request, **data)
         except ValueError as exc:
             if str(exc) == "no_places_for_city":
                 return Response(
@@ -623,7 +628,7 @@ class ChatThreadPlanView(APIView):
 
         polished_text = ""
         try:
-            polished_text = polish_trip_plan(plan)
+            polished_text = polish_trip_plan(plan, use_cache=_ai_cache_enabled(request.user))
             plan["ai_polish"] = polished_text
         except Exception:
             plan["ai_polish"] = ""
@@ -643,6 +648,7 @@ class ChatThreadPlanView(APIView):
                 or f"Generated a {full_plan.get('days_generated', '')}-day plan for {full_plan.get('city', '')}."
             ),
         )
+        schedule_summary_update(thread)
 
         return Response(full_plan, status=status.HTTP_200_OK)
 
@@ -9,112 +9,66 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
-from .services.hotel_cache import get_hotels_cached, is_hotel_cached
+from .services.booking_service import BUDGET_MAX_RATIO, BUDGET_MIN_RATIO
+from .services.hotel_search import HotelSearchParamsError, parse_hotel_search_query, search_hotels
 
 
 class HotelSearchView(APIView):
     """
-    GET /api/hotels/search/
+    GET hotel search with caching; served at /api/places/hotels/search/
+    (see places.views.HotelsSearchAPIView).
 
-    Search hotels with caching.
-    Query params: city, checkin, checkout, budget_per_night, adults, children, travel_style
+    Query params:
+    - city, checkin, checkout (YYYY-MM-DD), budget_per_night (required)
+    - adults (default 1), children (default 0)
+    - travel_style: one of 'active', 'relaxed', 'cultural', 'budget', 'family'
+    - details: fetch Booking.com details for the top N hotels (max 5)
 
     Returns:
     {
         "hotels": [...normalized hotel list...],
         "cached": true/false,
+        "cache_age_seconds": 120,
         "city": "Paris",
+        "checkin": "2026-06-01",
+        "checkout": "2026-06-05",
         "filters_applied": {
-            "price_max": 120,
-            "travel_style": "active"
+            "price_min": 48,
+            "price_max": 108,
+            "travel_style": "active",
+            "adults": 2,
+            "children": 0
         }
     }
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        # Extract query params
-        city = request.query_params.get("city", "").strip()
-        checkin = request.query_params.get("checkin", "").strip()
-        checkout = request.query_params.get("checkout", "").strip()
-        budget_per_night = request.query_params.get("budget_per_night")
-        adults = request.query_params.get("adults", "1")
-        children = request.query_params.get("children", "0")
-        travel_style = request.query_params.get("travel_style", "")
-
-        # Validate required params
-        missing_params = []
-        if not city:
-            missing_params.append("city")
-        if not checkin:
-            missing_params.append("checkin")
-        if not checkout:
-            missing_params.append("checkout")
-
-        if missing_params:
-            return Response(
-                {
-                    "error": "Missing required parameters",
-                    "missing": missing_params,
-                    "message": f"Please provide: {', '.join(missing_params)}",
-                },
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # Validate dates format (YYYY-MM-DD)
-        import re
-        date_pattern = r"^\d{4}-\d{2}-\d{2}$"
-        if not re.match(date_pattern, checkin):
-            return Response(
-                {"error": "Invalid checkin date format. Use YYYY-MM-DD."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        if not re.match(date_pattern, checkout):
-            return Response(
-                {"error": "Invalid checkout date format. Use YYYY-MM-DD."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # Parse numeric params
         try:
-            budget = float(budget_per_night) if budget_per_night else 100.0
-            adults_num = int(adults)
-            children_num = int(children)
-        except (ValueError, TypeError) as exc:
-            return Response(
-                {"error": f"Invalid numeric parameter: {exc}"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # Check if cached before fetching
-        was_cached = is_hotel_cached(city, checkin, checkout, budget, adults_num)
+            query = parse_hotel_search_query(request.query_params)
+        except HotelSearchParamsError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Fetch hotels (uses cache internally)
-        hotels = get_hotels_cached(
-            city_name=city,
-            checkin=checkin,
-            checkout=checkout,
-            budget_per_night=budget,
-            adults=adults_num,
-            children=children_num,
-            travel_style=travel_style or None,
-        )
+        result = search_hotels(query)
 
-        # Build response
-        price_max = int(budget * 0.9)
-        response_data = {
-            "hotels": hotels,
-            "cached": was_cached,
-            "city": city,
-            "checkin": checkin,
-            "checkout": checkout,
-            "filters_applied": {
-                "price_max": price_max,
-                "price_min": int(budget * 0.4),
-                "travel_style": travel_style or "default",
-                "adults": adults_num,
-                "children": children_num,
-            },
+        filters_applied = {
+            "price_min": int(query.budget_per_night * BUDGET_MIN_RATIO),
+            "price_max": int(query.budget_per_night * BUDGET_MAX_RATIO),
+            "adults": query.adults,
+            "children": query.children,
         }
-
-        return Response(response_data, status=status.HTTP_200_OK)
+        if query.travel_style:
+            filters_applied["travel_style"] = query.travel_style
+
+        return Response(
+            {
+                "hotels": result.hotels,
+                "cached": result.cached,
+                "cache_age_seconds": result.cache_age_seconds,
+                "city": query.city,
+                "checkin": query.checkin,
+                "checkout": query.checkout,
+                "filters_applied": filters_applied,
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from places.services.visits import COUNTER_FIELDS, compute_visit_counters
+
+
+class Command(BaseCommand):
+    help = "Recount users' visited-place, visited-country and map-pin counters and fix any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user-id",
+            type=int,
+            default=None,
+            help="Only reconcile this user.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drift without writing.",
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users = User.objects.only("id", *COUNTER_FIELDS).order_by("id")
+        if options["user_id"]:
+            users = users.filter(id=options["user_id"])
+
+        checked = fixed = 0
+        for user in users.iterator():
+            checked += 1
+            expected = compute_visit_counters(user.id)
+            current = {field: getattr(user, field) for field in COUNTER_FIELDS}
+            if current == expected:
+                continue
+            fixed += 1
+            self.stdout.write(f"User {user.id}: {current} -> {expected}")
+            if not options["dry_run"]:
+                User.objects.filter(pk=user.pk).update(**expected)
+
+        verb = "Would fix" if options["dry_run"] else "Fixed"
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} users. {verb} {fixed}."))
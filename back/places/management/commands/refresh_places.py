@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 
+from llm.services.api_usage import api_usage_context
 from places.services.google_places import get_places
 
 
@@ -55,16 +56,17 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING("No cities or categories provided."))
             return
 
-        for city in cities:
-            for category in categories:
-                self.stdout.write(
-                    f"Refreshing {city} / {category} (max {max_results})..."
-                )
-                get_places(
-                    city=city,
-                    category=category,
-                    max_results=max_results,
-                    force_refresh=True,
-                )
+        with api_usage_context("command:refresh_places"):
+            for city in cities:
+                for category in categories:
+                    self.stdout.write(
+                        f"Refreshing {city} / {category} (max {max_results})..."
+                    )
+                    get_places(
+                        city=city,
+                        category=category,
+                        max_results=max_results,
+                        force_refresh=True,
+                    )
 
         self.stdout.write(self.style.SUCCESS("Refresh complete."))
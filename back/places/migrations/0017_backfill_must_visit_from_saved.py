@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:05
+
+from django.db import migrations
+from django.db.models import Exists, Max, OuterRef, Subquery
+
+
+def forwards_backfill_must_visit(apps, schema_editor):
+    """
+    Give every legacy SavedPlace a MustVisitPlace twin, keeping its timestamp.
+
+    set_place_wishlist_state already writes both tables; after this backfill
+    MustVisitPlace alone describes every wishlist, which is the first step
+    towards retiring SavedPlace.
+    """
+    SavedPlace = apps.get_model("places", "SavedPlace")
+    MustVisitPlace = apps.get_model("places", "MustVisitPlace")
+
+    missing = set(
+        SavedPlace.objects.filter(
+            ~Exists(MustVisitPlace.objects.filter(user_id=OuterRef("user_id"), place_id=OuterRef("place_id")))
+        ).values_list("user_id", "place_id")
+    )
+    if not missing:
+        return
+    last_pk = MustVisitPlace.objects.aggregate(last=Max("pk"))["last"] or 0
+    MustVisitPlace.objects.bulk_create(
+        [MustVisitPlace(user_id=user_id, place_id=place_id) for user_id, place_id in missing],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    inserted = [
+        pk
+        for pk, user_id, place_id in MustVisitPlace.objects.filter(pk__gt=last_pk).values_list("pk", "user_id", "place_id")
+        if (user_id, place_id) in missing
+    ]
+    # auto_now_add stamped the new rows with "now"; restore the original save time.
+    saved_at = Subquery(
+        SavedPlace.objects.filter(user_id=OuterRef("user_id"), place_id=OuterRef("place_id")).values("created_at")[:1]
+    )
+    for start in range(0, len(inserted), 1000):
+        MustVisitPlace.objects.filter(pk__in=inserted[start:start + 1000]).update(created_at=saved_at)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0016_merge_20260226_1853'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards_backfill_must_visit, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:20
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+from django.db.models.functions import Lower
+
+
+def forwards_remove_duplicate_pins(apps, schema_editor):
+    """Keep the oldest pin of each duplicate group, then fix map_places_count."""
+    UserMapPlace = apps.get_model("places", "UserMapPlace")
+    User = apps.get_model("users", "User")
+
+    groups = (
+        UserMapPlace.objects.annotate(city_key=Lower("city"), country_key=Lower("country"))
+        .values("user_id", "city_key", "country_key", "date", "lat", "lon")
+        .annotate(keep_id=Min("id"), total=Count("id"))
+        .filter(total__gt=1)
+    )
+    affected_users = set()
+    for group in groups:
+        UserMapPlace.objects.annotate(city_key=Lower("city"), country_key=Lower("country")).filter(
+            user_id=group["user_id"],
+            city_key=group["city_key"],
+            country_key=group["country_key"],
+            date=group["date"],
+            lat=group["lat"],
+            lon=group["lon"],
+        ).exclude(id=group["keep_id"]).delete()
+        affected_users.add(group["user_id"])
+
+    for user_id in affected_users:
+        User.objects.filter(pk=user_id).update(map_places_count=UserMapPlace.objects.filter(user_id=user_id).count())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0017_backfill_must_visit_from_saved'),
+        ('users', '0010_user_visit_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards_remove_duplicate_pins, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='usermapplace',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('city'), django.db.models.functions.text.Lower('country'), models.F('date'), models.F('lat'), models.F('lon'), models.F('user'), name='places_usermapplace_unique_pin'),
+        ),
+    ]
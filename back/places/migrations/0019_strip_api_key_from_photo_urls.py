@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:45
+
+import re
+
+from django.db import migrations
+
+
+KEY_PARAM = re.compile(r"[&?]key=[^&]*")
+
+
+def forwards_strip_photo_url_keys(apps, schema_editor):
+    """Photos are served through the proxy now; drop the API key stored in Google photo URLs."""
+    Place = apps.get_model("places", "Place")
+
+    changed = []
+    rows = Place.objects.filter(photo_url__startswith="https://places.googleapis.com/", photo_url__contains="key=")
+    for place in rows.only("id", "photo_url").iterator(chunk_size=1000):
+        place.photo_url = KEY_PARAM.sub("", place.photo_url)
+        changed.append(place)
+    Place.objects.bulk_update(changed, ["photo_url"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0018_usermapplace_unique_pin'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards_strip_photo_url_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:20
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def forwards_mark_existing_details(apps, schema_editor):
+    """Existing rows were fetched with the full field mask, so their details are as fresh as cached_at."""
+    Place = apps.get_model("places", "Place")
+    Place.objects.update(details_fetched_at=F("cached_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0019_strip_api_key_from_photo_urls'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='details_fetched_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(forwards_mark_existing_details, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.utils import timezone
 from django.conf import settings
 from django.db import models
+from django.db.models.functions import Lower
 User = settings.AUTH_USER_MODEL
 
 
@@ -47,6 +48,9 @@ class Place(models.Model):
 
     # cached_at = models.DateTimeField(auto_now=True)
     cached_at = models.DateTimeField(default=timezone.now)
+    # Rating, price, hours and website come from a per-place Details call, made
+    # only when someone opens, plans or saves the place; null = never fetched.
+    details_fetched_at = models.DateTimeField(null=True, blank=True)
 
 
     class Meta:
@@ -160,6 +164,17 @@ class UserMapPlace(models.Model):
 
     class Meta:
         ordering = ("-created_at",)
+        constraints = [
+            models.UniqueConstraint(
+                Lower("city"),
+                Lower("country"),
+                "date",
+                "lat",
+                "lon",
+                "user",
+                name="places_usermapplace_unique_pin",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user} map place {self.city}, {self.country}"
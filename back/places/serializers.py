@@ -2,6 +2,7 @@ from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
 from .models import Place, MustVisitPlace, SavedPlace, UserMapPlace, VisitedPlace
+from .services.photos import place_photo_url
 
 User = get_user_model()
 
@@ -19,7 +20,20 @@ class PublicMapUserListSerializer(serializers.ModelSerializer):
         return getattr(obj, "role", None) == User.Role.TRIPADVISOR
 
 
-class PlaceSerializer(serializers.ModelSerializer):
+class PlacePhotoSerializerBase(serializers.ModelSerializer):
+    """Photo URLs point at the photo proxy: card size for photo_url, a thumbnail for lists."""
+
+    photo_url = serializers.SerializerMethodField()
+    photo_thumbnail_url = serializers.SerializerMethodField()
+
+    def get_photo_url(self, obj):
+        return place_photo_url(obj, "card", self.context.get("request"))
+
+    def get_photo_thumbnail_url(self, obj):
+        return place_photo_url(obj, "thumbnail", self.context.get("request"))
+
+
+class PlaceSerializer(PlacePhotoSerializerBase):
     is_must_visit = serializers.SerializerMethodField()
 
     def get_is_must_visit(self, obj):
@@ -48,6 +62,7 @@ class PlaceSerializer(serializers.ModelSerializer):
             "price_level",
             "opening_hours",
             "photo_url",
+            "photo_thumbnail_url",
             "website",
             "neighborhood",
             "is_must_visit",
@@ -56,7 +71,7 @@ class PlaceSerializer(serializers.ModelSerializer):
         ]
 
 
-class PlaceMapSerializer(serializers.ModelSerializer):
+class PlaceMapSerializer(PlacePhotoSerializerBase):
     is_must_visit = serializers.SerializerMethodField()
 
     def get_is_must_visit(self, obj):
@@ -88,6 +103,7 @@ class PlaceMapSerializer(serializers.ModelSerializer):
             "price_level",
             "opening_hours",
             "photo_url",
+            "photo_thumbnail_url",
             "website",
             "neighborhood",
             "is_must_visit",
@@ -96,11 +112,22 @@ class PlaceMapSerializer(serializers.ModelSerializer):
         ]
 
 
+def normalize_place_name(value):
+    """Trim and collapse inner whitespace; case is kept and compared with Lower()."""
+    return " ".join(str(value or "").split())
+
+
 class UserMapPlaceSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserMapPlace
         fields = ["id", "city", "country", "date", "lat", "lon", "created_at"]
 
+    def validate_city(self, value):
+        return normalize_place_name(value)
+
+    def validate_country(self, value):
+        return normalize_place_name(value)
+
 
 class PublicUserMapPlaceSerializer(serializers.ModelSerializer):
     """Map place for public view — no dates or time-related fields."""
@@ -127,3 +154,25 @@ class PublicVisitedPlaceSerializer(serializers.ModelSerializer):
     class Meta:
         model = VisitedPlace
         fields = ["id", "place_id", "place"]
+
+
+BULK_MAX_PLACES = 500
+
+
+class BulkWishlistSerializer(serializers.Serializer):
+    place_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BULK_MAX_PLACES,
+    )
+    is_must_visit = serializers.BooleanField(default=True)
+
+
+class BulkVisitedItemSerializer(serializers.Serializer):
+    place_id = serializers.IntegerField(min_value=1)
+    visited_at = serializers.DateTimeField(required=False, allow_null=True, default=None)
+
+
+class BulkVisitedSerializer(serializers.Serializer):
+    places = BulkVisitedItemSerializer(many=True, allow_empty=False, max_length=BULK_MAX_PLACES)
+    visited = serializers.BooleanField(default=True)
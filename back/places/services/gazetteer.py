@@ -0,0 +1,35 @@
+"""
+Known-city gazetteer.
+
+Cities we hold places for, keyed by normalized name. Used to decide
+whether free text (a search box, a tours request) names a city before
+spending a TripAdvisor lookup on it.
+"""
+
+from django.core.cache import cache
+
+from places.models import Place
+
+
+CACHE_KEY = "places:gazetteer:cities"
+CACHE_MINUTES = 60  # New cities only appear after a places refresh
+
+
+def normalize_city_name(value):
+    return " ".join(str(value or "").lower().replace("-", " ").replace("_", " ").split())
+
+
+def known_cities():
+    """{normalized name: display name} for every city with places."""
+    cities = cache.get(CACHE_KEY)
+    if cities is None:
+        cities = {}
+        for city in Place.objects.exclude(city="").values_list("city", flat=True).distinct().order_by("city"):
+            cities.setdefault(normalize_city_name(city), city.strip())
+        cache.set(CACHE_KEY, cities, timeout=CACHE_MINUTES * 60)
+    return cities
+
+
+def resolve_city(value):
+    """Display name of a known city, or None."""
+    return known_cities().get(normalize_city_name(value))
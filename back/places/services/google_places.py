@@ -1,14 +1,47 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
 import requests
 from django.conf import settings
 from places.services.cache import get_cached_places
 from django.utils import timezone
 from django.db.models import Q
 from places.models import Place
+from bizbenSayahatta.circuit_breaker import CircuitOpenError, get_breaker
+from llm.services.api_usage import bind_api_usage_caller, call_upstream
+from places.services.photos import google_photo_media_url
+
 
+logger = logging.getLogger(__name__)
 
 GOOGLE_PLACES_TEXT_SEARCH_URL = (
     "https://places.googleapis.com/v1/places:searchText"
 )
+GOOGLE_PLACE_DETAILS_URL = "https://places.googleapis.com/v1/places/{place_id}"
+
+# Discovery asks only for fields billed at the cheaper Text Search SKU.
+LIST_FIELD_MASK = (
+    "places.id,"
+    "places.displayName,"
+    "places.types,"
+    "places.formattedAddress,"
+    "places.location,"
+    "places.photos,"
+    "places.addressComponents"
+)
+# Enterprise-SKU fields, fetched per place with Place Details only when a
+# user opens, plans or saves it (see ensure_places_details).
+DETAIL_FIELD_MASK = "rating,userRatingCount,priceLevel,regularOpeningHours,websiteUri"
+DETAIL_FIELDS = {
+    "rating": "rating",
+    "userRatingCount": "user_ratings_total",
+    "priceLevel": "price_level",
+    "regularOpeningHours": "opening_hours",
+    "websiteUri": "website",
+}
+DETAILS_MAX_AGE_DAYS = 30
+DETAILS_WORKERS = 4
 
 
 def fetch_places_from_google(
@@ -16,6 +49,7 @@ def fetch_places_from_google(
     city: str,
     category: str,
     max_results: int = 10,
+    field_mask: str = LIST_FIELD_MASK,
 ):
     """
     Fetch places from Google Places API (New)
@@ -26,20 +60,7 @@ def fetch_places_from_google(
         "Content-Type": "application/json",
         "X-Goog-Api-Key": settings.GOOGLE_MAPS_API_KEY,
         # VERY IMPORTANT: request only fields you need (cheaper)
-        "X-Goog-FieldMask": (
-            "places.id,"
-            "places.displayName,"
-            "places.types,"
-            "places.rating,"
-            "places.userRatingCount,"
-            "places.formattedAddress,"
-            "places.location,"
-            "places.priceLevel,"
-            "places.regularOpeningHours,"
-            "places.photos,"
-            "places.websiteUri,"
-            "places.addressComponents"
-        ),
+        "X-Goog-FieldMask": field_mask,
     }
 
     body = {
@@ -47,7 +68,10 @@ def fetch_places_from_google(
         "maxResultCount": max_results,
     }
 
-    response = requests.post(
+    response = call_upstream(
+        "google_places",
+        "places:searchText",
+        requests.post,
         GOOGLE_PLACES_TEXT_SEARCH_URL,
         headers=headers,
         json=body,
@@ -60,15 +84,75 @@ def fetch_places_from_google(
     return data.get("places", [])
 
 
+def fetch_place_details(google_place_id: str) -> dict:
+    """Detail-tier fields of one place (Place Details API); raises on errors."""
+    response = call_upstream(
+        "google_places",
+        "places:details",
+        requests.get,
+        GOOGLE_PLACE_DETAILS_URL.format(place_id=google_place_id),
+        headers={
+            "X-Goog-Api-Key": settings.GOOGLE_MAPS_API_KEY,
+            "X-Goog-FieldMask": DETAIL_FIELD_MASK,
+        },
+        timeout=10,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def _detail_values(data: dict) -> dict:
+    # A field missing from a Details response means Google has no value.
+    return {field: data.get(key) for key, field in DETAIL_FIELDS.items()}
+
+
+def _fetch_details_or_none(google_place_id: str):
+    try:
+        return fetch_place_details(google_place_id)
+    except (CircuitOpenError, requests.RequestException, ValueError) as exc:
+        logger.warning("Place Details failed for %s: %s", google_place_id, exc)
+        return None
+
+
+def ensure_places_details(places, max_age_days=None):
+    """
+    Fill rating, price, hours and website on places whose details are missing
+    or older than max_age_days, updating the instances in place. Best effort:
+    places whose fetch fails keep their current values. Returns places.
+    """
+    max_age_days = max_age_days or int(getattr(settings, "PLACE_DETAILS_MAX_AGE_DAYS", DETAILS_MAX_AGE_DAYS))
+    cutoff = timezone.now() - timedelta(days=max_age_days)
+    stale = [p for p in places if p.details_fetched_at is None or p.details_fetched_at < cutoff]
+    if not stale or not settings.GOOGLE_MAPS_API_KEY or get_breaker("google_places").is_open():
+        return places
+
+    # HTTP on the pool, DB writes on the calling thread.
+    with ThreadPoolExecutor(max_workers=min(len(stale), DETAILS_WORKERS)) as pool:
+        results = list(pool.map(bind_api_usage_caller(_fetch_details_or_none), [p.google_place_id for p in stale]))
+
+    now = timezone.now()
+    for place, data in zip(stale, results):
+        if data is None:
+            continue
+        values = _detail_values(data)
+        for field, value in values.items():
+            setattr(place, field, value)
+        place.details_fetched_at = now
+        Place.objects.filter(pk=place.pk).update(**values, details_fetched_at=now)
+    return places
+
+
+def ensure_place_details_for_ids(place_ids):
+    """Background-job entry point: ensure_places_details for place ids."""
+    ensure_places_details(list(Place.objects.filter(pk__in=place_ids)))
+
+
 def _build_photo_url(photo, *, max_width=800, max_height=800):
     name = photo.get("name")
     if not name:
         return None
-    return (
-        f"https://places.googleapis.com/v1/{name}/media"
-        f"?maxHeightPx={max_height}&maxWidthPx={max_width}"
-        f"&key={settings.GOOGLE_MAPS_API_KEY}"
-    )
+    # No API key here: clients load photos through the photo proxy.
+    return google_photo_media_url(name, max_width=max_width, max_height=max_height)
 
 
 def _extract_country(place):
@@ -125,6 +209,10 @@ def _extract_city(place):
 
 
 def save_places_to_db(places_data, city: str, category: str):
+    """
+    Upsert list-tier results. Detail-tier fields are only written when the
+    payload carries them, so list refreshes never wipe fetched details.
+    """
     saved_places = []
 
     for place in places_data:
@@ -133,19 +221,18 @@ def save_places_to_db(places_data, city: str, category: str):
         photo_url = _build_photo_url(photos[0]) if photos else None
         extracted_city = _extract_city(place) or city
         extracted_country = _extract_country(place) or ""
+        details = {}
+        if any(key in place for key in DETAIL_FIELDS):
+            details = {**_detail_values(place), "details_fetched_at": timezone.now()}
 
         obj, _ = Place.objects.update_or_create(
             google_place_id=place["id"],
             defaults={
+                **details,
                 "name": place["displayName"]["text"],
                 "category": category,
                 "types": place.get("types", []),
-                "rating": place.get("rating"),
-                "user_ratings_total": place.get("userRatingCount"),
-                "price_level": place.get("priceLevel"),
-                "opening_hours": place.get("regularOpeningHours"),
                 "photo_url": photo_url,
-                "website": place.get("websiteUri"),
                 "neighborhood": _extract_neighborhood(place),
                 "address": place.get("formattedAddress", ""),
                 "city": city,
@@ -164,11 +251,9 @@ def get_places(city: str, category: str, max_results=10, force_refresh=False):
     cached = get_cached_places(city, category)
 
     if cached.exists() and not force_refresh:
+        # List-tier fields only; detail fields are filled lazily per place.
         missing_fields = cached.filter(
-            Q(price_level__isnull=True)
-            | Q(opening_hours__isnull=True)
-            | Q(photo_url__isnull=True)
-            | Q(website__isnull=True)
+            Q(photo_url__isnull=True)
             | Q(neighborhood__isnull=True)
             | Q(country__isnull=True)
             | Q(country__exact="")
@@ -176,11 +261,17 @@ def get_places(city: str, category: str, max_results=10, force_refresh=False):
         if not missing_fields:
             return cached
 
-    data = fetch_places_from_google(
-        city=city,
-        category=category,
-        max_results=max_results,
-    )
+    try:
+        data = fetch_places_from_google(
+            city=city,
+            category=category,
+            max_results=max_results,
+        )
+    except (CircuitOpenError, requests.RequestException):
+        # Google is failing: serve the rows we already have, even if incomplete.
+        if cached.exists():
+            return cached
+        raise
 
     places = save_places_to_db(data, city, category)
 
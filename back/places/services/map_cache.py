@@ -0,0 +1,87 @@
+"""
+Travel map payload cache.
+
+Public/shared map payloads are cached per user under User.map_version,
+which is rotated in the DB on any map pin, visited place, preference or
+user change (see users/signals.py). Each cached entry carries a strong
+ETag so repeat viewers get 304 Not Modified.
+
+Access (active, public flag, share token, privacy toggles) is always
+checked against the DB with one user+preferences query: the cache backend
+may be per-process, and a revoked link must stop working on every worker
+at once. Only the payloads are cached; a rotated version orphans them
+everywhere.
+"""
+
+import hashlib
+import json
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.utils.encoders import JSONEncoder
+
+
+CACHE_HOURS = 1  # Place rows (names, coordinates) shown on the map are not versioned
+
+
+def _payload_key(user_id, version, variant):
+    return f"map:payload:{user_id}:{version}:{variant}"
+
+
+def _timeout():
+    return CACHE_HOURS * 60 * 60
+
+
+def invalidate_user_map(*user_ids):
+    """Rotate map_version; payloads cached under the old version are never read again."""
+    user_ids = [user_id for user_id in user_ids if user_id]
+    if user_ids:
+        get_user_model().objects.filter(pk__in=user_ids).update(map_version=uuid.uuid4())
+
+
+def map_snapshot_queryset():
+    return get_user_model().objects.select_related("preferences")
+
+
+def get_map_snapshot(target):
+    """Access fields and current map_version of target (loaded with map_snapshot_queryset), or None."""
+    if not target:
+        return None
+    prefs = getattr(target, "preferences", None)
+    return {
+        "version": target.map_version.hex,
+        "user_id": target.id,
+        "active": bool(target.is_active and target.deleted_at is None),
+        "is_map_public": bool(target.is_map_public),
+        "map_share_token": target.map_share_token or "",
+        "has_prefs": prefs is not None,
+        "share_map": bool(prefs and prefs.share_map),
+        "share_visited_places": bool(prefs and prefs.share_visited_places),
+        "share_badges": bool(prefs and prefs.share_badges),
+    }
+
+
+def compute_etag(payload):
+    raw = json.dumps(payload, cls=JSONEncoder, sort_keys=True, separators=(",", ":"))
+    return '"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def get_or_build_payload(snapshot, variant, builder):
+    """Return (payload, etag) for this user/version/variant, building on a miss."""
+    key = _payload_key(snapshot["user_id"], snapshot["version"], variant)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached["payload"], cached["etag"]
+    payload = builder()
+    etag = compute_etag(payload)
+    cache.set(key, {"payload": payload, "etag": etag}, timeout=_timeout())
+    return payload, etag
+
+
+def if_none_match(request, etag):
+    header = request.META.get("HTTP_IF_NONE_MATCH", "")
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or etag in candidates
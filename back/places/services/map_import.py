@@ -0,0 +1,93 @@
+"""
+Parsing for travel-map pin imports.
+
+Accepts what other travel apps export:
+  - a JSON list of {city, country, date, lat, lon}, or {"places": [...]}
+  - a GeoJSON FeatureCollection of Points (city/country/date in properties)
+  - CSV with a header row containing city, country, date, lat, lon
+    (lng/longitude/latitude are accepted as aliases)
+
+Rows come back as plain dicts for UserMapPlaceSerializer to validate
+and normalize.
+"""
+
+import csv
+import io
+import json
+
+
+MAX_IMPORT_ROWS = 2000
+
+COLUMN_ALIASES = {
+    "lng": "lon",
+    "long": "lon",
+    "longitude": "lon",
+    "latitude": "lat",
+    "visited": "date",
+    "visited_at": "date",
+}
+
+
+class MapImportError(ValueError):
+    pass
+
+
+def _normalize_row(row):
+    out = {}
+    for key, value in row.items():
+        key = str(key or "").strip().lower()
+        out[COLUMN_ALIASES.get(key, key)] = value
+    return out
+
+
+def _from_geojson(data):
+    rows = []
+    for feature in data.get("features") or []:
+        geometry = feature.get("geometry") or {}
+        coordinates = geometry.get("coordinates") or []
+        if geometry.get("type") != "Point" or len(coordinates) < 2:
+            rows.append({})  # Reported as an invalid row, keeps row numbers aligned
+            continue
+        properties = _normalize_row(feature.get("properties") or {})
+        rows.append({**properties, "lon": coordinates[0], "lat": coordinates[1]})
+    return rows
+
+
+def _from_json(data):
+    if isinstance(data, dict) and data.get("type") == "FeatureCollection":
+        return _from_geojson(data)
+    if isinstance(data, dict):
+        data = data.get("places")
+    if not isinstance(data, list):
+        raise MapImportError("Expected a list of places, {\"places\": [...]} or a GeoJSON FeatureCollection.")
+    return [_normalize_row(row) if isinstance(row, dict) else {} for row in data]
+
+
+def _from_csv(text):
+    reader = csv.DictReader(io.StringIO(text))
+    return [_normalize_row(row) for row in reader]
+
+
+def parse_map_import(request):
+    """Return the raw rows of an uploaded file or JSON body."""
+    upload = request.FILES.get("file")
+    if upload is None:
+        rows = _from_json(request.data)
+    else:
+        try:
+            text = upload.read().decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise MapImportError("File must be UTF-8 encoded.")
+        if upload.name.lower().endswith(".csv"):
+            rows = _from_csv(text)
+        else:
+            try:
+                rows = _from_json(json.loads(text))
+            except json.JSONDecodeError:
+                raise MapImportError("File is neither valid JSON/GeoJSON nor a .csv file.")
+
+    if not rows:
+        raise MapImportError("No places found in the import.")
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise MapImportError(f"Too many places; the limit is {MAX_IMPORT_ROWS} per import.")
+    return rows
@@ -0,0 +1,112 @@
+"""
+Slippy-map (z/x/y) tiling for travel map markers.
+
+Markers are filtered to the tile's bounding box in SQL, clustered on a
+fixed grid below CLUSTER_MAX_ZOOM, and encoded either as GeoJSON or as
+a packed little-endian float32 array (lng, lat, count per marker).
+"""
+
+import base64
+import math
+import sys
+from array import array
+
+
+MAX_ZOOM = 20
+CLUSTER_MAX_ZOOM = 11  # At z >= 12 a tile spans a few km; send individual markers
+CLUSTER_GRID = 8  # Cells per tile side (32px on a 256px tile)
+PACKED_FIELDS = ["lng", "lat", "count"]
+ENCODINGS = ("geojson", "packed")
+
+
+def is_valid_tile(z, x, y):
+    if z < 0 or z > MAX_ZOOM:
+        return False
+    limit = 2 ** z
+    return 0 <= x < limit and 0 <= y < limit
+
+
+def _tile_lng(x, z):
+    return x / 2 ** z * 360.0 - 180.0
+
+
+def _tile_lat(y, z):
+    n = math.pi - 2.0 * math.pi * y / 2 ** z
+    return math.degrees(math.atan(math.sinh(n)))
+
+
+def tile_bbox(z, x, y):
+    """(west, south, east, north) in degrees for a Web Mercator tile."""
+    return _tile_lng(x, z), _tile_lat(y + 1, z), _tile_lng(x + 1, z), _tile_lat(y, z)
+
+
+def _tile_fraction(lat, lng, z):
+    """Fractional tile coordinates of a point at zoom z."""
+    n = 2 ** z
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    fx = (lng + 180.0) / 360.0 * n
+    fy = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+    return fx, fy
+
+
+def cluster_markers(markers, z, x, y):
+    """
+    Group markers into CLUSTER_GRID x CLUSTER_GRID cells of the tile.
+    Returns dicts with lat, lng (centroid), count, name, country.
+    """
+    if z > CLUSTER_MAX_ZOOM:
+        return [{**marker, "count": 1} for marker in markers]
+
+    cells = {}
+    for marker in markers:
+        fx, fy = _tile_fraction(marker["lat"], marker["lng"], z)
+        cell = (
+            min(max(int((fx - x) * CLUSTER_GRID), 0), CLUSTER_GRID - 1),
+            min(max(int((fy - y) * CLUSTER_GRID), 0), CLUSTER_GRID - 1),
+        )
+        bucket = cells.get(cell)
+        if bucket is None:
+            cells[cell] = {**marker, "count": 1}
+            continue
+        count = bucket["count"]
+        bucket["lat"] = (bucket["lat"] * count + marker["lat"]) / (count + 1)
+        bucket["lng"] = (bucket["lng"] * count + marker["lng"]) / (count + 1)
+        bucket["count"] = count + 1
+        if bucket["country"] != marker["country"]:
+            bucket["country"] = ""
+
+    clusters = []
+    for bucket in cells.values():
+        if bucket["count"] > 1:
+            bucket["name"] = f"{bucket['count']} places"
+        clusters.append(bucket)
+    return clusters
+
+
+def to_geojson(markers):
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [round(m["lng"], 6), round(m["lat"], 6)]},
+                "properties": {"name": m["name"], "country": m["country"], "count": m["count"]},
+            }
+            for m in markers
+        ],
+    }
+
+
+def to_packed(markers):
+    """Names are dropped; clients use GeoJSON when they need labels."""
+    values = array("f")
+    for marker in markers:
+        values.extend((marker["lng"], marker["lat"], marker["count"]))
+    if sys.byteorder != "little":
+        values.byteswap()
+    return {
+        "encoding": "float32le",
+        "fields": PACKED_FIELDS,
+        "count": len(markers),
+        "data": base64.b64encode(values.tobytes()).decode("ascii"),
+    }
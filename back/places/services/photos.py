@@ -0,0 +1,144 @@
+"""
+Google Places photo proxy.
+
+Place.photo_url stores the Google media URL without the API key. Clients
+get proxy URLs instead (place_photo_url); the first request for a photo
+fetches it from Google once, stores every variant in default storage under
+a hash of the photo name, and later requests are served from storage.
+Proxy URLs carry that hash as ?v=, so a place whose photo changes gets a
+new URL; versioned responses are immutable and cached for a year, while
+unversioned or outdated ones must be revalidated. Local files are
+streamed by the view; remote storages (Cloudinary) get a redirect to the
+file's own URL.
+"""
+
+import hashlib
+import re
+from io import BytesIO
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.urls import reverse
+from PIL import Image, ImageOps
+
+from llm.services.api_usage import call_upstream
+
+
+GOOGLE_PHOTO_MEDIA_URL = "https://places.googleapis.com/v1/{name}/media"
+GOOGLE_PHOTO_NAME = re.compile(r"^https://places\.googleapis\.com/v1/(places/[^/?]+/photos/[^/?]+)/media")
+
+PHOTO_VARIANTS = {  # Longest side in px; "full" is what Google is asked for
+    "thumbnail": 160,
+    "card": 480,
+    "full": 800,
+}
+DEFAULT_VARIANT = "card"
+PHOTO_STORAGE_DIR = "place_photos"
+JPEG_QUALITY = 82
+PHOTO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PHOTO_REVALIDATE_CACHE_CONTROL = "public, no-cache"
+PHOTO_VERSION_LENGTH = 12
+PHOTO_STORED_TTL = 24 * 60 * 60  # Skips the storage exists() round trip for known photos
+
+
+class PhotoUnavailableError(Exception):
+    pass
+
+
+def google_photo_media_url(name, *, max_width=800, max_height=800):
+    """Keyless media URL stored on Place; the key is only added server-side."""
+    return f"{GOOGLE_PHOTO_MEDIA_URL.format(name=name)}?maxHeightPx={max_height}&maxWidthPx={max_width}"
+
+
+def google_photo_name(photo_url):
+    match = GOOGLE_PHOTO_NAME.match(photo_url or "")
+    return match.group(1) if match else None
+
+
+def photo_key(name):
+    return hashlib.sha256(name.encode("utf-8")).hexdigest()
+
+
+def photo_version(place):
+    name = google_photo_name(place.photo_url)
+    return photo_key(name)[:PHOTO_VERSION_LENGTH] if name else None
+
+
+def variant_path(key, variant):
+    return f"{PHOTO_STORAGE_DIR}/{key[:2]}/{key}/{variant}.jpg"
+
+
+def is_remote_storage():
+    return not isinstance(default_storage, FileSystemStorage)
+
+
+def place_photo_url(place, variant=DEFAULT_VARIANT, request=None):
+    """Proxy URL for Google photos; other photo URLs are returned unchanged."""
+    version = photo_version(place)
+    if not version:
+        return place.photo_url
+    path = f"{reverse('place-photo', args=[place.id])}?size={variant}&v={version}"
+    if request is not None:
+        return request.build_absolute_uri(path)
+    return f"{getattr(settings, 'BACKEND_PUBLIC_URL', '')}{path}"
+
+
+def _render_variants(content):
+    try:
+        image = Image.open(BytesIO(content))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+    except Exception as exc:
+        raise PhotoUnavailableError(f"Unreadable photo: {exc}")
+
+    variants = {}
+    for variant, size in PHOTO_VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        resized.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        variants[variant] = buffer.getvalue()
+    return variants
+
+
+def _fetch_google_photo(name):
+    size = PHOTO_VARIANTS["full"]
+    try:
+        response = call_upstream(
+            "google_places",
+            "photo/media",
+            requests.get,
+            GOOGLE_PHOTO_MEDIA_URL.format(name=name),
+            params={"maxWidthPx": size, "maxHeightPx": size, "key": settings.GOOGLE_MAPS_API_KEY},
+            timeout=10,
+        )
+    except requests.RequestException as exc:
+        raise PhotoUnavailableError(f"Google photo fetch failed: {exc}")
+    if response.status_code != 200:
+        raise PhotoUnavailableError(f"Google photo fetch failed: HTTP {response.status_code}")
+    return response.content
+
+
+def get_place_photo(place, variant=DEFAULT_VARIANT):
+    """
+    Return (storage path, etag) of a stored variant, fetching from Google
+    and rendering all variants on first use. Raises PhotoUnavailableError,
+    or CircuitOpenError while Google is failing.
+    """
+    name = google_photo_name(place.photo_url)
+    if not name:
+        raise PhotoUnavailableError("Place has no Google photo.")
+
+    key = photo_key(name)
+    path = variant_path(key, variant)
+    stored_key = f"place_photo:{key}"
+    if not cache.get(stored_key):
+        if not default_storage.exists(path):
+            for rendered_variant, data in _render_variants(_fetch_google_photo(name)).items():
+                rendered_path = variant_path(key, rendered_variant)
+                if not default_storage.exists(rendered_path):
+                    default_storage.save(rendered_path, ContentFile(data))
+        cache.set(stored_key, True, timeout=PHOTO_STORED_TTL)
+    return path, f'"{key[:32]}-{variant}"'
@@ -1,10 +1,35 @@
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from bizbenSayahatta.background import run_in_background
 from places.models import MustVisitPlace, Place, SavedPlace
+from places.services.google_places import ensure_place_details_for_ids
+
+
+# Newly saved places whose details are prefetched per bulk call; PlaceDetailAPIView fetches the rest on open.
+BULK_DETAILS_PREFETCH_MAX = 20
+
+
+def _bump_saves_count(place_id, delta):
+    """
+    Adjust saves_count in one UPDATE instead of locking the Place row.
+    Called only when the SavedPlace insert/delete actually happened, so
+    concurrent toggles on a popular place no longer queue behind each other.
+    """
+    queryset = Place.objects.filter(pk=place_id)
+    if delta < 0:
+        queryset = queryset.filter(saves_count__gt=0)
+    queryset.update(saves_count=F("saves_count") + delta)
+
+
+def _current_saves_count(place_id):
+    return Place.objects.filter(pk=place_id).values_list("saves_count", flat=True).get()
 
 
 @transaction.atomic
 def save_place_for_user(user, place_id):
-    place = Place.objects.select_for_update().get(id=place_id)
+    place = Place.objects.only("id").get(id=place_id)
 
     saved, created = SavedPlace.objects.get_or_create(
         user=user,
@@ -12,8 +37,7 @@ def save_place_for_user(user, place_id):
     )
 
     if created:
-        place.saves_count += 1
-        place.save(update_fields=["saves_count"])
+        _bump_saves_count(place.id, 1)
 
     return saved
 
@@ -24,20 +48,93 @@ def set_place_wishlist_state(*, user, place_id, is_favorited):
     Keep legacy SavedPlace rows and the newer MustVisitPlace rows in sync.
     User-facing wishlist/favorites should behave like a single concept.
     """
-    place = Place.objects.select_for_update().get(id=place_id)
+    place = Place.objects.only("id").get(id=place_id)
 
     if is_favorited:
         MustVisitPlace.objects.get_or_create(user=user, place=place)
         _, saved_created = SavedPlace.objects.get_or_create(user=user, place=place)
         if saved_created:
-            place.saves_count += 1
-            place.save(update_fields=["saves_count"])
-        return {"id": place.id, "is_must_visit": True, "saves_count": place.saves_count}
+            _bump_saves_count(place.id, 1)
+        run_in_background(ensure_place_details_for_ids, [place.id])
+        return {"id": place.id, "is_must_visit": True, "saves_count": _current_saves_count(place.id)}
 
     MustVisitPlace.objects.filter(user=user, place=place).delete()
     saved_deleted, _ = SavedPlace.objects.filter(user=user, place=place).delete()
-    if saved_deleted and place.saves_count > 0:
-        place.saves_count -= 1
-        place.save(update_fields=["saves_count"])
+    if saved_deleted:
+        _bump_saves_count(place.id, -1)
+
+    return {"id": place.id, "is_must_visit": False, "saves_count": _current_saves_count(place.id)}
+
+
+@transaction.atomic
+def bulk_set_wishlist_state(*, user, place_ids, is_favorited):
+    """
+    set_place_wishlist_state for many places: a few set-based queries and
+    one saves_count UPDATE, whatever the number of places.
+    saves_count only moves for SavedPlace rows this call actually inserted
+    or deleted, so a concurrent toggle of the same place is never counted twice.
+    Returns the ids of places whose state changed.
+    """
+    place_ids = set(Place.objects.filter(pk__in=place_ids).values_list("pk", flat=True))
+
+    if is_favorited:
+        MustVisitPlace.objects.bulk_create(
+            [MustVisitPlace(user=user, place_id=pk) for pk in place_ids],
+            ignore_conflicts=True,
+        )
+        saved_ids = set(
+            SavedPlace.objects.filter(user=user, place_id__in=place_ids).values_list("place_id", flat=True)
+        )
+        changed = _create_saved_places(user, sorted(place_ids - saved_ids))
+        Place.objects.filter(pk__in=changed).update(saves_count=F("saves_count") + 1)
+        if changed:
+            run_in_background(ensure_place_details_for_ids, changed[:BULK_DETAILS_PREFETCH_MAX])
+        return changed
+
+    MustVisitPlace.objects.filter(user=user, place_id__in=place_ids).delete()
+    # Lock the rows first: a concurrent delete then finds nothing and does not decrement.
+    changed = sorted(
+        SavedPlace.objects.select_for_update()
+        .filter(user=user, place_id__in=place_ids)
+        .values_list("place_id", flat=True)
+    )
+    SavedPlace.objects.filter(user=user, place_id__in=changed).delete()
+    Place.objects.filter(pk__in=changed, saves_count__gt=0).update(saves_count=F("saves_count") - 1)
+    return changed
+
+
+def _create_saved_places(user, place_ids):
+    """
+    Insert SavedPlace rows and return the place ids actually inserted.
+    One bulk INSERT normally; if another request saved one of the places
+    in the meantime, fall back to row-by-row inserts that skip it.
+    """
+    try:
+        with transaction.atomic():
+            SavedPlace.objects.bulk_create([SavedPlace(user=user, place_id=pk) for pk in place_ids])
+        return place_ids
+    except IntegrityError:
+        return [pk for pk in place_ids if SavedPlace.objects.get_or_create(user=user, place_id=pk)[1]]
 
-    return {"id": place.id, "is_must_visit": False, "saves_count": place.saves_count}
+
+def wishlist_places_queryset(user, category=None):
+    """
+    Places on the user's wishlist, newest first, as one query.
+
+    Each place is favorited through MustVisitPlace, legacy SavedPlace, or
+    both. Only the user's own place ids are scanned; wishlisted_at is the
+    later of the two rows, so duplicates never arise and
+    ordering/filtering/pagination happen in SQL.
+    """
+    must_visit = MustVisitPlace.objects.filter(user=user)
+    saved = SavedPlace.objects.filter(user=user)
+    must_visit_at = Subquery(must_visit.filter(place=OuterRef("pk")).values("created_at")[:1])
+    saved_at = Subquery(saved.filter(place=OuterRef("pk")).values("created_at")[:1])
+    queryset = (
+        Place.objects.filter(Q(pk__in=must_visit.values("place_id")) | Q(pk__in=saved.values("place_id")))
+        .annotate(wishlisted_at=Greatest(Coalesce(must_visit_at, saved_at), Coalesce(saved_at, must_visit_at)))
+        .order_by("-wishlisted_at", "-id")
+    )
+    if category and category.lower() != "all":
+        queryset = queryset.filter(category__iexact=category)
+    return queryset
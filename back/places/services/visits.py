@@ -0,0 +1,197 @@
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest, Lower, NullIf, Trim
+
+from places.models import Place, UserMapPlace, VisitedPlace
+from places.services.map_cache import invalidate_user_map
+
+
+COUNTER_FIELDS = ["visited_places_count", "visited_countries_count", "map_places_count"]
+
+
+def visited_country_key():
+    """
+    Normalized VisitedPlace country; the live counters, compute_visit_counters
+    and the users 0010 backfill must all agree on it. Blank counts for no country.
+    """
+    return Lower(Trim("place__country"))
+
+
+def _visited_countries(visits, within=None):
+    rows = visits.annotate(country_key=visited_country_key()).exclude(country_key="")
+    if within is not None:
+        rows = rows.filter(country_key__in=within)
+    return set(rows.order_by().values_list("country_key", flat=True).distinct())
+
+
+def _countries_only_visited_at(user_id, place_ids):
+    """How many of the user's visited countries come solely from visits to place_ids."""
+    visits = VisitedPlace.objects.filter(user_id=user_id)
+    countries = _visited_countries(visits.filter(place_id__in=place_ids))
+    if not countries:
+        return 0
+    return len(countries - _visited_countries(visits.exclude(place_id__in=place_ids), within=countries))
+
+
+def _bump_counters(user, **deltas):
+    User = get_user_model()
+    updates = {
+        field: Greatest(F(field) + delta, 0)
+        for field, delta in deltas.items()
+        if delta
+    }
+    if updates:
+        User.objects.filter(pk=user.pk).update(**updates)
+        user.refresh_from_db(fields=COUNTER_FIELDS)
+
+
+@transaction.atomic
+def mark_place_visited(user, place):
+    visited, created = VisitedPlace.objects.get_or_create(user=user, place=place)
+    if created:
+        _bump_counters(
+            user,
+            visited_places_count=1,
+            visited_countries_count=_countries_only_visited_at(user.pk, [place.pk]),
+        )
+    return visited, created
+
+
+@transaction.atomic
+def delete_visited_place(visited):
+    user = visited.user
+    countries_lost = _countries_only_visited_at(user.pk, [visited.place_id])
+    visited.delete()
+    _bump_counters(
+        user,
+        visited_places_count=-1,
+        visited_countries_count=-countries_lost,
+    )
+
+
+@transaction.atomic
+def add_map_place(serializer, user):
+    place = serializer.save(user=user)
+    _bump_counters(user, map_places_count=1)
+    return place
+
+
+@transaction.atomic
+def delete_map_place(place):
+    user = place.user
+    place.delete()
+    _bump_counters(user, map_places_count=-1)
+
+
+def _insert_new_rows(model, objs):
+    """
+    Insert objs and return the ones actually inserted. One bulk INSERT
+    normally; if a concurrent request inserted a conflicting row, fall back
+    to row-by-row inserts that skip it, so counter deltas stay exact.
+    """
+    try:
+        with transaction.atomic():
+            model.objects.bulk_create(objs, batch_size=500)
+        return objs
+    except IntegrityError:
+        inserted = []
+        for obj in objs:
+            obj.pk = None
+            try:
+                with transaction.atomic():
+                    obj.save(force_insert=True)
+            except IntegrityError:
+                continue
+            inserted.append(obj)
+        return inserted
+
+
+@transaction.atomic
+def bulk_mark_places_visited(user, visited_at_by_place_id):
+    """
+    Mark many places visited at once; visited_at may be None per place.
+    Returns the ids of places that were newly marked.
+    """
+    place_ids = set(Place.objects.filter(pk__in=visited_at_by_place_id).values_list("pk", flat=True))
+    already = set(
+        VisitedPlace.objects.filter(user=user, place_id__in=place_ids).values_list("place_id", flat=True)
+    )
+    created = _insert_new_rows(
+        VisitedPlace,
+        [VisitedPlace(user=user, place_id=pk, visited_at=visited_at_by_place_id[pk]) for pk in sorted(place_ids - already)],
+    )
+    new_ids = [visited.place_id for visited in created]
+    _after_bulk_change(
+        user,
+        visited_places_count=len(new_ids),
+        visited_countries_count=_countries_only_visited_at(user.pk, new_ids),
+    )
+    return new_ids
+
+
+@transaction.atomic
+def bulk_unmark_places_visited(user, place_ids):
+    """Returns the ids of places that were removed from visited."""
+    # Lock the rows first: a concurrent delete then finds nothing and does not decrement.
+    removed_ids = sorted(
+        VisitedPlace.objects.select_for_update()
+        .filter(user=user, place_id__in=place_ids)
+        .values_list("place_id", flat=True)
+    )
+    countries_lost = _countries_only_visited_at(user.pk, removed_ids)
+    VisitedPlace.objects.filter(user=user, place_id__in=removed_ids).delete()
+    _after_bulk_change(
+        user,
+        visited_places_count=-len(removed_ids),
+        visited_countries_count=-countries_lost,
+    )
+    return removed_ids
+
+
+@transaction.atomic
+def bulk_add_map_places(user, rows):
+    """
+    Create map pins from validated rows, skipping any that duplicate an
+    existing pin or an earlier row (case-insensitive city/country).
+    Returns (created_count, duplicate_count).
+    """
+    seen = {
+        (city.lower(), country.lower(), date, lat, lon)
+        for city, country, date, lat, lon in UserMapPlace.objects.filter(user=user).values_list(
+            "city", "country", "date", "lat", "lon"
+        )
+    }
+    new_pins = []
+    for row in rows:
+        key = (row["city"].lower(), row["country"].lower(), row["date"], row["lat"], row["lon"])
+        if key in seen:
+            continue
+        seen.add(key)
+        new_pins.append(UserMapPlace(user=user, **row))
+    created = _insert_new_rows(UserMapPlace, new_pins)
+    _after_bulk_change(user, map_places_count=len(created))
+    return len(created), len(rows) - len(created)
+
+
+def _after_bulk_change(user, **deltas):
+    from users.services import invalidate_user_travel_profile
+
+    # Deltas from the rows actually inserted/deleted, in one UPDATE; bulk_create
+    # also skips the post_save receivers that normally rotate the cache versions.
+    _bump_counters(user, **deltas)
+    invalidate_user_travel_profile(user.pk)
+    invalidate_user_map(user.pk)
+
+
+def compute_visit_counters(user_id):
+    """Recount from the source tables; used by reconcile_visit_counters."""
+    visited = VisitedPlace.objects.filter(user_id=user_id).aggregate(
+        places=Count("id"),
+        countries=Count(NullIf(visited_country_key(), Value("")), distinct=True),
+    )
+    return {
+        "visited_places_count": visited["places"],
+        "visited_countries_count": visited["countries"],
+        "map_places_count": UserMapPlace.objects.filter(user_id=user_id).count(),
+    }
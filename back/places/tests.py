@@ -1,9 +1,39 @@
-from django.test import TestCase
+import base64
+import json
+import struct
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
 from rest_framework import status
-from rest_framework.test import APIClient
+from rest_framework.test import APIClient, APIRequestFactory
 
-from places.models import MustVisitPlace, Place, SavedPlace
-from users.models import User
+from llm.services import tripadvisor_service
+from llm.services.trip_planner import build_trip_plan
+from places.models import MustVisitPlace, Place, SavedPlace, UserMapPlace, VisitedPlace
+from places.serializers import PlaceSerializer
+from places.services import google_places, photos
+from places.services.save_place import (
+    BULK_DETAILS_PREFETCH_MAX,
+    _bump_saves_count,
+    _create_saved_places,
+    set_place_wishlist_state,
+)
+from places.services.visits import (
+    _insert_new_rows,
+    bulk_add_map_places,
+    bulk_mark_places_visited,
+    bulk_unmark_places_visited,
+    compute_visit_counters,
+    delete_visited_place,
+)
+from users.models import User, UserPreferences
 
 
 class WishlistFlowTests(TestCase):
@@ -57,6 +87,19 @@ class WishlistFlowTests(TestCase):
         self.place.refresh_from_db()
         self.assertEqual(self.place.saves_count, 0)
 
+    def test_bump_saves_count_updates_in_place_and_never_goes_negative(self):
+        Place.objects.filter(pk=self.place.pk).update(saves_count=1)
+
+        with self.assertNumQueries(1):
+            _bump_saves_count(self.place.id, 1)
+        self.place.refresh_from_db()
+        self.assertEqual(self.place.saves_count, 2)
+
+        for _ in range(3):
+            _bump_saves_count(self.place.id, -1)
+        self.place.refresh_from_db()
+        self.assertEqual(self.place.saves_count, 0)
+
     def test_wishlist_endpoint_returns_places_from_must_visit_records(self):
         MustVisitPlace.objects.create(user=self.user, place=self.place)
 
@@ -67,6 +110,31 @@ class WishlistFlowTests(TestCase):
         self.assertEqual(response.data[0]["id"], self.place.id)
         self.assertTrue(response.data[0]["is_must_visit"])
 
+    def test_wishlist_merges_both_tables_newest_first_with_sql_filters(self):
+        cafe = Place.objects.create(
+            google_place_id="wishlist-place-2",
+            name="Wishlist Cafe",
+            category="cafe",
+            types=["cafe"],
+            address="Test Address",
+            city="Almaty",
+            country="Kazakhstan",
+            lat=43.24,
+            lng=76.89,
+        )
+        set_place_wishlist_state(user=self.user, place_id=self.place.id, is_favorited=True)
+        SavedPlace.objects.create(user=self.user, place=cafe)
+
+        response = self.client.get("/api/places/wishlist/")
+        self.assertEqual([row["id"] for row in response.data], [cafe.id, self.place.id])
+
+        response = self.client.get("/api/places/wishlist/", {"category": "Museum"})
+        self.assertEqual([row["id"] for row in response.data], [self.place.id])
+
+        response = self.client.get("/api/places/wishlist/", {"page": 2, "page_size": 1})
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.place.id])
+
     def test_inspiration_serializer_treats_legacy_saved_place_as_favorited(self):
         SavedPlace.objects.create(user=self.user, place=self.place)
 
@@ -78,3 +146,448 @@ class WishlistFlowTests(TestCase):
         self.assertIn("tours", response.data)
         self.assertIn("next", response.data)
         self.assertIn("previous", response.data)
+
+    def test_admin_wishlist_delete_updates_saves_count_not_visits(self):
+        set_place_wishlist_state(user=self.user, place_id=self.place.id, is_favorited=True)
+        saved = SavedPlace.objects.get(user=self.user, place=self.place)
+        admin = User.objects.create_user(email="admin@example.com", password="testpass123", is_staff=True)
+        self.client.force_authenticate(user=admin)
+
+        response = self.client.delete(f"/api/admin/wishlists/{saved.id}/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(SavedPlace.objects.filter(user=self.user, place=self.place).exists())
+        self.assertFalse(MustVisitPlace.objects.filter(user=self.user, place=self.place).exists())
+        self.place.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual(self.place.saves_count, 0)
+        self.assertEqual(self.user.visited_places_count, 0)
+
+    def test_tours_batch_resolves_known_cities_and_serves_from_cache(self):
+        cache.clear()
+
+        def fake_get(url, headers, params, timeout):
+            data = {"data": [{"location_id": 298251}]} if url.endswith("/search") else {"data": [{"name": "Medeu Tour"}]}
+            return mock.Mock(status_code=200, json=mock.Mock(return_value=data))
+
+        with mock.patch.object(tripadvisor_service, "TRIPADVISER_API_KEY", "test-key"), \
+                mock.patch.object(tripadvisor_service.requests, "get", side_effect=fake_get) as get:
+            response = self.client.get("/api/places/tours/", {"cities": " almaty ,Atlantis"})
+            repeat = self.client.get("/api/places/tours/", {"cities": "Almaty,Atlantis"}, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["unknown"], ["Atlantis"])
+        self.assertEqual([tour["name"] for tour in response.data["results"]["Almaty"]], ["Medeu Tour"])
+        self.assertEqual(repeat.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(get.call_count, 2)
+
+class VisitCounterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="visits@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.places = [
+            Place.objects.create(
+                google_place_id=f"visit-place-{index}",
+                name=f"Visit Place {index}",
+                category="museum",
+                types=["museum"],
+                address="Test Address",
+                city=city,
+                country=country,
+                lat=43.2 + index,
+                lng=76.8 + index,
+            )
+            for index, (city, country) in enumerate(
+                [("Almaty", "Kazakhstan"), ("Astana", "Kazakhstan"), ("Tashkent", "Uzbekistan")]
+            )
+        ]
+
+    def test_visit_endpoint_maintains_counters(self):
+        for place in self.places + [self.places[0]]:
+            response = self.client.post(f"/api/places/places/{place.id}/visited/")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.assertEqual(response.data["visited_count"], 3)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.visited_places_count, 3)
+        self.assertEqual(self.user.visited_countries_count, 2)
+
+        delete_visited_place(VisitedPlace.objects.get(user=self.user, place=self.places[2]))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.visited_places_count, 2)
+        self.assertEqual(self.user.visited_countries_count, 1)
+
+    def test_bulk_endpoints_apply_many_places_in_one_request(self):
+        ids = [place.id for place in self.places]
+        response = self.client.post(
+            "/api/places/visited/bulk/",
+            {"places": [{"place_id": ids[0], "visited_at": "2024-05-01T10:00:00Z"}, {"place_id": ids[1]}, {"place_id": 999999}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["changed_place_ids"], ids[:2])
+        self.assertEqual(response.data["visited_count"], 2)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.visited_countries_count, 1)
+        self.assertIsNotNone(VisitedPlace.objects.get(user=self.user, place_id=ids[0]).visited_at)
+
+        response = self.client.post("/api/places/wishlist/bulk/", {"place_ids": ids}, format="json")
+        self.assertEqual(response.data["wishlist_count"], 3)
+        response = self.client.post(
+            "/api/places/wishlist/bulk/", {"place_ids": ids[:2], "is_must_visit": False}, format="json"
+        )
+        self.assertEqual(response.data["changed_place_ids"], ids[:2])
+        self.assertEqual(response.data["wishlist_count"], 1)
+        self.assertEqual(
+            list(Place.objects.filter(pk__in=ids).order_by("pk").values_list("saves_count", flat=True)), [0, 0, 1]
+        )
+
+    def test_bulk_wishlist_insert_counts_only_rows_it_created(self):
+        ids = [place.id for place in self.places]
+        # Saved by a concurrent request after bulk_set_wishlist_state read the existing rows.
+        SavedPlace.objects.create(user=self.user, place=self.places[1])
+
+        self.assertEqual(_create_saved_places(self.user, ids), [ids[0], ids[2]])
+        self.assertEqual(SavedPlace.objects.filter(user=self.user).count(), 3)
+
+    def test_bulk_changes_apply_deltas_for_rows_actually_written(self):
+        ids = [place.id for place in self.places]
+        VisitedPlace.objects.create(user=self.user, place=self.places[1])
+        User.objects.filter(pk=self.user.pk).update(visited_places_count=10, visited_countries_count=5)
+
+        self.assertEqual(bulk_mark_places_visited(self.user, dict.fromkeys(ids)), [ids[0], ids[2]])
+        # Not a recount: the drifted totals move by the two inserted rows and the one new country.
+        self.assertEqual((self.user.visited_places_count, self.user.visited_countries_count), (12, 6))
+
+        self.assertEqual(bulk_unmark_places_visited(self.user, ids[:2] + [999999]), ids[:2])
+        self.assertEqual((self.user.visited_places_count, self.user.visited_countries_count), (10, 5))
+
+        # A pin inserted by a concurrent request is skipped rather than counted.
+        UserMapPlace.objects.create(user=self.user, city="Almaty", country="Kazakhstan", date="2025-01", lat=43.2, lon=76.8)
+        pins = [
+            UserMapPlace(user=self.user, city=city, country="Kazakhstan", date="2025-01", lat=43.2, lon=76.8)
+            for city in ("ALMATY", "Astana")
+        ]
+        self.assertEqual([pin.city for pin in _insert_new_rows(UserMapPlace, pins)], ["Astana"])
+
+    def test_bulk_wishlist_prefetches_details_for_a_bounded_number_of_places(self):
+        extra = Place.objects.bulk_create([
+            Place(google_place_id=f"bulk-place-{index}", name=f"Bulk {index}", city="Almaty", country="Kazakhstan",
+                  lat=43.0, lng=76.0)
+            for index in range(BULK_DETAILS_PREFETCH_MAX + 5)
+        ])
+        with mock.patch("places.services.save_place.run_in_background") as background:
+            self.client.post("/api/places/wishlist/bulk/", {"place_ids": [p.id for p in extra]}, format="json")
+
+        background.assert_called_once()
+        self.assertEqual(len(background.call_args.args[1]), BULK_DETAILS_PREFETCH_MAX)
+
+    def test_map_place_import_dedupes_and_reports_invalid_rows(self):
+        bulk_add_map_places(self.user, [{"city": "Almaty", "country": "Kazakhstan", "date": "2025-01", "lat": 43.2, "lon": 76.8}])
+        response = self.client.post(
+            "/api/places/map-places/import/",
+            {
+                "type": "FeatureCollection",
+                "features": [
+                    {"type": "Feature", "geometry": {"type": "Point", "coordinates": [76.8, 43.2]},
+                     "properties": {"city": " almaty ", "country": "KAZAKHSTAN", "date": "2025-01"}},
+                    {"type": "Feature", "geometry": {"type": "Point", "coordinates": [69.2, 41.3]},
+                     "properties": {"city": "Tashkent", "country": "Uzbekistan", "date": "2024-09"}},
+                    {"type": "Feature", "geometry": {"type": "Point", "coordinates": [69.2, 41.3]},
+                     "properties": {"city": "tashkent", "country": "uzbekistan", "date": "2024-09"}},
+                    {"type": "Feature", "geometry": {"type": "Point", "coordinates": [1, 2]}, "properties": {}},
+                ],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data["created"], response.data["duplicates"]), (1, 2))
+        self.assertEqual([row["row"] for row in response.data["invalid"]], [4])
+        self.assertEqual(response.data["map_places_count"], 2)
+
+        upload = SimpleUploadedFile(
+            "pins.csv",
+            b"City,Country,Date,Latitude,Longitude\nSamarkand,Uzbekistan,2024-10,39.65,66.96\n",
+            content_type="text/csv",
+        )
+        response = self.client.post("/api/places/map-places/import/", {"file": upload}, format="multipart")
+        self.assertEqual(response.data["created"], 1)
+
+        response = self.client.post(
+            "/api/places/map-places/",
+            {"city": "SAMARKAND", "country": "uzbekistan", "date": "2024-10", "lat": 39.65, "lon": 66.96},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(UserMapPlace.objects.filter(user=self.user).count(), 3)
+
+    def test_reconcile_command_fixes_drift(self):
+        VisitedPlace.objects.create(user=self.user, place=self.places[0])
+        UserMapPlace.objects.create(user=self.user, city="Almaty", country="Kazakhstan", date="2025-01", lat=43.2, lon=76.8)
+
+        call_command("reconcile_visit_counters", stdout=StringIO())
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.visited_places_count, 1)
+        self.assertEqual(self.user.visited_countries_count, 1)
+        self.assertEqual(self.user.map_places_count, 1)
+
+    def test_country_spelling_variants_count_once_on_every_path(self):
+        Place.objects.filter(pk=self.places[1].pk).update(country=" kazakhstan ")
+        Place.objects.filter(pk=self.places[2].pk).update(country="  ")
+        for place in self.places:
+            self.client.post(f"/api/places/places/{place.id}/visited/")
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.visited_countries_count, 1)
+        self.assertEqual(compute_visit_counters(self.user.pk)["visited_countries_count"], 1)
+
+        delete_visited_place(VisitedPlace.objects.get(user=self.user, place=self.places[0]))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.visited_countries_count, 1)
+
+    def test_streamed_lists_match_buffered_responses(self):
+        for place in self.places:
+            self.client.post(f"/api/places/places/{place.id}/visited/")
+        MustVisitPlace.objects.create(user=self.user, place=self.places[1])
+        SavedPlace.objects.create(user=self.user, place=self.places[2])
+        UserMapPlace.objects.create(user=self.user, city="Almaty", country="Kazakhstan", date="2025-01", lat=43.2, lon=76.8)
+
+        for url in ("/api/places/visited/", "/api/places/wishlist/", "/api/places/map-places/"):
+            buffered = self.client.get(url)
+            streamed = self.client.get(url, {"stream": "1"})
+            self.assertTrue(streamed.streaming)
+            body = b"".join(streamed.streaming_content)
+            self.assertEqual(json.loads(body), json.loads(buffered.content))
+
+
+class PublicMapCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="mapper@example.com",
+            password="testpass123",
+            username="mapper",
+        )
+        self.user.is_map_public = True
+        self.user.save(update_fields=["is_map_public"])
+        UserPreferences.objects.create(user=self.user, share_map=True)
+        UserMapPlace.objects.create(user=self.user, city="Almaty", country="Kazakhstan", date="2025-01", lat=43.2, lon=76.8)
+
+    def test_repeat_public_request_is_served_from_cache_with_304(self):
+        url = f"/api/places/users/{self.user.id}/map/markers/"
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(first.data), 1)
+        etag = first["ETag"]
+
+        with self.assertNumQueries(1):  # The access check only
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        UserMapPlace.objects.create(user=self.user, city="Astana", country="Kazakhstan", date="2025-02", lat=51.1, lon=71.4)
+        third = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(third.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(third.data), 2)
+        self.assertNotEqual(third["ETag"], etag)
+
+    def test_privacy_change_invalidates_cached_map(self):
+        url = f"/api/places/users/{self.user.id}/map/"
+        self.assertEqual(len(self.client.get(url).data["map_places"]), 1)
+
+        prefs = self.user.preferences
+        prefs.share_map = False
+        prefs.share_badges = True
+        prefs.save()
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["map_places"], [])
+
+    def test_revoked_access_is_enforced_without_cache_invalidation(self):
+        url = f"/api/places/users/{self.user.id}/map/markers/"
+        User.objects.filter(pk=self.user.pk).update(map_share_token="old-token")
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+        # Another worker's write: its cache deletes never reach this process.
+        User.objects.filter(pk=self.user.pk).update(is_map_public=False, map_share_token="new-token")
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(url, {"share_token": "old-token"}).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(url, {"share_token": "new-token"}).status_code, status.HTTP_200_OK)
+
+    def test_marker_tiles_cluster_at_low_zoom_and_filter_by_tile(self):
+        UserMapPlace.objects.create(user=self.user, city="Almaty 2", country="Kazakhstan", date="2025-03", lat=43.25, lon=76.9)
+        UserMapPlace.objects.create(user=self.user, city="Paris", country="France", date="2025-04", lat=48.85, lon=2.35)
+        base = f"/api/places/users/{self.user.id}/map/markers/tiles"
+
+        world = self.client.get(f"{base}/0/0/0/")
+        self.assertEqual(world.status_code, status.HTTP_200_OK)
+        counts = sorted(feature["properties"]["count"] for feature in world.data["features"])
+        self.assertEqual(counts, [1, 2])
+
+        # At z=12 the tile holds only the first Almaty pin, sent unclustered.
+        packed = self.client.get(f"{base}/12/2921/1501/", {"encoding": "packed"})
+        self.assertEqual(packed.status_code, status.HTTP_200_OK)
+        self.assertEqual(packed.data["count"], 1)
+        lng, lat, count = struct.unpack("<3f", base64.b64decode(packed.data["data"]))
+        self.assertAlmostEqual(lat, 43.2, places=4)
+        self.assertEqual(count, 1)
+
+        self.assertEqual(self.client.get(f"{base}/1/2/0/").status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PlacePhotoProxyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_dir.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self.media_dir.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.client = APIClient()
+        self.place = Place.objects.create(
+            google_place_id="photo-place-1",
+            name="Colosseum",
+            category="tourist_attraction",
+            city="Rome",
+            country="Italy",
+            lat=41.8902,
+            lng=12.4922,
+            photo_url="https://places.googleapis.com/v1/places/abc/photos/xyz/media?maxHeightPx=800&maxWidthPx=800",
+        )
+        buffer = BytesIO()
+        Image.new("RGB", (1200, 800), "orange").save(buffer, format="JPEG")
+        self.google_photo = mock.Mock(status_code=200, content=buffer.getvalue())
+
+    def test_photo_is_fetched_once_and_served_resized_with_long_cache_headers(self):
+        url = f"/api/places/places/{self.place.id}/photo/"
+        version = photos.photo_version(self.place)
+        with mock.patch.object(photos.requests, "get", return_value=self.google_photo) as get:
+            thumbnail = self.client.get(url, {"size": "thumbnail", "v": version})
+            card = self.client.get(url, {"v": version})
+            repeat = self.client.get(url, {"v": version}, HTTP_IF_NONE_MATCH=card["ETag"])
+            outdated = self.client.get(url, {"v": "0" * 12})
+
+        get.assert_called_once()
+        self.assertEqual(get.call_args.kwargs["params"]["maxWidthPx"], 800)
+        self.assertEqual(Image.open(BytesIO(b"".join(thumbnail.streaming_content))).size, (160, 107))
+        self.assertEqual(Image.open(BytesIO(b"".join(card.streaming_content))).size, (480, 320))
+        self.assertEqual(card["Cache-Control"], "public, max-age=31536000, immutable")
+        self.assertEqual(outdated["Cache-Control"], "public, no-cache")
+        self.assertEqual(repeat.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get(url, {"size": "huge"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_serialized_places_link_to_the_proxy_without_the_api_key(self):
+        data = PlaceSerializer(self.place).data
+        version = photos.photo_key("places/abc/photos/xyz")[:12]
+
+        self.assertEqual(data["photo_url"], f"/api/places/places/{self.place.id}/photo/?size=card&v={version}")
+        self.assertEqual(data["photo_thumbnail_url"], f"/api/places/places/{self.place.id}/photo/?size=thumbnail&v={version}")
+        self.assertNotIn("key=", data["photo_url"])
+
+    @override_settings(STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    })
+    def test_remote_storage_redirects_to_the_stored_file(self):
+        url = f"/api/places/places/{self.place.id}/photo/"
+        version = photos.photo_version(self.place)
+        with mock.patch.object(photos.requests, "get", return_value=self.google_photo) as get:
+            first = self.client.get(url, {"v": version})
+            with mock.patch.object(photos.default_storage, "exists") as exists:
+                second = self.client.get(url, {"v": version})
+
+        get.assert_called_once()
+        exists.assert_not_called()
+        self.assertEqual(first.status_code, status.HTTP_302_FOUND)
+        self.assertTrue(second["Location"].endswith(f"/{photos.photo_key('places/abc/photos/xyz')}/card.jpg"))
+        self.assertEqual(second["Cache-Control"], "public, max-age=31536000, immutable")
+
+    def test_trip_plans_store_absolute_photo_urls(self):
+        user = User.objects.create_user(email="photos@example.com", password="testpass123")
+        request = APIRequestFactory().get("/api/llm/trip-plan/")
+
+        plan = build_trip_plan(user=user, city="Rome", days=1, use_preferences=False, request=request)
+
+        stop = plan["itinerary"][0]["stops"][0]
+        self.assertTrue(stop["photo_url"].startswith(f"http://testserver/api/places/places/{self.place.id}/photo/"))
+
+    def test_new_photo_gets_a_new_proxy_url(self):
+        before = photos.place_photo_url(self.place)
+        self.place.photo_url = "https://places.googleapis.com/v1/places/abc/photos/new/media?maxHeightPx=800&maxWidthPx=800"
+
+        self.assertNotEqual(photos.place_photo_url(self.place), before)
+
+
+@override_settings(GOOGLE_MAPS_API_KEY="test-key")
+class PlaceDetailsTierTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email="details@example.com", password="testpass123")
+        self.details = mock.Mock(status_code=200, json=mock.Mock(return_value={
+            "rating": 4.7,
+            "userRatingCount": 1200,
+            "priceLevel": "PRICE_LEVEL_MODERATE",
+            "websiteUri": "https://example.com",
+        }))
+
+    def _list_result(self):
+        return {"places": [{
+            "id": "gp-1",
+            "displayName": {"text": "Pantheon"},
+            "types": ["tourist_attraction"],
+            "formattedAddress": "Piazza della Rotonda, Rome",
+            "location": {"latitude": 41.8986, "longitude": 12.4769},
+            "addressComponents": [
+                {"types": ["locality"], "longText": "Rome"},
+                {"types": ["country"], "longText": "Italy"},
+            ],
+            "photos": [{"name": "places/gp-1/photos/ph-1"}],
+        }]}
+
+    def test_discovery_uses_list_mask_and_keeps_fetched_details(self):
+        listing = mock.Mock(status_code=200, json=mock.Mock(return_value=self._list_result()))
+        with mock.patch.object(google_places.requests, "post", return_value=listing) as post:
+            place = google_places.get_places("Rome", "tourist_attraction")[0]
+            Place.objects.filter(pk=place.pk).update(rating=4.7, details_fetched_at=timezone.now())
+            google_places.get_places("Rome", "tourist_attraction", force_refresh=True)
+
+        self.assertEqual(post.call_args.kwargs["headers"]["X-Goog-FieldMask"], google_places.LIST_FIELD_MASK)
+        self.assertNotIn("rating", google_places.LIST_FIELD_MASK)
+        self.assertEqual(Place.objects.get(pk=place.pk).rating, 4.7)
+
+    def test_repeat_discovery_is_served_from_cached_rows(self):
+        listing = mock.Mock(status_code=200, json=mock.Mock(return_value=self._list_result()))
+        with mock.patch.object(google_places.requests, "post", return_value=listing) as post:
+            google_places.get_places("Rome", "tourist_attraction")
+            cached = google_places.get_places("Rome", "tourist_attraction")
+
+        self.assertEqual(post.call_count, 1)
+        self.assertEqual([place.google_place_id for place in cached], ["gp-1"])
+        self.assertIsNone(cached[0].website)
+
+    def test_details_are_fetched_once_when_a_place_is_opened_or_saved(self):
+        opened = Place.objects.create(google_place_id="gp-1", name="Pantheon", category="tourist_attraction",
+                                      city="Rome", country="Italy", lat=41.8986, lng=12.4769)
+        saved = Place.objects.create(google_place_id="gp-2", name="Trevi", category="tourist_attraction",
+                                     city="Rome", country="Italy", lat=41.9009, lng=12.4833)
+        self.client.force_authenticate(self.user)
+
+        with mock.patch.object(google_places.requests, "get", return_value=self.details) as get:
+            first = self.client.get(f"/api/places/places/{opened.id}/")
+            self.client.get(f"/api/places/places/{opened.id}/")
+            self.client.post(f"/api/places/places/{saved.id}/save/")
+
+        self.assertEqual(first.data["rating"], 4.7)
+        self.assertEqual(first.data["price_level"], "PRICE_LEVEL_MODERATE")
+        self.assertEqual([call.args[0].rsplit("/", 1)[-1] for call in get.call_args_list], ["gp-1", "gp-2"])
+        self.assertEqual(get.call_args.kwargs["headers"]["X-Goog-FieldMask"], google_places.DETAIL_FIELD_MASK)
+        self.assertIsNotNone(Place.objects.get(pk=saved.pk).details_fetched_at)
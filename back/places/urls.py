@@ -4,33 +4,50 @@ from .views import (
     PlacesListAPIView,
     SavePlaceAPIView,
     WishlistAPIView,
+    BulkWishlistAPIView,
+    BulkVisitedAPIView,
     VisitPlaceAPIView,
     VisitedPlacesAPIView,
     PlaceMustVisitAPIView,
     UserMapPlaceListCreateAPIView,
     UserMapPlaceDeleteAPIView,
+    UserMapPlaceImportAPIView,
     UserPublicMapAPIView,
     UserPublicMapMarkersAPIView,
+    UserPublicMapMarkerTileAPIView,
     UsersWithPublicMapListAPIView,
     HotelsSearchAPIView,
+    ToursBatchAPIView,
+    PlacePhotoAPIView,
+    PlaceDetailAPIView,
 )
 
 urlpatterns = [
     path("", PlacesListAPIView.as_view(), name="places-list"),
     path("inspiration/", InspirationListAPIView.as_view(), name="inspiration-list"),
+    path("places/<int:place_id>/", PlaceDetailAPIView.as_view(), name="place-detail"),
     path("places/<int:place_id>/save/", SavePlaceAPIView.as_view(), name="place-save"),
+    path("places/<int:place_id>/photo/", PlacePhotoAPIView.as_view(), name="place-photo"),
     path("wishlist/", WishlistAPIView.as_view(), name="wishlist"),
+    path("wishlist/bulk/", BulkWishlistAPIView.as_view(), name="wishlist-bulk"),
     path("places/<int:place_id>/visited/", VisitPlaceAPIView.as_view(), name="place-visited"),
     path("visited/", VisitedPlacesAPIView.as_view(), name="visited-places"),
+    path("visited/bulk/", BulkVisitedAPIView.as_view(), name="visited-places-bulk"),
     path(
         "places/<int:place_id>/must-visit/",
         PlaceMustVisitAPIView.as_view(),
         name="place-must-visit",
     ),
     path("map-places/", UserMapPlaceListCreateAPIView.as_view(), name="map-places"),
+    path("map-places/import/", UserMapPlaceImportAPIView.as_view(), name="map-places-import"),
     path("map-places/<int:place_id>/", UserMapPlaceDeleteAPIView.as_view(), name="map-place-delete"),
     path("users/shared-maps/", UsersWithPublicMapListAPIView.as_view(), name="users-with-public-map"),
     path("users/<int:user_id>/map/markers/", UserPublicMapMarkersAPIView.as_view(), name="user-public-map-markers"),
+    path(
+        "users/<int:user_id>/map/markers/tiles/<int:z>/<int:x>/<int:y>/",
+        UserPublicMapMarkerTileAPIView.as_view(),
+        name="user-public-map-marker-tile",
+    ),
     path(
         "users/by-username/<str:username>/map/markers/",
         UserPublicMapMarkersAPIView.as_view(),
@@ -39,4 +56,5 @@ urlpatterns = [
     path("map/<int:user_id>/markers/", UserPublicMapMarkersAPIView.as_view(), name="public-map-markers-short"),
     path("users/<int:user_id>/map/", UserPublicMapAPIView.as_view(), name="user-public-map"),
     path("hotels/search/", HotelsSearchAPIView.as_view(), name="hotels-search"),
+    path("tours/", ToursBatchAPIView.as_view(), name="tours-batch"),
 ]
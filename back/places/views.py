@@ -1,7 +1,10 @@
 import secrets
 
 from django.conf import settings
-from django.http import Http404
+from django.db import IntegrityError
+from django.db.models import Exists, OuterRef
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified, HttpResponseRedirect
 from django.shortcuts import get_object_or_404, render
 from django.views import View
 from django_filters.rest_framework import DjangoFilterBackend, FilterSet, filters
@@ -9,6 +12,8 @@ from rest_framework import status
 from rest_framework.exceptions import NotFound
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.generics import ListAPIView
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -25,14 +30,58 @@ from places.serializers import (
     PublicUserMapPlaceSerializer,
     PublicVisitedPlaceSerializer,
     PublicMapUserListSerializer,
+    BulkVisitedSerializer,
+    BulkWishlistSerializer,
+)
+from places.services.gazetteer import resolve_city
+from places.services.google_places import ensure_places_details, get_places
+from places.services.save_place import (
+    bulk_set_wishlist_state,
+    save_place_for_user,
+    set_place_wishlist_state,
+    wishlist_places_queryset,
+)
+from places.services.map_import import MapImportError, parse_map_import
+from places.services.photos import (
+    DEFAULT_VARIANT,
+    PHOTO_CACHE_CONTROL,
+    PHOTO_REVALIDATE_CACHE_CONTROL,
+    PHOTO_VARIANTS,
+    PhotoUnavailableError,
+    get_place_photo,
+    is_remote_storage,
+    photo_version,
+)
+from places.services.map_tiles import ENCODINGS, cluster_markers, is_valid_tile, tile_bbox, to_geojson, to_packed
+from places.services.map_cache import (
+    compute_etag,
+    get_map_snapshot,
+    get_or_build_payload,
+    if_none_match,
+    map_snapshot_queryset,
+)
+from places.services.visits import (
+    add_map_place,
+    bulk_add_map_places,
+    bulk_mark_places_visited,
+    bulk_unmark_places_visited,
+    delete_map_place,
+    delete_visited_place,
+    mark_place_visited,
 )
-from places.services.google_places import get_places
-from places.services.save_place import save_place_for_user, set_place_wishlist_state
-from places.services.tripadvisor_service import get_tours_cached
 from bizbenSayahatta.api_exceptions import MapPlaceAlreadyExistsError
+from bizbenSayahatta.circuit_breaker import CircuitOpenError
+from bizbenSayahatta.streaming import (
+    STREAM_CHUNK_SIZE,
+    encode_json,
+    iter_json_array,
+    streaming_json_response,
+    wants_stream,
+)
 from users.permissions import IsActiveAndNotBlocked
 
-from llm.services.hotel_cache import get_hotels_cached, is_hotel_cached
+from llm.views_hotels import HotelSearchView
+from llm.services.tripadvisor_service import get_tours_cached, get_tours_for_cities
 
 BADGE_LEVELS = [
     {"code": "starter", "label": "Starter", "threshold": 1},
@@ -54,6 +103,19 @@ def _get_badges(visited_count):
     ]
 
 
+def _must_visit_exists(user, place_ref):
+    """Annotation matching PlaceSerializer.get_is_must_visit, without a query per row."""
+    return Exists(MustVisitPlace.objects.filter(user=user, place_id=OuterRef(place_ref))) | Exists(
+        SavedPlace.objects.filter(user=user, place_id=OuterRef(place_ref))
+    )
+
+
+def _with_place_must_visit(visited_rows):
+    for row in visited_rows:
+        row.place.is_must_visit_for_user = row.place_is_must_visit
+        yield row
+
+
 def _share_token_from_request(request):
     return request.query_params.get("share_token") or request.query_params.get("token")
 
@@ -73,10 +135,45 @@ def _valid_share_token_request(request, target_user):
     return secrets.compare_digest(str(secret), str(token))
 
 
-def _iter_map_markers_for_user(target, include_map_pins, include_visited_pins):
-    """Yield dicts with lat, lng, name, country (efficient column-only queries)."""
+def _snapshot_access(request, snapshot):
+    """Non-owner access from a map snapshot: "token", "public" or None."""
+    token = _share_token_from_request(request)
+    secret = snapshot["map_share_token"]
+    if token and secret and secrets.compare_digest(str(secret), str(token)):
+        return "token"
+    if snapshot["is_map_public"]:
+        return "public"
+    return None
+
+
+def _snapshot_shares_anything(snapshot):
+    return snapshot["has_prefs"] and (
+        snapshot["share_map"] or snapshot["share_visited_places"] or snapshot["share_badges"]
+    )
+
+
+def _map_response(request, payload, etag, private=False):
+    """Strong-ETag response; 304 when the client already holds this payload."""
+    if if_none_match(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(payload, status=status.HTTP_200_OK)
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache" if private else "public, no-cache"
+    return response
+
+
+def _iter_map_markers_for_user(target, include_map_pins, include_visited_pins, bbox=None):
+    """
+    Yield dicts with lat, lng, name, country (efficient column-only queries). target is a User or user id.
+    bbox=(west, south, east, north) limits markers to a viewport/tile.
+    """
     if include_map_pins:
-        qs = UserMapPlace.objects.filter(user=target).values("lat", "lon", "city", "country")
+        qs = UserMapPlace.objects.filter(user=target)
+        if bbox:
+            west, south, east, north = bbox
+            qs = qs.filter(lon__gte=west, lon__lt=east, lat__gt=south, lat__lte=north)
+        qs = qs.values("lat", "lon", "city", "country")
         for row in qs.iterator(chunk_size=512):
             city = (row.get("city") or "").strip()
             country = (row.get("country") or "").strip()
@@ -88,10 +185,16 @@ def _iter_map_markers_for_user(target, include_map_pins, include_visited_pins):
                 "country": country,
             }
     if include_visited_pins:
-        qs = (
-            VisitedPlace.objects.filter(user=target)
-            .values("place__lat", "place__lng", "place__name", "place__country")
-        )
+        qs = VisitedPlace.objects.filter(user=target)
+        if bbox:
+            west, south, east, north = bbox
+            qs = qs.filter(
+                place__lng__gte=west,
+                place__lng__lt=east,
+                place__lat__gt=south,
+                place__lat__lte=north,
+            )
+        qs = qs.values("place__lat", "place__lng", "place__name", "place__country")
         for row in qs.iterator(chunk_size=512):
             lat, lng = row.get("place__lat"), row.get("place__lng")
             if lat is None or lng is None:
@@ -215,11 +318,11 @@ class InspirationListAPIView(ListAPIView):
                 "places": places_serializer.data,
             }
 
-        # Fetch TripAdvisor tours (with caching)
-        # Extract city from search param for tour fetching
-        city = request.query_params.get("search") or request.query_params.get("city")
+        # TripAdvisor tours: first page only, and only when the search names a known
+        # city. Clients should prefer the batch tours endpoint (ToursBatchAPIView).
+        city = resolve_city(request.query_params.get("search") or request.query_params.get("city"))
         tours = []
-        if city:
+        if city and str(request.query_params.get("page") or "1") == "1":
             try:
                 tours = get_tours_cached(city=city, max_results=10)
             except Exception:
@@ -231,6 +334,89 @@ class InspirationListAPIView(ListAPIView):
         return Response(response_data)
 
 
+class ToursBatchAPIView(APIView):
+    """
+    GET /api/places/tours/?cities=Rome,Paris
+    TripAdvisor tours for up to MAX_TOUR_CITIES known cities. Unknown names are
+    reported instead of looked up. Responses carry an ETag (304 on repeat).
+    """
+
+    MAX_TOUR_CITIES = 10
+
+    def get(self, request):
+        requested = [
+            name.strip()
+            for value in request.query_params.getlist("cities")
+            for name in value.split(",")
+            if name.strip()
+        ]
+        if not requested:
+            return Response({"detail": "cities is required."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(requested) > self.MAX_TOUR_CITIES:
+            return Response(
+                {"detail": f"At most {self.MAX_TOUR_CITIES} cities per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        cities, unknown = [], []
+        for name in requested:
+            city = resolve_city(name)
+            if city is None:
+                unknown.append(name)
+            elif city not in cities:
+                cities.append(city)
+
+        payload = {"results": get_tours_for_cities(cities, max_results=10), "unknown": unknown}
+        return _map_response(request, payload, compute_etag(payload))
+
+
+class PlacePhotoAPIView(APIView):
+    """
+    GET /api/places/places/{place_id}/photo/?size=thumbnail|card|full&v=<version>
+    Google photo of a place, fetched from Google once and then served from
+    media storage. Public and unauthenticated so it works in <img> tags.
+    """
+
+    authentication_classes = []
+    permission_classes = []
+
+    def get(self, request, place_id):
+        variant = request.query_params.get("size", DEFAULT_VARIANT)
+        if variant not in PHOTO_VARIANTS:
+            return Response(
+                {"detail": f"size must be one of: {', '.join(PHOTO_VARIANTS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        place = get_object_or_404(Place.objects.only("id", "photo_url"), pk=place_id)
+
+        try:
+            path, etag = get_place_photo(place, variant)
+        except PhotoUnavailableError:
+            raise NotFound("Photo not available.")
+        except CircuitOpenError as exc:
+            return Response(
+                {"detail": "Photo provider is temporarily unavailable."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(exc.retry_after)},
+            )
+
+        if is_remote_storage():
+            # Remote storage (Cloudinary) serves the file itself.
+            response = HttpResponseRedirect(default_storage.url(path))
+        else:
+            if if_none_match(request, etag):
+                response = HttpResponseNotModified()
+            else:
+                response = FileResponse(default_storage.open(path), content_type="image/jpeg")
+            response["ETag"] = etag
+        # Only a URL naming the current photo may be cached as immutable.
+        if request.query_params.get("v") == photo_version(place):
+            response["Cache-Control"] = PHOTO_CACHE_CONTROL
+        else:
+            response["Cache-Control"] = PHOTO_REVALIDATE_CACHE_CONTROL
+        return response
+
+
 class PlacesListAPIView(APIView):
     def get(self, request):
         city = request.query_params.get("city")
@@ -246,7 +432,14 @@ class PlacesListAPIView(APIView):
             )
 
         force_refresh = str(refresh).lower() in {"1", "true", "yes"}
-        places = list(get_places(city, category, force_refresh=force_refresh))
+        try:
+            places = list(get_places(city, category, force_refresh=force_refresh))
+        except CircuitOpenError as exc:
+            return Response(
+                {"detail": "Places provider is temporarily unavailable."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(exc.retry_after)},
+            )
 
         if budget is not None:
             try:
@@ -274,6 +467,19 @@ class PlacesListAPIView(APIView):
         return Response(serializer.data)
 
 
+class PlaceDetailAPIView(APIView):
+    """
+    GET /api/places/places/{place_id}/
+    One place, with rating, price, hours and website fetched from Google
+    Place Details the first time anyone opens it (then refreshed monthly).
+    """
+
+    def get(self, request, place_id):
+        place = get_object_or_404(Place, pk=place_id)
+        ensure_places_details([place])
+        return Response(PlaceSerializer(place, context={"request": request}).data)
+
+
 class SavePlaceAPIView(APIView):
     permission_classes = [IsAuthenticated, IsActiveAndNotBlocked]
 
@@ -289,35 +495,39 @@ class SavePlaceAPIView(APIView):
         )
 
 
+class WishlistPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+def _as_wishlisted(places):
+    for place in places:
+        # Every wishlist row is favorited; skip the per-row lookups in the serializer.
+        place.is_must_visit_for_user = True
+        yield place
+
+
 class WishlistAPIView(APIView):
     permission_classes = [IsAuthenticated, IsActiveAndNotBlocked]
 
     def get(self, request):
-        category = request.query_params.get("category")
-        must_visit_entries = list(
-            MustVisitPlace.objects.filter(user=request.user)
-            .select_related("place")
-            .order_by("-created_at")
-        )
-        saved_entries = list(
-            SavedPlace.objects.filter(user=request.user)
-            .select_related("place")
-            .order_by("-created_at")
-        )
-
-        ordered_places = []
-        seen_place_ids = set()
-        for entry in must_visit_entries + saved_entries:
-            place = entry.place
-            if place.id in seen_place_ids:
-                continue
-            seen_place_ids.add(place.id)
-            ordered_places.append(place)
-
-        places = ordered_places
-        if category and category.lower() != "all":
-            places = [place for place in places if place.category.lower() == category.lower()]
-        serializer = PlaceMapSerializer(places, many=True, context={"request": request})
+        places = wishlist_places_queryset(request.user, request.query_params.get("category"))
+        context = {"request": request}
+
+        if wants_stream(request):
+            serializer = PlaceMapSerializer(context=context)
+            rows = _as_wishlisted(places.iterator(chunk_size=STREAM_CHUNK_SIZE))
+            return streaming_json_response(iter_json_array(rows, serializer.to_representation))
+
+        # Pagination is opt-in so existing clients keep receiving a plain list.
+        if "page" in request.query_params:
+            paginator = WishlistPagination()
+            page = paginator.paginate_queryset(places, request, view=self)
+            serializer = PlaceMapSerializer(list(_as_wishlisted(page)), many=True, context=context)
+            return paginator.get_paginated_response(serializer.data)
+
+        serializer = PlaceMapSerializer(list(_as_wishlisted(places)), many=True, context=context)
         return Response(
             serializer.data,
             status=status.HTTP_200_OK,
@@ -329,8 +539,8 @@ class VisitPlaceAPIView(APIView):
 
     def post(self, request, place_id):
         place = get_object_or_404(Place, id=place_id)
-        VisitedPlace.objects.get_or_create(user=request.user, place=place)
-        visited_count = VisitedPlace.objects.filter(user=request.user).count()
+        mark_place_visited(request.user, place)
+        visited_count = request.user.visited_places_count
         badges = _get_badges(visited_count)
         return Response(
             {
@@ -349,8 +559,8 @@ class UnvisitPlaceAPIView(APIView):
         visited = VisitedPlace.objects.filter(user=request.user, place_id=place_id).first()
         if not visited:
             return Response({"detail": "Visit record not found."}, status=status.HTTP_404_NOT_FOUND)
-        visited.delete()
-        visited_count = VisitedPlace.objects.filter(user=request.user).count()
+        delete_visited_place(visited)
+        visited_count = request.user.visited_places_count
         badges = _get_badges(visited_count)
         return Response(
             {
@@ -372,10 +582,27 @@ class VisitedPlacesAPIView(APIView):
         visited = (
             VisitedPlace.objects.filter(user=request.user)
             .select_related("place")
+            .annotate(place_is_must_visit=_must_visit_exists(request.user, "place_id"))
             .order_by(Coalesce(F("visited_at"), F("created_at")).desc())
         )
-        serializer = VisitedPlaceSerializer(visited, many=True, context={"request": request})
-        visited_count = visited.count()
+        if wants_stream(request):
+            serializer = VisitedPlaceSerializer(context={"request": request})
+            badges = _get_badges(request.user.visited_places_count)
+
+            def chunks():
+                yield '{"count":' + encode_json(request.user.visited_places_count)
+                yield ',"badges":' + encode_json(badges) + ',"results":'
+                rows = _with_place_must_visit(visited.iterator(chunk_size=STREAM_CHUNK_SIZE))
+                yield from iter_json_array(rows, serializer.to_representation)
+                yield "}"
+
+            return streaming_json_response(chunks())
+
+        serializer = VisitedPlaceSerializer(
+            list(_with_place_must_visit(visited)), many=True, context={"request": request}
+        )
+        # The list is already materialized, so its length is exact and free.
+        visited_count = len(serializer.data)
         badges = _get_badges(visited_count)
         return Response(
             {
@@ -408,11 +635,71 @@ class PlaceMustVisitAPIView(APIView):
         return Response(result, status=status.HTTP_200_OK)
 
 
+class BulkWishlistAPIView(APIView):
+    """
+    POST {"place_ids": [...], "is_must_visit": true|false}
+    Adds or removes many places from the wishlist in one request.
+    """
+
+    permission_classes = [IsAuthenticated, IsActiveAndNotBlocked]
+
+    def post(self, request):
+        serializer = BulkWishlistSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        is_favorited = serializer.validated_data["is_must_visit"]
+        changed = bulk_set_wishlist_state(
+            user=request.user,
+            place_ids=serializer.validated_data["place_ids"],
+            is_favorited=is_favorited,
+        )
+        return Response(
+            {
+                "is_must_visit": is_favorited,
+                "changed_place_ids": changed,
+                "wishlist_count": wishlist_places_queryset(request.user).count(),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class BulkVisitedAPIView(APIView):
+    """
+    POST {"places": [{"place_id": 1, "visited_at": "..."}], "visited": true|false}
+    Marks or unmarks many places as visited; counters and badges are computed once.
+    """
+
+    permission_classes = [IsAuthenticated, IsActiveAndNotBlocked]
+
+    def post(self, request):
+        serializer = BulkVisitedSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        visited_at_by_place_id = {
+            item["place_id"]: item["visited_at"] for item in serializer.validated_data["places"]
+        }
+        if serializer.validated_data["visited"]:
+            changed = bulk_mark_places_visited(request.user, visited_at_by_place_id)
+        else:
+            changed = bulk_unmark_places_visited(request.user, list(visited_at_by_place_id))
+        visited_count = request.user.visited_places_count
+        return Response(
+            {
+                "visited": serializer.validated_data["visited"],
+                "changed_place_ids": changed,
+                "visited_count": visited_count,
+                "badges": _get_badges(visited_count),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class UserMapPlaceListCreateAPIView(APIView):
     permission_classes = [IsAuthenticated, IsActiveAndNotBlocked]
 
     def get(self, request):
         places = UserMapPlace.objects.filter(user=request.user)
+        if wants_stream(request):
+            rows = places.iterator(chunk_size=STREAM_CHUNK_SIZE)
+            return streaming_json_response(iter_json_array(rows, UserMapPlaceSerializer().to_representation))
         serializer = UserMapPlaceSerializer(places, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -420,21 +707,51 @@ class UserMapPlaceListCreateAPIView(APIView):
         serializer = UserMapPlaceSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        duplicate_exists = UserMapPlace.objects.filter(
-            user=request.user,
-            city__iexact=serializer.validated_data["city"],
-            country__iexact=serializer.validated_data["country"],
-            date=serializer.validated_data["date"],
-            lat=serializer.validated_data["lat"],
-            lon=serializer.validated_data["lon"],
-        ).exists()
-        if duplicate_exists:
+        try:
+            place = add_map_place(serializer, request.user)
+        except IntegrityError:
+            # places_usermapplace_unique_pin: same city/country (any case), date and coordinates.
             raise MapPlaceAlreadyExistsError()
-
-        place = serializer.save(user=request.user)
         return Response(UserMapPlaceSerializer(place).data, status=status.HTTP_201_CREATED)
 
 
+class UserMapPlaceImportAPIView(APIView):
+    """
+    POST a JSON list, GeoJSON FeatureCollection, or a CSV/JSON file (multipart "file")
+    of map pins. Valid rows are imported in one write; duplicates and invalid rows
+    are skipped and reported.
+    """
+
+    permission_classes = [IsAuthenticated, IsActiveAndNotBlocked]
+    parser_classes = [JSONParser, MultiPartParser, FormParser]
+
+    def post(self, request):
+        try:
+            rows = parse_map_import(request)
+        except MapImportError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        valid_rows = []
+        invalid = []
+        for index, row in enumerate(rows, start=1):
+            serializer = UserMapPlaceSerializer(data=row)
+            if serializer.is_valid():
+                valid_rows.append(serializer.validated_data)
+            else:
+                invalid.append({"row": index, "errors": serializer.errors})
+
+        created, duplicates = bulk_add_map_places(request.user, valid_rows)
+        return Response(
+            {
+                "created": created,
+                "duplicates": duplicates,
+                "invalid": invalid,
+                "map_places_count": request.user.map_places_count,
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+
 class UserMapPlaceDeleteAPIView(APIView):
     permission_classes = [IsAuthenticated, IsActiveAndNotBlocked]
 
@@ -442,7 +759,7 @@ class UserMapPlaceDeleteAPIView(APIView):
         place = UserMapPlace.objects.filter(id=place_id, user=request.user).first()
         if not place:
             raise NotFound("Map place not found.")
-        place.delete()
+        delete_map_place(place)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -461,84 +778,73 @@ class UserPublicMapAPIView(APIView):
 
     def get(self, request, user_id):
         User = get_user_model()
-        target = User.objects.filter(id=user_id).first()
-        if not target:
-            return Response({"detail": "User not found."}, status=status.HTTP_404_NOT_FOUND)
-
-        is_owner = request.user.is_authenticated and request.user.id == target.id
+        is_owner = request.user.is_authenticated and request.user.id == user_id
 
         if is_owner:
+            target = request.user
             map_places = UserMapPlace.objects.filter(user=target)
             visited = VisitedPlace.objects.filter(user=target).select_related("place").order_by("-created_at")
-            visited_count = visited.count()
-            badges = _get_badges(visited_count)
-            return Response(
-                {
-                    "user": {"id": target.id, "username": target.username or target.email},
-                    "map_places": UserMapPlaceSerializer(map_places, many=True).data,
-                    "visited_places": VisitedPlaceSerializer(visited, many=True, context={"request": request}).data,
-                    "badges": badges,
-                },
-                status=status.HTTP_200_OK,
-            )
+            badges = _get_badges(target.visited_places_count)
+            payload = {
+                "user": {"id": target.id, "username": target.username or target.email},
+                "map_places": UserMapPlaceSerializer(map_places, many=True).data,
+                "visited_places": VisitedPlaceSerializer(visited, many=True, context={"request": request}).data,
+                "badges": badges,
+            }
+            return _map_response(request, payload, compute_etag(payload), private=True)
 
-        if not target.is_active or target.deleted_at is not None:
+        snapshot = get_map_snapshot(map_snapshot_queryset().filter(id=user_id).first())
+        if not snapshot or not snapshot["active"]:
             return Response({"detail": "User not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        if not _travel_map_url_access(request, target):
+        access = _snapshot_access(request, snapshot)
+        if access is None:
             return Response(
                 {"detail": "This map is private or the link is invalid."},
                 status=status.HTTP_403_FORBIDDEN,
             )
-
-        user_summary = PublicMapUserListSerializer(target, context={"request": request}).data
-
-        if _valid_share_token_request(request, target):
-            map_places = UserMapPlace.objects.filter(user=target)
-            visited = VisitedPlace.objects.filter(user=target).select_related("place")
-            visited_count = VisitedPlace.objects.filter(user=target).count()
-            return Response(
-                {
-                    "user": user_summary,
-                    "map_places": PublicUserMapPlaceSerializer(map_places, many=True).data,
-                    "visited_places": PublicVisitedPlaceSerializer(visited, many=True).data,
-                    "badges": _get_badges(visited_count),
-                },
-                status=status.HTTP_200_OK,
-            )
-
-        prefs = UserPreferences.objects.filter(user=target).first()
-        if not prefs:
-            return Response(
-                {"detail": "This user has not shared their travel map."},
-                status=status.HTTP_403_FORBIDDEN,
-            )
-        if not (prefs.share_map or prefs.share_visited_places or prefs.share_badges):
+        if access == "public" and not _snapshot_shares_anything(snapshot):
             return Response(
                 {"detail": "This user has not shared their travel map."},
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        payload = {
-            "user": user_summary,
-        }
-        if prefs.share_map:
-            map_places = UserMapPlace.objects.filter(user=target)
-            payload["map_places"] = PublicUserMapPlaceSerializer(map_places, many=True).data
-        else:
-            payload["map_places"] = []
-        if prefs.share_visited_places:
-            visited = VisitedPlace.objects.filter(user=target).select_related("place")
-            payload["visited_places"] = PublicVisitedPlaceSerializer(visited, many=True).data
-        else:
-            payload["visited_places"] = []
-        if prefs.share_badges:
-            visited_count = VisitedPlace.objects.filter(user=target).count()
-            payload["badges"] = _get_badges(visited_count)
-        else:
-            payload["badges"] = []
+        def build():
+            target = User.objects.get(id=user_id)
+            user_summary = PublicMapUserListSerializer(target, context={"request": request}).data
 
-        return Response(payload, status=status.HTTP_200_OK)
+            if access == "token":
+                map_places = UserMapPlace.objects.filter(user=target)
+                visited = VisitedPlace.objects.filter(user=target).select_related("place")
+                return {
+                    "user": user_summary,
+                    "map_places": PublicUserMapPlaceSerializer(map_places, many=True).data,
+                    "visited_places": PublicVisitedPlaceSerializer(visited, many=True).data,
+                    "badges": _get_badges(target.visited_places_count),
+                }
+
+            payload = {
+                "user": user_summary,
+            }
+            if snapshot["share_map"]:
+                map_places = UserMapPlace.objects.filter(user=target)
+                payload["map_places"] = PublicUserMapPlaceSerializer(map_places, many=True).data
+            else:
+                payload["map_places"] = []
+            if snapshot["share_visited_places"]:
+                visited = VisitedPlace.objects.filter(user=target).select_related("place")
+                payload["visited_places"] = PublicVisitedPlaceSerializer(visited, many=True).data
+            else:
+                payload["visited_places"] = []
+            if snapshot["share_badges"]:
+                payload["badges"] = _get_badges(target.visited_places_count)
+            else:
+                payload["badges"] = []
+            return payload
+
+        # Avatar URLs are absolute, so the host is part of the variant.
+        payload, etag = get_or_build_payload(snapshot, f"map:{access}:{request.get_host()}", build)
+        return _map_response(request, payload, etag)
 
 
 class UsersWithPublicMapListAPIView(ListAPIView):
@@ -577,67 +883,115 @@ class UserPublicMapMarkersAPIView(APIView):
     permission_classes = []
 
     def _resolve_user(self, user_id=None, username=None):
-        User = get_user_model()
         if user_id is not None:
-            return User.objects.filter(id=user_id).first()
+            return map_snapshot_queryset().filter(id=user_id).first()
         uname = (username or "").strip()
         if not uname:
             return None
-        return User.objects.filter(username__iexact=uname).first()
+        return map_snapshot_queryset().filter(username__iexact=uname).first()
 
-    def get(self, request, user_id=None, username=None):
-        target = self._resolve_user(user_id=user_id, username=username)
-        if not target:
-            return Response({"detail": "User not found."}, status=status.HTTP_404_NOT_FOUND)
+    def _resolve_access(self, request, user_id=None, username=None):
+        """
+        Return (snapshot, include_map_pins, include_visited_pins, is_owner),
+        or (error_response, None, None, None).
+        """
+        snapshot = get_map_snapshot(self._resolve_user(user_id=user_id, username=username))
+        if not snapshot:
+            return Response({"detail": "User not found."}, status=status.HTTP_404_NOT_FOUND), None, None, None
 
-        is_owner = request.user.is_authenticated and request.user.id == target.id
+        is_owner = request.user.is_authenticated and request.user.id == snapshot["user_id"]
 
         if is_owner:
-            markers = list(
-                _iter_map_markers_for_user(
-                    target,
-                    include_map_pins=True,
-                    include_visited_pins=True,
-                )
-            )
-            return Response(markers, status=status.HTTP_200_OK)
-
-        if not target.is_active or target.deleted_at is not None:
-            return Response({"detail": "User not found."}, status=status.HTTP_404_NOT_FOUND)
+            access = "owner"
+        else:
+            if not snapshot["active"]:
+                return Response({"detail": "User not found."}, status=status.HTTP_404_NOT_FOUND), None, None, None
+            access = _snapshot_access(request, snapshot)
+            if access is None:
+                return Response(
+                    {"detail": "This map is private or the link is invalid."},
+                    status=status.HTTP_403_FORBIDDEN,
+                ), None, None, None
+            if access == "public" and not _snapshot_shares_anything(snapshot):
+                return Response(
+                    {"detail": "This user has not shared their travel map."},
+                    status=status.HTTP_403_FORBIDDEN,
+                ), None, None, None
+
+        # Owner and secret-link viewers see the same geographic layers (map pins + visited places).
+        # Public gallery viewers still follow per-field privacy toggles.
+        include_all = access in ("owner", "token")
+        include_map_pins = include_all or snapshot["share_map"]
+        include_visited_pins = include_all or snapshot["share_visited_places"]
+        return snapshot, include_map_pins, include_visited_pins, is_owner
 
-        if not _travel_map_url_access(request, target):
-            return Response(
-                {"detail": "This map is private or the link is invalid."},
-                status=status.HTTP_403_FORBIDDEN,
+    def get(self, request, user_id=None, username=None):
+        snapshot, include_map_pins, include_visited_pins, is_owner = self._resolve_access(
+            request, user_id=user_id, username=username
+        )
+        if isinstance(snapshot, Response):
+            return snapshot
+
+        if wants_stream(request):
+            # Bypasses the payload cache: for accounts too large to hold in memory.
+            markers = _iter_map_markers_for_user(
+                snapshot["user_id"],
+                include_map_pins=include_map_pins,
+                include_visited_pins=include_visited_pins,
             )
+            return streaming_json_response(iter_json_array(markers))
 
-        # Secret link: show the same geographic layers as the owner (map pins + visited places).
-        # Public gallery viewers still follow per-field privacy toggles.
-        if _valid_share_token_request(request, target):
-            markers = list(
+        def build():
+            return list(
                 _iter_map_markers_for_user(
-                    target,
-                    include_map_pins=True,
-                    include_visited_pins=True,
+                    snapshot["user_id"],
+                    include_map_pins=include_map_pins,
+                    include_visited_pins=include_visited_pins,
                 )
             )
-            return Response(markers, status=status.HTTP_200_OK)
 
-        prefs = UserPreferences.objects.filter(user=target).first()
-        if not prefs or not (prefs.share_map or prefs.share_visited_places or prefs.share_badges):
+        variant = f"markers:{int(include_map_pins)}{int(include_visited_pins)}"
+        payload, etag = get_or_build_payload(snapshot, variant, build)
+        return _map_response(request, payload, etag, private=is_owner)
+
+
+class UserPublicMapMarkerTileAPIView(UserPublicMapMarkersAPIView):
+    """
+    GET /api/places/users/<user_id>/map/markers/tiles/<z>/<x>/<y>/
+
+    Markers inside one slippy-map tile, clustered server-side below zoom 12.
+    Query params: share_token or token (for private maps);
+    encoding=geojson (default, FeatureCollection) or packed (base64 float32 lng/lat/count).
+    Same visibility rules as the flat markers endpoint.
+    """
+
+    def get(self, request, user_id, z, x, y):
+        encoding = request.query_params.get("encoding", "geojson")
+        if encoding not in ENCODINGS:
             return Response(
-                {"detail": "This user has not shared their travel map."},
-                status=status.HTTP_403_FORBIDDEN,
+                {"detail": f"encoding must be one of: {', '.join(ENCODINGS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-
-        markers = list(
-            _iter_map_markers_for_user(
-                target,
-                include_map_pins=bool(prefs.share_map),
-                include_visited_pins=bool(prefs.share_visited_places),
+        if not is_valid_tile(z, x, y):
+            return Response({"detail": "Tile out of range."}, status=status.HTTP_400_BAD_REQUEST)
+
+        snapshot, include_map_pins, include_visited_pins, is_owner = self._resolve_access(request, user_id=user_id)
+        if isinstance(snapshot, Response):
+            return snapshot
+
+        def build():
+            markers = _iter_map_markers_for_user(
+                snapshot["user_id"],
+                include_map_pins=include_map_pins,
+                include_visited_pins=include_visited_pins,
+                bbox=tile_bbox(z, x, y),
             )
-        )
-        return Response(markers, status=status.HTTP_200_OK)
+            clustered = cluster_markers(markers, z, x, y)
+            return to_packed(clustered) if encoding == "packed" else to_geojson(clustered)
+
+        variant = f"tile:{z}/{x}/{y}:{int(include_map_pins)}{int(include_visited_pins)}:{encoding}"
+        payload, etag = get_or_build_payload(snapshot, variant, build)
+        return _map_response(request, payload, etag, private=is_owner)
 
 
 class TravelMapShareHTMLView(View):
@@ -686,111 +1040,10 @@ class TravelMapShareHTMLView(View):
         )
 
 
-class HotelsSearchAPIView(APIView):
+class HotelsSearchAPIView(HotelSearchView):
     """
     GET /api/places/hotels/search/
-    Search hotels with caching. Requires authentication.
-
-    Query params:
-    - city (required): Destination city
-    - checkin (required): Check-in date (YYYY-MM-DD)
-    - checkout (required): Checkout date (YYYY-MM-DD)
-    - budget_per_night (required): Budget per night in USD
-    - adults (optional): Number of adults (default 1)
-    - children (optional): Number of children (default 0)
-    - travel_style (optional): One of 'active', 'relaxed', 'cultural', 'budget', 'family'
-
-    Returns:
-    {
-        "hotels": [...],
-        "cached": true/false,
-        "city": "Paris",
-        "filters_applied": {
-            "price_max": 120,
-            "travel_style": "active"
-        }
-    }
+    Search hotels with caching. Requires an active, non-blocked account.
+    Parameters and response are documented on llm.views_hotels.HotelSearchView.
     """
     permission_classes = [IsAuthenticated, IsActiveAndNotBlocked]
-
-    def get(self, request):
-        # Get required params
-        city = request.query_params.get("city")
-        checkin = request.query_params.get("checkin")
-        checkout = request.query_params.get("checkout")
-        budget_per_night = request.query_params.get("budget_per_night")
-
-        # Validate required params
-        missing = []
-        if not city:
-            missing.append("city")
-        if not checkin:
-            missing.append("checkin")
-        if not checkout:
-            missing.append("checkout")
-        if not budget_per_night:
-            missing.append("budget_per_night")
-
-        if missing:
-            return Response(
-                {"detail": f"Missing required parameters: {', '.join(missing)}"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # Parse optional params
-        try:
-            adults = int(request.query_params.get("adults", 1))
-        except (ValueError, TypeError):
-            adults = 1
-
-        try:
-            children = int(request.query_params.get("children", 0))
-        except (ValueError, TypeError):
-            children = 0
-
-        try:
-            budget_value = float(budget_per_night)
-        except (ValueError, TypeError):
-            return Response(
-                {"detail": "budget_per_night must be a valid number"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        travel_style = request.query_params.get("travel_style")
-
-        # Check if cached before fetching
-        was_cached = is_hotel_cached(
-            city=city,
-            checkin=checkin,
-            checkout=checkout,
-            budget_per_night=budget_value,
-            adults=adults,
-        )
-
-        # Fetch hotels (uses cache internally)
-        hotels = get_hotels_cached(
-            city_name=city,
-            checkin=checkin,
-            checkout=checkout,
-            budget_per_night=budget_value,
-            adults=adults,
-            children=children,
-            travel_style=travel_style,
-        )
-
-        # Build filters applied info
-        filters_applied = {
-            "price_max": int(budget_value * 0.9),
-        }
-        if travel_style:
-            filters_applied["travel_style"] = travel_style
-
-        return Response(
-            {
-                "hotels": hotels,
-                "cached": was_cached,
-                "city": city,
-                "filters_applied": filters_applied,
-            },
-            status=status.HTTP_200_OK,
-        )
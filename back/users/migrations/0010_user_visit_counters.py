@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:40
+
+from django.db import migrations, models
+from django.db.models import Count, Value
+from django.db.models.functions import Lower, NullIf, Trim
+
+
+def forwards_backfill_visit_counters(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    VisitedPlace = apps.get_model("places", "VisitedPlace")
+    UserMapPlace = apps.get_model("places", "UserMapPlace")
+
+    visited = {
+        row["user_id"]: row
+        for row in VisitedPlace.objects.values("user_id").annotate(
+            places=Count("id"),
+            # Same normalization as places.services.visits.visited_country_key
+            countries=Count(NullIf(Lower(Trim("place__country")), Value("")), distinct=True),
+        )
+    }
+    pins = dict(UserMapPlace.objects.values("user_id").annotate(total=Count("id")).values_list("user_id", "total"))
+
+    for user_id in set(visited) | set(pins):
+        row = visited.get(user_id, {})
+        User.objects.filter(pk=user_id).update(
+            visited_places_count=row.get("places", 0),
+            visited_countries_count=row.get("countries", 0),
+            map_places_count=pins.get(user_id, 0),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_userpreferences_ai_response_cache'),
+        ('places', '0016_merge_20260226_1853'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='map_places_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='visited_countries_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='visited_places_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(forwards_backfill_visit_counters, migrations.RunPython.noop),
+    ]
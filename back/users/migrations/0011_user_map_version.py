@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:16
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0010_user_visit_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='map_version',
+            field=models.UUIDField(default=uuid.uuid4, editable=False),
+        ),
+    ]
@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from .managers import UserManager
@@ -35,6 +37,14 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_map_public = models.BooleanField(default=False, db_index=True)
     # Secret segment for private maps; required as ?share_token= when is_map_public is False.
     map_share_token = models.CharField(max_length=64, null=True, blank=True, unique=True, db_index=True)
+    # Rotated on every map, visited-place, preference or user change; keys the cached map payloads.
+    map_version = models.UUIDField(default=uuid.uuid4, editable=False)
+    # Rotated on every visited-place, map pin, preference or trip change; keys the cached traveler profile.
+    profile_version = models.UUIDField(default=uuid.uuid4, editable=False)
+    # Denormalized counters for badge endpoints; maintained by places.services.visits.
+    visited_places_count = models.PositiveIntegerField(default=0)
+    visited_countries_count = models.PositiveIntegerField(default=0)
+    map_places_count = models.PositiveIntegerField(default=0)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
@@ -54,6 +64,8 @@ class UserPreferences(models.Model):
     badges = models.JSONField(default=list, blank=True)
     open_now = models.BooleanField(null=True, blank=True)
     interests = models.JSONField(default=list, blank=True)
+    # Opt-out of shared AI answer caching (see llm/services/response_cache.py).
+    ai_response_cache = models.BooleanField(default=True)
     # Map/profile visibility for other users (default: private)
     share_map = models.BooleanField(default=False)
     share_visited_places = models.BooleanField(default=False)
@@ -84,6 +84,7 @@ class UserPreferencesSerializer(serializers.ModelSerializer):
             "badges",
             "open_now",
             "interests",
+            "ai_response_cache",
             "share_map",
             "share_visited_places",
             "share_badges",
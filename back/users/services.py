@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import uuid
 from collections import Counter
-from typing import Any, Dict, List
+from typing import Any, Dict
 
-from django.db.models import Q
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
 
 
 LEVELS = [
@@ -80,77 +83,97 @@ RARE_DESTINATIONS = {
 }
 
 
+BEACH_DESTINATIONS = {"bali", "phuket", "goa", "maldives"}
+MOUNTAIN_CATEGORIES = {"park", "natural_feature", "mountain"}
+BUDGET_TRIP_MAX_PRICE = 500
+
+# Evaluated in order over the aggregates from _get_history_aggregates().
+BADGE_RULES = [
+    {"code": "beach_lover", "label": "Beach Lover", "icon": "🏖️", "metric": "beach_destinations", "min": 3},
+    {"code": "mountain_seeker", "label": "Mountain Seeker", "icon": "🏔️", "metric": "mountain_categories", "min": 3},
+    {"code": "food_traveler", "label": "Food Traveler", "icon": "🍜", "metric": "food_destinations", "min": 5},
+    {"code": "family_traveler", "label": "Family Traveler", "icon": "👨‍👩‍👧", "metric": "family_trips", "min": 2},
+    {"code": "budget_master", "label": "Budget Master", "icon": "💰", "metric": "budget_trips", "min": 3},
+    {"code": "asia_explorer", "label": "Asia Explorer", "icon": "🌏", "metric": "asia_countries", "min": 3},
+]
+
+
 def _normalize_text(value: str | None) -> str:
     return (value or "").strip().lower()
 
 
-def _get_user_trip_records(user) -> List[Dict[str, Any]]:
+def _get_history_aggregates(user) -> Dict[str, Any]:
+    """
+    Collect profile aggregates from distinct projections instead of model instances.
+    Map pins, trips and visited places each contribute (destination, country) pairs.
+    """
     from marketplace.models import Trip
     from places.models import UserMapPlace, VisitedPlace
 
-    records: List[Dict[str, Any]] = []
-
-    for row in UserMapPlace.objects.filter(user=user):
-        records.append(
-            {
-                "destination": _normalize_text(row.city),
-                "country": _normalize_text(row.country),
-                "style": "",
-                "budget": None,
-                "family": False,
-            }
-        )
+    pairs = set()
+    categories = set()
 
-    for row in Trip.objects.filter(Q(customer_user=user) | Q(advisor=user)):
-        itinerary = row.itinerary_json or {}
-        meta = itinerary.get("meta", {}) if isinstance(itinerary, dict) else {}
-        records.append(
-            {
-                "destination": _normalize_text(row.destination),
-                "country": _normalize_text(meta.get("country") or row.destination),
-                "style": _normalize_text(meta.get("travel_style")),
-                "budget": float(row.price or 0),
-                "family": bool(meta.get("traveler_type") == "family" or meta.get("has_kids")),
-            }
-        )
+    # order_by() drops Meta.ordering, which would otherwise add created_at to the DISTINCT.
+    map_rows = UserMapPlace.objects.filter(user=user).order_by().values_list("city", "country").distinct()
+    for city, country in map_rows:
+        pairs.add((_normalize_text(city), _normalize_text(country)))
 
     # Visited places still count toward destination history even if no explicit trip object exists.
-    for row in (
+    visited_rows = (
         VisitedPlace.objects.filter(user=user)
-        .select_related("place")
-        .order_by("-created_at")
-    ):
-        records.append(
-            {
-                "destination": _normalize_text(row.place.city),
-                "country": _normalize_text(row.place.country),
-                "style": "",
-                "budget": None,
-                "family": False,
-                "category": _normalize_text(row.place.category),
-            }
-        )
+        .values_list("place__city", "place__country", "place__category")
+        .distinct()
+    )
+    for city, country, category in visited_rows:
+        pairs.add((_normalize_text(city), _normalize_text(country)))
+        if _normalize_text(category):
+            categories.add(_normalize_text(category))
+
+    trips = Trip.objects.filter(Q(customer_user=user) | Q(advisor=user))
+    styles: Counter = Counter()
+    family_trips = 0
+    trip_rows = trips.values_list(
+        "destination",
+        "itinerary_json__meta__country",
+        "itinerary_json__meta__travel_style",
+        "itinerary_json__meta__traveler_type",
+        "itinerary_json__meta__has_kids",
+    )
+    for destination, meta_country, style, traveler_type, has_kids in trip_rows:
+        pairs.add((_normalize_text(destination), _normalize_text(meta_country or destination)))
+        if _normalize_text(style):
+            styles[_normalize_text(style)] += 1
+        if traveler_type == "family" or has_kids:
+            family_trips += 1
+
+    budget_trips = trips.aggregate(
+        total=Count("id", filter=Q(price__lte=BUDGET_TRIP_MAX_PRICE)),
+    )["total"]
 
-    return records
+    pairs = {pair for pair in pairs if pair[0] or pair[1]}
+    destinations = {destination for destination, _ in pairs if destination}
+    countries = sorted({country for _, country in pairs if country})
+
+    return {
+        "trip_count": len(pairs),
+        "countries": countries,
+        "destinations": destinations,
+        "styles": styles,
+        "beach_destinations": len(destinations & BEACH_DESTINATIONS),
+        "mountain_categories": len(categories & MOUNTAIN_CATEGORIES),
+        "food_destinations": len(destinations & FOOD_DESTINATIONS),
+        "family_trips": family_trips,
+        "budget_trips": budget_trips,
+        "asia_countries": len(set(countries) & ASIA_COUNTRIES),
+    }
 
 
 def calculate_level_and_badges(user) -> Dict[str, Any]:
-    records = _get_user_trip_records(user)
+    aggregates = _get_history_aggregates(user)
     preferences = getattr(user, "preferences", None)
 
-    unique_trip_keys = {
-        (record.get("destination") or "", record.get("country") or "")
-        for record in records
-        if record.get("destination") or record.get("country")
-    }
-    trip_count = len(unique_trip_keys)
-    countries = sorted(
-        {
-            record.get("country")
-            for record in records
-            if record.get("country")
-        }
-    )
+    trip_count = aggregates["trip_count"]
+    countries = aggregates["countries"]
     country_count = len(countries)
 
     level = LEVELS[0]
@@ -159,37 +182,13 @@ def calculate_level_and_badges(user) -> Dict[str, Any]:
         if trip_count >= candidate["min_trips"] and country_count >= min_countries:
             level = candidate
 
-    destinations = Counter(record.get("destination") for record in records if record.get("destination"))
-    categories = Counter(record.get("category") for record in records if record.get("category"))
-    styles = Counter(record.get("style") for record in records if record.get("style"))
-
-    badge_defs = []
-
-    beach_count = sum(1 for name in destinations if name in {"bali", "phuket", "goa", "maldives"})
-    if beach_count >= 3:
-        badge_defs.append({"code": "beach_lover", "label": "Beach Lover", "icon": "🏖️"})
-
-    mountain_count = sum(1 for value in categories if value in {"park", "natural_feature", "mountain"})
-    if mountain_count >= 3:
-        badge_defs.append({"code": "mountain_seeker", "label": "Mountain Seeker", "icon": "🏔️"})
-
-    food_count = sum(1 for name in destinations if name in FOOD_DESTINATIONS)
-    if food_count >= 5:
-        badge_defs.append({"code": "food_traveler", "label": "Food Traveler", "icon": "🍜"})
-
-    family_count = sum(1 for record in records if record.get("family"))
-    if family_count >= 2:
-        badge_defs.append({"code": "family_traveler", "label": "Family Traveler", "icon": "👨‍👩‍👧"})
+    badge_defs = [
+        {"code": rule["code"], "label": rule["label"], "icon": rule["icon"]}
+        for rule in BADGE_RULES
+        if aggregates[rule["metric"]] >= rule["min"]
+    ]
 
-    budget_count = sum(1 for record in records if record.get("budget") is not None and record["budget"] <= 500)
-    if budget_count >= 3:
-        badge_defs.append({"code": "budget_master", "label": "Budget Master", "icon": "💰"})
-
-    asia_count = sum(1 for country in countries if country in ASIA_COUNTRIES)
-    if asia_count >= 3:
-        badge_defs.append({"code": "asia_explorer", "label": "Asia Explorer", "icon": "🌏"})
-
-    top_styles = [style for style, _ in styles.most_common(2)]
+    top_styles = [style for style, _ in aggregates["styles"].most_common(2)]
     history_prompt = ""
     if top_styles:
         history_prompt = (
@@ -202,7 +201,7 @@ def calculate_level_and_badges(user) -> Dict[str, Any]:
             f"{preferences.travel_style.lower()} travel."
         )
 
-    if any(destination in RARE_DESTINATIONS for destination in destinations):
+    if aggregates["destinations"] & RARE_DESTINATIONS:
         level = LEVELS[-1]
 
     return {
@@ -221,10 +220,64 @@ def calculate_level_and_badges(user) -> Dict[str, Any]:
     }
 
 
-def sync_user_travel_profile(user) -> Dict[str, Any]:
+PROFILE_CACHE_HOURS = 24  # Safety net; writes that change the profile rotate its version sooner
+
+
+def _profile_cache_key(user_id, version) -> str:
+    return f"user:travel_profile:{user_id}:{version}"
+
+
+def _current_profile_version(user):
+    from .models import User
+
+    return User.objects.filter(pk=user.pk).values_list("profile_version", flat=True).first()
+
+
+def invalidate_user_travel_profile(*user_ids) -> None:
+    """
+    Rotate User.profile_version; called from signals on visited/map-place/trip/preferences writes.
+    The cache may be per-process, so a delete would only reach this worker; a new version
+    orphans the old entry everywhere.
+    """
+    from .models import User
+
+    user_ids = [user_id for user_id in user_ids if user_id]
+    if user_ids:
+        User.objects.filter(pk__in=user_ids).update(profile_version=uuid.uuid4())
+
+
+def sync_user_travel_profile(user, version=None) -> Dict[str, Any]:
+    """Recompute the profile and persist level/badges only when they changed."""
+    from .models import UserPreferences
+
+    # Read the version first: a write during the recompute rotates it and orphans this entry.
+    if version is None:
+        version = _current_profile_version(user)
     profile = calculate_level_and_badges(user)
-    preferences = user.preferences
-    preferences.traveler_level = profile["traveler_level"]["name"]
-    preferences.badges = profile["badges"]
-    preferences.save(update_fields=["traveler_level", "badges", "updated_at"])
+    level_name = profile["traveler_level"]["name"]
+    badges = profile["badges"]
+
+    preferences = getattr(user, "preferences", None)
+    if preferences and (preferences.traveler_level != level_name or preferences.badges != badges):
+        # Queryset update skips post_save, so this write does not rotate the version it fills.
+        UserPreferences.objects.filter(pk=preferences.pk).update(
+            traveler_level=level_name,
+            badges=badges,
+            updated_at=timezone.now(),
+        )
+        preferences.traveler_level = level_name
+        preferences.badges = badges
+
+    if version is not None:
+        cache.set(_profile_cache_key(user.pk, version.hex), profile, timeout=PROFILE_CACHE_HOURS * 60 * 60)
     return profile
+
+
+def get_user_travel_profile(user) -> Dict[str, Any]:
+    """Cached read path; one version lookup, recomputed only after a relevant write."""
+    version = _current_profile_version(user)
+    if version is not None:
+        profile = cache.get(_profile_cache_key(user.pk, version.hex))
+        if profile is not None:
+            return profile
+    return sync_user_travel_profile(user, version)
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from marketplace.models import Trip
+from places.models import UserMapPlace, VisitedPlace
+from places.services.map_cache import invalidate_user_map
+
+from .models import User, UserPreferences
+from .services import invalidate_user_travel_profile
+
+
+# Traveler profile (level, badges, history prompt) is derived from these rows.
+
+@receiver(post_save, sender=VisitedPlace)
+@receiver(post_delete, sender=VisitedPlace)
+@receiver(post_save, sender=UserMapPlace)
+@receiver(post_delete, sender=UserMapPlace)
+@receiver(post_save, sender=UserPreferences)
+def invalidate_profile_for_user_row(sender, instance, **kwargs):
+    invalidate_user_travel_profile(instance.user_id)
+    invalidate_user_map(instance.user_id)
+
+
+# Map payloads also embed the user summary and depend on is_map_public / share token / active state.
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_map_for_user(sender, instance, **kwargs):
+    invalidate_user_map(instance.pk)
+
+
+@receiver(post_save, sender=Trip)
+@receiver(post_delete, sender=Trip)
+def invalidate_profile_for_trip(sender, instance, **kwargs):
+    invalidate_user_travel_profile(instance.customer_user_id, instance.advisor_id)
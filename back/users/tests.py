@@ -1,15 +1,23 @@
+from django.core.cache import cache
 from django.test import TestCase
 from rest_framework import status
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from marketplace.models import AdvisorCategory, Trip
 from places.models import Place, UserMapPlace, VisitedPlace
 from users.models import User, UserPreferences
-from users.services import calculate_level_and_badges, sync_user_travel_profile
+from users.services import (
+    calculate_level_and_badges,
+    get_user_travel_profile,
+    invalidate_user_travel_profile,
+    sync_user_travel_profile,
+)
 
 
 class TravelerProfileTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(
             email="traveler@example.com",
             password="testpass123",
@@ -77,6 +85,49 @@ class TravelerProfileTests(TestCase):
         self.assertEqual(prefs.traveler_level, "Voyager")
         self.assertTrue(any(badge["code"] == "asia_explorer" for badge in prefs.badges))
 
+    def test_trip_metadata_feeds_badge_rules(self):
+        category = AdvisorCategory.objects.create(name="Family", slug="family")
+        for index, destination in enumerate(["Goa", "Phuket", "Maldives"]):
+            Trip.objects.create(
+                advisor=self.user,
+                category=category,
+                title=f"Trip {index}",
+                destination=destination,
+                price=300 + index * 100,
+                itinerary_json={"meta": {"travel_style": "Relax", "has_kids": index < 2}},
+            )
+
+        profile = calculate_level_and_badges(self.user)
+        codes = {badge["code"] for badge in profile["badges"]}
+
+        self.assertEqual(profile["history_summary"]["trip_count"], 6)
+        self.assertTrue({"beach_lover", "family_traveler", "budget_master", "asia_explorer"} <= codes)
+        self.assertIn("relax", profile["history_prompt"])
+
+    def test_cached_profile_is_reused_until_history_changes(self):
+        get_user_travel_profile(self.user)
+
+        with self.assertNumQueries(1):  # The version lookup only
+            profile = get_user_travel_profile(self.user)
+        self.assertEqual(profile["history_summary"]["trip_count"], 3)
+
+        UserMapPlace.objects.create(user=self.user, city="Seoul", country="South Korea", date="2025-05", lat=37.56, lon=126.97)
+
+        profile = get_user_travel_profile(self.user)
+        self.assertEqual(profile["history_summary"]["trip_count"], 4)
+
+    def test_profile_written_by_another_worker_is_not_served_stale(self):
+        get_user_travel_profile(self.user)
+
+        # bulk_create skips signals; invalidation only rotates the DB version and leaves the
+        # cached entry in place, as it would be in another worker's LocMem cache.
+        UserMapPlace.objects.bulk_create([
+            UserMapPlace(user=self.user, city="Seoul", country="South Korea", date="2025-05", lat=37.56, lon=126.97),
+        ])
+        invalidate_user_travel_profile(self.user.pk)
+
+        self.assertEqual(get_user_travel_profile(self.user)["history_summary"]["trip_count"], 4)
+
 
 class AuthRefreshTests(TestCase):
     def setUp(self):
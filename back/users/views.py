@@ -16,7 +16,7 @@ from .serializers import (
     UserSerializer,
     UserUpdateSerializer,
 )
-from .services import sync_user_travel_profile
+from .services import get_user_travel_profile
 import secrets
 
 
@@ -41,7 +41,7 @@ class UserProfileView(APIView):
 
     def get(self, request):
         UserPreferences.objects.get_or_create(user=request.user)
-        traveler_profile = sync_user_travel_profile(request.user)
+        traveler_profile = get_user_travel_profile(request.user)
         if request.user.role == User.Role.USER:
             approved_exists = TripAdvisorApplication.objects.filter(
                 user=request.user,
@@ -69,14 +69,14 @@ class UserProfileView(APIView):
             request.user.map_share_token = secrets.token_urlsafe(32)
             request.user.save(update_fields=["map_share_token"])
 
-        pref_fields = {"budget", "travel_style", "citizenship", "open_now", "interests"}
+        pref_fields = {"budget", "travel_style", "citizenship", "open_now", "interests", "ai_response_cache"}
         pref_data = {key: value for key, value in request.data.items() if key in pref_fields}
         if pref_data:
             pref_serializer = UserPreferencesSerializer(prefs, data=pref_data, partial=True)
             pref_serializer.is_valid(raise_exception=True)
             pref_serializer.save()
 
-        traveler_profile = sync_user_travel_profile(request.user)
+        traveler_profile = get_user_travel_profile(request.user)
         return Response(
             UserSerializer(
                 request.user,